@@ -0,0 +1,90 @@
+"""
+
+Create or update the database schema.
+
+Usage:
+    python -m app.bootstrap_db [--dry-run]
+
+Creates missing tables, then any indexes declared on the models but missing
+from existing tables (`create_all` skips a table that already exists, including
+indexes added to it later). A newly created `positions` table is filled from
+the existing trades in the same transaction, since fills only update it
+incrementally. Run it once per deploy, before starting the API workers; the
+API itself never changes the schema.
+
+"""
+import argparse
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registers the tables on Base.metadata)
+from app.db import Base, get_engine
+from app.services.trade_service import rebuild_positions
+
+
+def missing_schema(conn: Connection) -> tuple[list[str], list[str]]:
+    """
+    Compares the models with the database.
+
+    :param conn: An open connection.
+    :return: (missing table names, missing index names) in creation order.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    tables, indexes = [], []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            tables.append(table.name)
+            continue
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        indexes.extend(sorted(ix.name for ix in table.indexes if ix.name not in existing_indexes))
+    return tables, indexes
+
+
+def bootstrap_schema(conn: Connection) -> tuple[list[str], list[str]]:
+    """
+    Creates missing tables and indexes, and backfills a new `positions` table.
+
+    :param conn: A connection inside a transaction.
+    :return: (created table names, created index names).
+    """
+    tables, indexes = missing_schema(conn)
+    Base.metadata.create_all(bind=conn)
+    by_name = {ix.name: ix for table in Base.metadata.sorted_tables for ix in table.indexes}
+    for name in indexes:
+        by_name[name].create(bind=conn)
+    if "positions" in tables:
+        # Fills only adjust existing rows; starting empty would report no holdings
+        # and let the next fill open from zero. The session joins `conn`'s transaction.
+        with Session(bind=conn) as db:
+            rebuild_positions(db)
+    return tables, indexes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what is missing without creating it")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    try:
+        if args.dry_run:
+            with engine.connect() as conn:
+                tables, indexes = missing_schema(conn)
+        else:
+            with engine.begin() as conn:
+                tables, indexes = bootstrap_schema(conn)
+    finally:
+        engine.dispose()
+
+    verb = "Missing" if args.dry_run else "Created"
+    print(f"{verb} tables: {', '.join(tables) or 'none'}")
+    print(f"{verb} indexes: {', '.join(indexes) or 'none'}")
+    if "positions" in tables:
+        print("Would backfill positions from trades" if args.dry_run else "Backfilled positions from trades")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,12 @@ class Settings(BaseSettings):
 
     access_token_minutes: int = 15
     refresh_token_days: int = 14
+    token_cache_max_entries: int = 10_000
+
+    bcrypt_rounds: int = 12
+    password_hash_executor: str = "thread"  # "thread" or "process"
+    password_hash_workers: int = 4
+    password_hash_queue_timeout_seconds: float = 5.0
 
     db_user: str
     db_password: str
@@ -16,8 +24,87 @@ class Settings(BaseSettings):
     db_port: int = 5432
     db_name: str
 
-    market_provider: str = "finnhub"
+    # Applied to every engine (sync, async and replica); each process gets its own pools.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800  # -1 disables recycling
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 = no server-side limit
+
+    # Optional streaming replica for read-only endpoints (positions, PnL, history);
+    # same credentials and database name as the primary.
+    db_replica_host: str | None = None
+    db_replica_port: int | None = None
+
+    market_provider: str = "finnhub"  # comma-separated failover order, e.g. "finnhub,replay"
+    market_replay_path: str | None = None  # CSV of symbol,ts,open,high,low,close,volume 1-minute bars
+    market_replay_speed: float = 0.0  # 0 pins the last recorded bar to now; 1.0 replays in real time
+    market_hedge_enabled: bool = True
+    market_hedge_percentile: float = 95.0  # hedge once a provider is slower than this percentile
+    market_hedge_min_samples: int = 20
+    market_hedge_default_delay_seconds: float = 0.5  # until a provider has min_samples latencies
+    market_latency_window: int = 512
     finnhub_api_key: str | None = None
+    finnhub_base_url: str = "https://finnhub.io/api/v1"  # point at benchmarks.fake_finnhub for load tests
+    finnhub_rate_per_minute: int = 60
+    finnhub_burst: int = 10
+
+    upstream_max_retries: int = 3
+    upstream_backoff_base_seconds: float = 0.25
+    upstream_backoff_max_seconds: float = 5.0
+    upstream_circuit_failure_threshold: int = 5
+    upstream_circuit_reset_seconds: float = 30.0
+
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = True
+
+    quote_cache_ttl_seconds: float = 5.0
+    quote_cache_max_symbols: int = 2048
+    trade_quote_max_age_seconds: float = 1.0
+    candle_staleness_seconds: float = 30.0
+
+    prefetch_enabled: bool = True
+    prefetch_watchlist: str = ""  # comma-separated, e.g. "AAPL,MSFT"
+    prefetch_quote_interval_seconds: float = 3.0
+    prefetch_candle_interval_seconds: float = 30.0
+    prefetch_include_holdings: bool = True
+    prefetch_include_orders: bool = True
+
+    order_book_enabled: bool = True
+
+    snapshot_enabled: bool = True
+    snapshot_interval_seconds: float = 300.0  # snapshots land on multiples of this
+    equity_curve_default_points: int = 500
+    equity_curve_max_points: int = 5000
+
+    market_batch_max_symbols: int = 100
+    market_batch_concurrency: int = 10
+
+    predict_batch_max_items: int = 1000
+    trade_batch_max_orders: int = 200
+    trade_history_max_page_size: int = 1000
+    trade_export_chunk_rows: int = 1000
+
+    quote_stream_feed: str = "finnhub"  # "finnhub" or "fake"
+    quote_stream_buffer_size: int = 256
+    quote_stream_max_symbols: int = 50
+    quote_stream_fake_interval_seconds: float = 0.5
+
+    pnl_quote_concurrency: int = 10
+    pnl_quote_timeout_seconds: float = 3.0
+
+    # Per-request profiling; the middleware is not installed unless enabled.
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # fraction of requests profiled without the header
+    profiling_interval_seconds: float = 0.001
+    profiling_dir: str = "profiles"
+    profiling_max_files: int = 50
+    admin_token: str | None = None  # sent as X-Admin-Token / X-Profile to use admin features
 
     @property
     def database_url(self) -> str:
@@ -27,7 +114,44 @@ class Settings(BaseSettings):
             f"{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.db_user}:"
+            f"{self.db_password}@{self.db_host}:"
+            f"{self.db_port}/{self.db_name}"
+        )
+
+    @property
+    def replica_async_database_url(self) -> str | None:
+        if not self.db_replica_host:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.db_user}:"
+            f"{self.db_password}@{self.db_replica_host}:"
+            f"{self.db_replica_port or self.db_port}/{self.db_name}"
+        )
+
+    @property
+    def market_provider_names(self) -> list[str]:
+        return [p.strip().lower() for p in self.market_provider.split(",") if p.strip()]
+
+    @property
+    def prefetch_symbols(self) -> list[str]:
+        return [s.strip().upper() for s in self.prefetch_watchlist.split(",") if s.strip()]
+
     model_config = SettingsConfigDict(env_file=".env", extra="forbid")
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Reads the settings from the environment and `.env` once, on first use."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # `from app.core.config import settings` keeps working, but the environment
+    # is only read when something actually needs a setting.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,243 @@
+"""
+Prometheus metrics.
+
+Defines the process-wide metrics and the hooks that feed them: an ASGI
+middleware for HTTP routes, SQLAlchemy engine events for query timings, pool
+classes that time connection checkout, and a collector that samples in-memory
+component stats (caches, rate limiter, circuit breaker) at scrape time.
+"""
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Finer buckets at the low end: cache hits and index lookups are sub-millisecond.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of individual upstream HTTP attempts (retries are observed separately).",
+    ["provider", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total",
+    "Failed upstream attempts by reason (http_429, http_4xx, http_5xx, transport, circuit_open).",
+    ["provider", "endpoint", "reason"],
+)
+MARKET_DATA_HEDGES = Counter(
+    "market_data_hedges_total",
+    "Market data requests hedged to the next provider because `provider` was slower than its percentile.",
+    ["operation", "provider"],
+)
+MARKET_DATA_FAILOVERS = Counter(
+    "market_data_failovers_total",
+    "Market data requests retried on the next provider after `provider` failed.",
+    ["operation", "provider"],
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time by engine and statement type.",
+    ["engine", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after the pool timeout with every connection in use.",
+    ["engine"],
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Returns the exposition body and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# -------------------------
+# HTTP
+# -------------------------
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status counts and in-flight requests.
+
+    Routes are labelled by their template (`/api/market/price/{symbol}`), never
+    the raw path, to keep label cardinality bounded. WebSocket and lifespan
+    traffic passes through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, template).observe(elapsed)
+            HTTP_REQUESTS.labels(method, template, str(status)).inc()
+
+
+# -------------------------
+# Database
+# -------------------------
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Times every statement executed on `engine` (pass `async_engine.sync_engine`
+    for an async engine).
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_LATENCY.labels(name, operation).observe(time.perf_counter() - started)
+
+
+class _CheckoutTimingMixin:
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+    metrics_name = "sync"
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection."""
+    metrics_name = "async"
+
+
+def instrumented_pool(base: type, name: str) -> type:
+    """
+    Returns a subclass of an instrumented pool class that reports under `name`.
+
+    The label lives on the class because SQLAlchemy rebuilds pools from their
+    class on dispose, which would drop an instance attribute.
+    """
+    return type(f"{base.__name__}_{name}", (base,), {"metrics_name": name})
+
+
+# -------------------------
+# Component stats
+# -------------------------
+
+class _StatsCollector:
+    """Exposes `{component: {stat: value}}` snapshots as `app_component_stat` gauges."""
+
+    def __init__(self):
+        self._sources: dict[str, Callable[[], dict]] = {}
+
+    def add(self, component: str, stats: Callable[[], dict]) -> None:
+        self._sources[component] = stats
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "app_component_stat",
+            "Point-in-time stats of in-process components (caches, rate limiter, breaker, order book).",
+            labels=["component", "stat"],
+        )
+        for component, stats in list(self._sources.items()):
+            try:
+                values = stats()
+            except Exception:
+                continue
+            for stat, value in values.items():
+                if isinstance(value, (int, float)):
+                    family.add_metric([component, stat], float(value))
+        yield family
+
+
+_stats_collector = _StatsCollector()
+REGISTRY.register(_stats_collector)
+
+
+def register_stats(component: str, stats: Callable[[], dict]) -> None:
+    """
+    Registers a callable returning numeric stats for a component, sampled on every scrape.
+
+    Registering the same component again replaces the previous callable.
+    """
+    _stats_collector.add(component, stats)
+
+
+def pool_stats(engine: Engine) -> Callable[[], dict]:
+    """Returns a stats callable for a QueuePool-backed engine's connection counts."""
+    def stats() -> dict:
+        pool = engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+    return stats
@@ -0,0 +1,126 @@
+"""
+Opt-in per-request profiling.
+
+`ProfilingMiddleware` is only installed when `settings.profiling_enabled` is
+set, so with profiling off requests take no extra code path. A request is
+profiled when it carries `X-Profile: <admin token>` or is picked by
+`settings.profiling_sample_rate`. Profiles are taken with pyinstrument in
+async mode, so time spent awaiting upstream calls and database queries shows
+up under the awaiting frame. Each profile is written as an HTML report to a
+bounded ring of files; its id is returned in the `X-Profile-Id` header.
+"""
+import asyncio
+import hmac
+import os
+import random
+import re
+import time
+from pathlib import Path
+
+from pyinstrument import Profiler
+
+from app.core.config import get_settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+_PROFILE_ID = re.compile(r"^[0-9]+-[A-Z]+-[A-Za-z0-9_.-]*\.html$")
+
+
+def admin_token_matches(expected: str | None, presented: str) -> bool:
+    """Constant-time comparison; always False when no admin token is configured."""
+    return bool(expected) and hmac.compare_digest(expected.encode(), presented.encode())
+
+
+class ProfileStore:
+    """Directory of HTML profiles keeping only the newest `max_files`."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    @staticmethod
+    def new_id(method: str, path: str) -> str:
+        """Returns a sortable, filesystem-safe id for a request's profile."""
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", path).strip("_")[:80]
+        return f"{time.time_ns()}-{method}-{slug}.html"
+
+    def save(self, profile_id: str, html: str) -> None:
+        """Writes one profile atomically and prunes the oldest beyond `max_files`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{profile_id}.tmp"
+        tmp.write_text(html, encoding="utf-8")
+        os.replace(tmp, self.directory / profile_id)
+
+        files = sorted(self.directory.glob("*.html"))
+        for old in files[:max(len(files) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """Returns stored profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob("*.html"), reverse=True):
+            stat = path.stat()
+            profiles.append({"id": path.name, "size_bytes": stat.st_size, "created_at": stat.st_mtime})
+        return profiles
+
+    def path(self, profile_id: str) -> Path | None:
+        """Resolves a profile id to its file; anything that is not a stored profile id gives None."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / profile_id
+        return path if path.is_file() else None
+
+
+def get_profile_store() -> ProfileStore:
+    """Returns the profile store configured by settings."""
+    settings = get_settings()
+    return ProfileStore(settings.profiling_dir, settings.profiling_max_files)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected HTTP requests end to end."""
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        admin_token: str | None,
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+    ):
+        self.app = app
+        self.store = store
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _selected(self, scope) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return admin_token_matches(self.admin_token, value.decode("latin-1"))
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id(scope["method"], scope.get("path", ""))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            html = profiler.output_html()
+            await asyncio.to_thread(self.store.save, profile_id, html)
@@ -1,15 +1,106 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 import bcrypt
-from app.core.config import settings
+from app.core.config import get_settings
+from app.core.metrics import register_stats
+from app.core.token_cache import TokenCache
+
+
+_token_cache: TokenCache | None = None
+
+
+def get_token_cache() -> TokenCache:
+    """Returns the process-wide verified-token cache, sized from settings."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(max_entries=get_settings().token_cache_max_entries)
+        register_stats("token_cache", _token_cache.stats)
+    return _token_cache
 
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(get_settings().bcrypt_rounds)).decode('utf-8')
 
 def verify_password(password: str, hashed:str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+def password_needs_rehash(hashed: str) -> bool:
+    """Returns True if a bcrypt hash was made with a cost other than `settings.bcrypt_rounds`."""
+    try:
+        rounds = int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != get_settings().bcrypt_rounds
+
+
+# -------------------------
+# Password hashing pool
+# -------------------------
+
+class PasswordHasherBusy(Exception):
+    """Raised when no password hashing worker frees up within the queue timeout."""
+    pass
+
+
+_hash_executor: Executor | None = None
+_hash_slots: asyncio.Semaphore | None = None
+
+
+def _bcrypt_hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _bcrypt_check(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor, _hash_slots
+    if _hash_executor is None:
+        settings = get_settings()
+        workers = settings.password_hash_workers
+        if settings.password_hash_executor == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        _hash_slots = asyncio.Semaphore(workers)
+    return _hash_executor
+
+async def _run_on_hash_pool(fn, *args):
+    """
+    Runs a bcrypt call on the dedicated hashing pool, off the request threadpool.
+
+    Callers queue for one of `settings.password_hash_workers` slots for at most
+    `settings.password_hash_queue_timeout_seconds`.
+
+    :raises PasswordHasherBusy: If no slot frees up in time.
+    """
+    executor = _get_hash_executor()
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), get_settings().password_hash_queue_timeout_seconds)
+    except asyncio.TimeoutError as e:
+        raise PasswordHasherBusy("Password hashing pool is saturated") from e
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _hash_slots.release()
+
+async def hash_password_async(password: str) -> str:
+    """Hashes a password with `settings.bcrypt_rounds` on the dedicated hashing pool."""
+    return await _run_on_hash_pool(_bcrypt_hash, password, get_settings().bcrypt_rounds)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verifies a password against a bcrypt hash on the dedicated hashing pool."""
+    return await _run_on_hash_pool(_bcrypt_check, password, hashed)
+
+def shutdown_password_hasher() -> None:
+    """Shuts down the hashing pool. Called from the FastAPI lifespan."""
+    global _hash_executor, _hash_slots
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+        _hash_slots = None
+
 def create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
     now = datetime.now(timezone.utc)
     payload = {
@@ -18,11 +109,37 @@ def create_token(subject: str, token_type: str, expires_delta: timedelta) -> str
         "iat": int(now.timestamp()),
         "exp": int((now + expires_delta).timestamp()),
     }
+    settings = get_settings()
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 def decode_token(token: str) -> dict:
+    settings = get_settings()
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         return payload
     except JWTError as e:
         raise ValueError("Invalid token") from e
+
+def decode_token_cached(token: str) -> dict:
+    """
+    Like `decode_token`, but serves previously verified tokens from the token
+    cache until their `exp`. Revoked tokens are rejected.
+    """
+    token_cache = get_token_cache()
+    if token_cache.is_revoked(token):
+        raise ValueError("Token revoked")
+
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        token_cache.put(token, payload)
+    return payload
+
+def revoke_token(token: str) -> None:
+    """Evicts a token from the verified-token cache and rejects it until it expires."""
+    payload = decode_token_cached(token)
+    get_token_cache().revoke(token, payload["exp"])
+
+def clear_token_cache() -> None:
+    """Evicts all verified tokens, e.g. after rotating `jwt_secret`."""
+    get_token_cache().clear()
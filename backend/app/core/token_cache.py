@@ -0,0 +1,96 @@
+"""
+Bounded in-memory cache of verified JWT payloads.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    LRU cache of verified token payloads, keyed by a SHA-256 digest of the token.
+
+    Entries are valid until the token's own `exp`. Revoked tokens are
+    remembered (also until `exp`) so they are rejected even though their
+    signature still verifies. Sync dependencies run in FastAPI's threadpool,
+    so all access is guarded by a lock.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self._revoked: dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        """
+        Returns the cached payload for a token, or None on a miss or expiry.
+
+        :param token: The raw JWT.
+        """
+        key = self._key(token)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        """
+        Caches a verified payload. Payloads without a numeric `exp` are not cached.
+
+        :param token: The raw JWT.
+        :param payload: The verified claims.
+        """
+        if not isinstance(payload.get("exp"), (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        """Returns True if the token was revoked and has not yet expired."""
+        if not self._revoked:
+            return False
+        exp = self._revoked.get(self._key(token))
+        return exp is not None and exp > time.time()
+
+    def revoke(self, token: str, exp: float) -> None:
+        """
+        Evicts a token and rejects it until `exp`.
+
+        :param token: The raw JWT.
+        :param exp: The token's expiry (UNIX seconds).
+        """
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked = {k: e for k, e in self._revoked.items() if e > now}
+            self._revoked[key] = exp
+
+    def clear(self) -> None:
+        """Evicts every cached payload, e.g. after a signing key rotation."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current number of cached tokens."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
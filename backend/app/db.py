@@ -1,8 +1,136 @@
+"""
+Database engines and session factories.
+
+Importing this module opens nothing: the session factories below start
+unbound and `init_engines()` creates the engines and binds them. The API
+calls it from its lifespan; commands call it (directly or via `get_engine()`)
+before touching the database.
+"""
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.config import settings
+from app.core.config import get_settings
+from app.core.metrics import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+    instrumented_pool,
+    pool_stats,
+    register_stats,
+)
 
-engine = create_engine(settings.database_url, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
+# Sync sessions: schema management, seed and maintenance commands, sync endpoints.
+SessionLocal = sessionmaker(autoflush=False, autocommit=False, future=True)
+
+# Async sessions: request paths that also await upstream I/O.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+# Read-only async sessions on the replica when DB_REPLICA_HOST is set, otherwise
+# the primary; writes fail fast instead of silently landing on the primary.
+ReadSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+_engines: dict[str, Engine | AsyncEngine] = {}
+
+
+def _pool_kwargs(settings) -> dict:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _sync_connect_args(settings) -> dict:
+    if settings.db_statement_timeout_ms <= 0:
+        return {}
+    return {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+
+
+def _async_connect_args(settings) -> dict:
+    if settings.db_statement_timeout_ms <= 0:
+        return {}
+    return {"server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}}
+
+
+def init_engines() -> None:
+    """
+    Creates the engines from settings and binds the session factories.
+
+    Idempotent. Creating an engine does not connect; connections are opened
+    on first checkout. The read engine has its own pool when a replica is
+    configured, so read-heavy endpoints never starve writers.
+    """
+    if _engines:
+        return
+    settings = get_settings()
+
+    engine = create_engine(
+        settings.database_url,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        connect_args=_sync_connect_args(settings),
+        **_pool_kwargs(settings),
+    )
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        poolclass=InstrumentedAsyncQueuePool,
+        connect_args=_async_connect_args(settings),
+        **_pool_kwargs(settings),
+    )
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+    register_stats("db_pool_sync", pool_stats(engine))
+    register_stats("db_pool_async", pool_stats(async_engine.sync_engine))
+
+    read_engine = async_engine
+    if settings.replica_async_database_url:
+        read_engine = create_async_engine(
+            settings.replica_async_database_url,
+            poolclass=instrumented_pool(InstrumentedAsyncQueuePool, "replica"),
+            connect_args=_async_connect_args(settings),
+            **_pool_kwargs(settings),
+        )
+        instrument_engine(read_engine.sync_engine, "replica")
+        register_stats("db_pool_replica", pool_stats(read_engine.sync_engine))
+
+    _engines.update(sync=engine, async_=async_engine, read=read_engine)
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+    ReadSessionLocal.configure(bind=read_engine.execution_options(postgresql_readonly=True))
+
+
+def get_engine() -> Engine:
+    """Returns the sync engine, creating the engines on first use."""
+    init_engines()
+    return _engines["sync"]
+
+
+def get_async_engine() -> AsyncEngine:
+    """Returns the primary async engine, creating the engines on first use."""
+    init_engines()
+    return _engines["async_"]
+
+
+def get_read_async_engine() -> AsyncEngine:
+    """Returns the replica's async engine, or the primary's when none is configured."""
+    init_engines()
+    return _engines["read"]
+
+
+async def dispose_engines() -> None:
+    """Closes every pooled connection and unbinds the session factories."""
+    engines = list({id(e): e for e in _engines.values()}.values())
+    _engines.clear()
+    for engine in engines:
+        if isinstance(engine, AsyncEngine):
+            await engine.dispose()
+        else:
+            engine.dispose()
+    SessionLocal.configure(bind=None)
+    AsyncSessionLocal.configure(bind=None)
+    ReadSessionLocal.configure(bind=None)
@@ -1,7 +1,9 @@
 from fastapi import Depends, Header, HTTPException
 from sqlalchemy.orm import Session
-from app.db import SessionLocal
-from app.core.security import decode_token
+from app.db import SessionLocal, AsyncSessionLocal, ReadSessionLocal
+from app.core.config import get_settings
+from app.core.profiling import admin_token_matches
+from app.core.security import decode_token_cached
 
 
 def get_db():
@@ -18,11 +20,35 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Yields an async database session.
+
+    Used by `async def` endpoints so database I/O never blocks the event loop.
+    The session is closed when the endpoint is finished.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    """
+    Yields a read-only async database session.
+
+    Routed to the read replica when `DB_REPLICA_HOST` is set, otherwise to the
+    primary. Replica reads can lag the primary slightly, so use this only for
+    endpoints that tolerate it (positions, PnL, history), never before a write.
+    """
+    async with ReadSessionLocal() as db:
+        yield db
+
+
 def get_current_user_id(authorization: str = Header(default="")) -> int:
     """
     Returns the ID of the current user.
 
     This function takes an `Authorization` header as an argument and returns the ID of the user associated with the token.
+    Verified tokens are cached until they expire, so repeated requests skip signature verification.
 
     If the token is missing, invalid, or of an incorrect type, an HTTPException is raised with a status code of 401.
 
@@ -35,7 +61,7 @@ def get_current_user_id(authorization: str = Header(default="")) -> int:
 
     token = authorization.split(" ", 1)[1].strip()
     try:
-        payload = decode_token(token)
+        payload = decode_token_cached(token)
     
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -44,3 +70,14 @@ def get_current_user_id(authorization: str = Header(default="")) -> int:
         raise HTTPException(status_code=401, detail="Invalid token type")
     
     return int(payload["sub"])
+
+
+def require_admin(x_admin_token: str = Header(default="")) -> None:
+    """
+    Guards admin-only endpoints with the shared `settings.admin_token`.
+
+    :param x_admin_token: The `X-Admin-Token` header.
+    :raises HTTPException: 403 if no admin token is configured or it does not match.
+    """
+    if not admin_token_matches(get_settings().admin_token, x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -1,25 +1,108 @@
-from fastapi import FastAPI
+"""
+ASGI application factory.
+
+Nothing here touches the database or the network at import time: `create_app()`
+builds the application, and its lifespan creates the engines and shared clients
+when a worker starts serving. Schema changes are applied separately with
+`python -m app.bootstrap_db`.
+
+Run with `uvicorn app.main:app` or `uvicorn --factory app.main:create_app`.
+"""
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import Base, engine
-from app.routers import auth, market, predict, trade
+from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.profiling import ProfilingMiddleware, get_profile_store
+from app.db import dispose_engines, init_engines
+from app.core.security import shutdown_password_hasher
+from app.services.market_data import open_http_client, close_http_client
+from app.services.quote_stream import close_quote_hub
+from app.services.prefetcher import get_prefetcher, stop_prefetcher
+from app.services.order_service import get_order_executor, stop_order_executor
+from app.services.snapshot_service import get_snapshot_job, stop_snapshot_job
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Opens shared resources on startup and releases them on shutdown."""
+    settings = get_settings()
+    init_engines()
+    await open_http_client()
+    if settings.order_book_enabled:
+        await get_order_executor().start()
+    if settings.prefetch_enabled:
+        get_prefetcher().start()
+    if settings.snapshot_enabled:
+        get_snapshot_job().start()
+    try:
+        yield
+    finally:
+        await stop_snapshot_job()
+        await stop_prefetcher()
+        await stop_order_executor()
+        await close_quote_hub()
+        await close_http_client()
+        await dispose_engines()
+        shutdown_password_hasher()
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the API application: middleware, routers and the lifespan.
+
+    :return: A new application; engines and clients are opened by its lifespan.
+    """
+    from app.routers import admin, auth, market, predict, trade
 
-Base.metadata.create_all(bind=engine)
+    settings = get_settings()
+    app = FastAPI(title="Quant Trading App", lifespan=lifespan)
 
-app = FastAPI(title="Quant Trading App")
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"]
+    )
+    if settings.profiling_enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=get_profile_store(),
+            admin_token=settings.admin_token,
+            sample_rate=settings.profiling_sample_rate,
+            interval=settings.profiling_interval_seconds,
+        )
+    app.add_middleware(MetricsMiddleware)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"]
-)
+    app.include_router(auth.router)
+    app.include_router(market.router)
+    app.include_router(predict.router)
+    app.include_router(trade.router)
+    app.include_router(admin.router)
+
+    app.add_api_route("/", health, methods=["GET"])
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    return app
 
-app.include_router(auth.router)
-app.include_router(market.router)
-app.include_router(predict.router)
-app.include_router(trade.router)
 
-@app.get("/")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` builds the application on first access.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, UniqueConstraint, Numeric
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, func, UniqueConstraint, Numeric, Index
 from app.db import Base
 
 class User(Base):
@@ -25,4 +25,79 @@ class Trade(Base):
     price = Column(Numeric(12, 4), nullable=False)  # executed price
     status = Column(String(16), nullable=False, default="FILLED")
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # History reads filter by user (and optionally symbol) and walk created_at
+    # newest-first with id as the tie-breaker; both shapes are index-only scans.
+    __table_args__ = (
+        Index("ix_trades_user_symbol_created", "user_id", "symbol", "created_at", "id"),
+        Index("ix_trades_user_created", "user_id", "created_at", "id"),
+    )
+
+
+class Position(Base):
+    """Materialized net position and cost basis per (user, symbol), updated on each fill."""
+    __tablename__ = "positions"
+
+    user_id = Column(Integer, primary_key=True)
+    symbol = Column(String(16), primary_key=True)
+
+    quantity = Column(Integer, nullable=False, default=0)
+    avg_cost = Column(Numeric(18, 6), nullable=False, default=0)
+    realized_pnl = Column(Numeric(18, 4), nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class Order(Base):
+    """Resting limit or stop order; filled into a Trade when a quote crosses its trigger price."""
+    __tablename__ = "orders"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)
+
+    symbol = Column(String(16), nullable=False)
+    side = Column(String(4), nullable=False)  # "BUY" or "SELL"
+    order_type = Column(String(8), nullable=False)  # "LIMIT" or "STOP"
+    quantity = Column(Integer, nullable=False)
+    trigger_price = Column(Numeric(12, 4), nullable=False)
+
+    status = Column(String(16), nullable=False, default="OPEN")  # OPEN, FILLED, CANCELLED
+    trade_id = Column(Integer, nullable=True)
+    fill_price = Column(Numeric(12, 4), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Startup rebuilds the trigger book from the open orders only.
+    __table_args__ = (Index("ix_orders_status_symbol", "status", "symbol"),)
+
+
+class PortfolioSnapshot(Base):
+    """
+    Mark-to-market totals of one user's portfolio at one instant, written by the
+    snapshot job. The primary key doubles as the (user_id, ts) range index.
+    """
+    __tablename__ = "portfolio_snapshots"
+
+    user_id = Column(Integer, primary_key=True)
+    ts = Column(DateTime(timezone=True), primary_key=True)
+
+    market_value = Column(Float, nullable=False)  # sum of quantity * mark
+    unrealized_pnl = Column(Float, nullable=False)
+    realized_pnl = Column(Float, nullable=False)
+
+
+class Candle(Base):
+    """Locally stored OHLCV bar. The primary key doubles as the (symbol, resolution, ts) index."""
+    __tablename__ = "candles"
+
+    symbol = Column(String(16), primary_key=True)
+    resolution = Column(String(4), primary_key=True)
+    ts = Column(BigInteger, primary_key=True)  # bar open time, UNIX seconds
+
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False, default=0)
@@ -0,0 +1,41 @@
+"""
+
+Rebuild (or check) the materialized positions table from the trades table.
+
+Usage:
+    python -m app.rebuild_positions [--check] [--user-id ID]
+
+"""
+import argparse
+from app.db import Base, SessionLocal, get_engine
+from app.services.trade_service import rebuild_positions
+
+
+def main() -> int:
+    """
+    Run the rebuild and print any (user, symbol) whose stored position differed.
+
+    :return: Process exit code; 1 when `--check` finds mismatches.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true", help="report mismatches without writing")
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+
+    db = SessionLocal()
+    try:
+        mismatches = rebuild_positions(db, user_id=args.user_id, check_only=args.check)
+    finally:
+        db.close()
+
+    for m in mismatches:
+        print(f"user={m['user_id']} symbol={m['symbol']} expected={m['expected']} stored={m['stored']}")
+    print(f"{len(mismatches)} mismatched position(s){'' if args.check else ' rebuilt'}")
+
+    return 1 if args.check and mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
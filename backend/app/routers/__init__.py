@@ -1 +1 @@
-from . import auth, market, predict, trade
+"""API routers; `app.main.create_app` imports the ones it mounts."""
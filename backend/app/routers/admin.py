@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.core.profiling import get_profile_store
+from app.deps import require_admin
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+def list_profiles():
+    """
+    Lists stored request profiles, newest first.
+
+    Returns:
+        list[dict]: One entry per profile with its `id`, `size_bytes` and `created_at` (UNIX time).
+    """
+    return get_profile_store().list()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """
+    Downloads one profile as an HTML report.
+
+    Args:
+        profile_id (str): The id from the list, or from a profiled response's `X-Profile-Id` header.
+
+    Raises:
+        HTTPException: 404 if there is no such profile (it may have been rotated out).
+    """
+    path = get_profile_store().path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/html", filename=profile_id)
@@ -1,62 +1,94 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.deps import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.deps import get_async_db, get_current_user_id
 from app.models import User
 from app.schemas import UserCreate, TokenPair, LoginRequest, UserRead
-from app.core.security import hash_password, verify_password, create_token
-from app.core.config import settings
+from app.core.security import (
+    PasswordHasherBusy,
+    create_token,
+    hash_password_async,
+    password_needs_rehash,
+    revoke_token,
+    verify_password_async,
+)
+from app.core.config import get_settings
 
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserRead)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
 
     Args:
         payload (UserCreate): The user to be registered.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         UserRead: The registered user.
 
     Raises:
-        HTTPException: If the email is already registered.
+        HTTPException: If the email is already registered, or 503 if the
+            password hashing pool is saturated.
     """
-    existing_user = db.query(User).filter(User.email == payload.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    new_user = User(email=payload.email, hashed_password=hash_password(payload.password))
+    try:
+        hashed_password = await hash_password_async(payload.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+
+    new_user = User(email=payload.email, hashed_password=hashed_password)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=TokenPair)
-def login_credentials(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login_credentials(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate a user and return access and refresh tokens.
 
+    Password checks run on the dedicated hashing pool. If the stored hash was
+    made with a different bcrypt cost than configured, it is upgraded after a
+    successful login.
+
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         credentials (LoginRequest): The login request containing email and password.
 
     Returns:
         TokenPair: The access and refresh tokens.
 
     Raises:
-        HTTPException: If the email is not found or the password is incorrect.
+        HTTPException: If the email is not found or the password is incorrect,
+            or 503 if the password hashing pool is saturated.
     """
-    user = db.query(User).filter_by(email=credentials.email).first()
+    user = (await db.execute(select(User).filter_by(email=credentials.email))).scalars().first()
+
+    try:
+        valid = user is not None and await verify_password_async(credentials.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(credentials.password)
+            await db.commit()
+        except PasswordHasherBusy:
+            pass  # keep the old hash; it will be upgraded on a later login
+
+    settings = get_settings()
     access_token_expires_delta = timedelta(minutes=settings.access_token_minutes)
     refresh_token_expires_delta = timedelta(days=settings.refresh_token_days)
 
@@ -71,3 +103,20 @@ def login_credentials(credentials: LoginRequest, db: Session = Depends(get_db)):
         expires_delta=refresh_token_expires_delta
     )
     return TokenPair(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=204)
+def logout(
+    authorization: str = Header(default=""),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Revoke the caller's access token.
+
+    The token is evicted from the verified-token cache and rejected until it expires.
+
+    Args:
+        authorization (str): The `Authorization` header containing the bearer token.
+        user_id (int): The ID of the authenticated user.
+    """
+    revoke_token(authorization.split(" ", 1)[1].strip())
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Depends
-from app.services.market_data import get_latest_market_price
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from app.services import market_data
+from app.services.market_data import MarketDataError, get_latest_market_prices
+from app.services.quote_stream import Subscriber, get_quote_hub
 from app.deps import get_current_user_id
+from app.core.config import get_settings
+from app.core.security import decode_token_cached
 
 
 
@@ -18,7 +24,118 @@ async def get_latest_market_price(symbol: str, user_id: int = Depends(get_curren
     Returns:
         dict: A dictionary containing the symbol, price, timestamp, and market data source.
     """
-    quote = await get_latest_market_price(symbol)
+    quote = await market_data.get_latest_market_price(symbol)
     return {
         quote["symbol"]: quote["price"]
     }
+
+
+@router.get("/prices")
+async def latest_market_prices(
+    symbols: str = Query(..., description="Comma-separated stock symbols, e.g. AAPL,MSFT"),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Retrieves the latest market prices for several stock symbols in one request.
+
+    Args:
+        symbols (str): Comma-separated stock symbols.
+        user_id (int): The ID of the user making the request.
+
+    Returns:
+        dict: `prices` (symbol -> price) for the symbols that resolved and
+        `errors` (symbol -> message) for those that did not.
+
+    Raises:
+        HTTPException: If no symbols are given or too many are requested.
+    """
+    requested = [s for s in symbols.split(",") if s.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    max_symbols = get_settings().market_batch_max_symbols
+    if len(set(s.strip().upper() for s in requested)) > max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_symbols} symbols per request",
+        )
+
+    result = await get_latest_market_prices(requested)
+    return {
+        "prices": {symbol: quote["price"] for symbol, quote in result["quotes"].items()},
+        "errors": result["errors"],
+    }
+
+
+@router.websocket("/stream")
+async def stream_quotes(websocket: WebSocket, token: str = Query(default="")):
+    """
+    Streams live ticks for subscribed symbols over a WebSocket.
+
+    Browsers cannot set headers on WebSocket requests, so the access token is
+    passed as the `token` query parameter. Clients send
+    `{"action": "subscribe" | "unsubscribe", "symbols": [...]}` and receive
+    `{"type": "ticks", "data": [...], "dropped": n}`, where `dropped` counts
+    ticks discarded because the client fell behind.
+
+    Args:
+        websocket (WebSocket): The client connection.
+        token (str): A bearer access token.
+    """
+    try:
+        payload = decode_token_cached(token)
+    except ValueError:
+        payload = {}
+    if payload.get("type") != "access":
+        await websocket.close(code=1008, reason="Invalid token")
+        return
+
+    try:
+        hub = get_quote_hub()
+    except MarketDataError as e:
+        await websocket.close(code=1011, reason=str(e))
+        return
+
+    await websocket.accept()
+    settings = get_settings()
+    subscriber = Subscriber(max_buffer=settings.quote_stream_buffer_size)
+
+    async def send_ticks() -> None:
+        while True:
+            batch = await subscriber.next_batch()
+            await websocket.send_json({"type": "ticks", "data": batch, "dropped": subscriber.dropped})
+
+    sender = asyncio.create_task(send_ticks())
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Invalid JSON"})
+                continue
+            if not isinstance(message, dict) or not isinstance(message.get("symbols"), list):
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": 'Expected {"action": ..., "symbols": [...]}',
+                })
+                continue
+            action = message.get("action")
+            symbols = [s for s in message["symbols"] if isinstance(s, str)]
+            if action == "subscribe":
+                wanted = subscriber.symbols | {s.strip().upper() for s in symbols if s.strip()}
+                if len(wanted) > settings.quote_stream_max_symbols:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": f"At most {settings.quote_stream_max_symbols} symbols per connection",
+                    })
+                    continue
+                await hub.subscribe(subscriber, symbols)
+            elif action == "unsubscribe":
+                await hub.unsubscribe(subscriber, symbols)
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown action: {action}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        await hub.unsubscribe(subscriber)
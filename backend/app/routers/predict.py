@@ -1,9 +1,17 @@
+import time
 from fastapi import APIRouter, Depends, HTTPException
-from app.schemas import PredictRequest, PredictResponse
+from app.schemas import (
+    PredictRequest,
+    PredictResponse,
+    PredictBatchRequest,
+    PredictBatchItem,
+    PredictBatchResponse,
+)
 from app.deps import get_current_user_id
+from app.core.config import get_settings
 
-from app.services.predictor import predict_return_and_confidence
-from app.services.market_data import get_recent_market_features
+from app.services.predictor import predict_return_and_confidence, predict_batch
+from app.services.market_data import get_recent_market_features, get_recent_market_features_batch
 
 router = APIRouter(prefix="/api/predict", tags=["predict"])
 
@@ -30,7 +38,7 @@ async def predict_endpoint(
         (symbol, horizon_minutes, predicted_return, confidence)
     """
     features = await get_recent_market_features(symbol)
-    pred, conf = await predict_return_and_confidence(features, horizon_minutes)
+    pred, conf = predict_return_and_confidence(features, horizon_minutes)
 
     return PredictResponse(
         symbol=symbol.upper(),
@@ -38,3 +46,73 @@ async def predict_endpoint(
         predicted_return=pred,
         confidence=conf,
     )
+
+
+@router.post("/batch", response_model=PredictBatchResponse)
+async def predict_batch_endpoint(
+    payload: PredictBatchRequest,
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Predict expected returns and confidence for many symbols and horizons at once.
+
+    Features for all distinct symbols are gathered concurrently, then every
+    (symbol, horizon) pair is scored in one vectorized pass. A symbol whose
+    features cannot be computed yields an item with `error` set for each horizon.
+
+    Parameters
+    ----------
+    payload : PredictBatchRequest
+        Symbols and horizons (minutes) to score.
+
+    Returns
+    -------
+    PredictBatchResponse
+        One item per (symbol, horizon), plus feature, scoring and total timings in ms.
+    """
+    started = time.perf_counter()
+
+    symbols = list(dict.fromkeys(s.strip().upper() for s in payload.symbols if s.strip()))
+    horizons = list(dict.fromkeys(payload.horizons))
+    max_items = get_settings().predict_batch_max_items
+    if len(symbols) * len(horizons) > max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_items} (symbol, horizon) pairs per request",
+        )
+
+    gathered = await get_recent_market_features_batch(symbols)
+    features_done = time.perf_counter()
+
+    scored = [s for s in symbols if s in gathered["features"]]
+    pred, conf = predict_batch(
+        [gathered["features"][s]["returns_30m"] for s in scored],
+        [gathered["features"][s]["volatility"] for s in scored],
+        horizons,
+    )
+    scoring_done = time.perf_counter()
+
+    row = {symbol: i for i, symbol in enumerate(scored)}
+    items = []
+    for symbol in symbols:
+        for j, horizon in enumerate(horizons):
+            if symbol in row:
+                items.append(PredictBatchItem(
+                    symbol=symbol,
+                    horizon_minutes=horizon,
+                    predicted_return=float(pred[row[symbol], j]),
+                    confidence=float(conf[row[symbol], j]),
+                ))
+            else:
+                items.append(PredictBatchItem(
+                    symbol=symbol,
+                    horizon_minutes=horizon,
+                    error=gathered["errors"].get(symbol, "No features available"),
+                ))
+
+    return PredictBatchResponse(
+        items=items,
+        features_ms=(features_done - started) * 1000.0,
+        scoring_ms=(scoring_done - features_done) * 1000.0,
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
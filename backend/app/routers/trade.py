@@ -1,14 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.deps import get_db, get_current_user_id
-from app.schemas import TradeCreate, TradeRead, PositionRead, PnLRead
+from app.deps import get_async_db, get_current_user_id, get_read_db
+from app.core.config import get_settings
+from app.schemas import (
+    TradeCreate,
+    TradeRead,
+    TradeBatchRequest,
+    TradeBatchResponse,
+    OrderCreate,
+    OrderRead,
+    TradeHistoryPage,
+    EquityCurve,
+    PositionRead,
+    PnLRead,
+)
 from app.services.trade_service import (
     execute_trade,
+    execute_trades,
+    get_trade_history,
+    iter_trade_history,
     get_positions,
     get_pnl,
 )
 from app.services.market_data import MarketDataError
+from app.services.snapshot_service import get_equity_curve
+from app.services.order_service import (
+    OrderNotFound,
+    OrderNotOpen,
+    cancel_order,
+    create_order,
+    list_orders,
+)
 
 router = APIRouter(prefix="/api/trade", tags=["trade"])
 
@@ -16,7 +45,7 @@ router = APIRouter(prefix="/api/trade", tags=["trade"])
 @router.post("", response_model=TradeRead)
 async def place_trade(
     payload: TradeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int = Depends(get_current_user_id),
 ):
     try:
@@ -32,12 +61,209 @@ async def place_trade(
         raise HTTPException(status_code=502, detail=str(e))
 
 
+@router.post("/batch", response_model=TradeBatchResponse)
+async def place_trades(
+    payload: TradeBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Places several paper trades in a single transaction.
+
+    Args:
+        payload: The orders, in execution order, and the batch mode.
+            `all_or_nothing` fills every order or none; `best_effort` fills
+            the orders whose symbol could be quoted and reports the rest.
+        db: The database session.
+        user_id: The authenticated user.
+
+    Returns:
+        The filled trades and any rejected orders (by index in `orders`).
+
+    Raises:
+        HTTPException: 400 if the batch is too large; 502 if an
+            all-or-nothing batch could not be fully quoted.
+    """
+    max_orders = get_settings().trade_batch_max_orders
+    if len(payload.orders) > max_orders:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_orders} orders per request",
+        )
+    try:
+        trades, rejected = await execute_trades(
+            db=db,
+            user_id=user_id,
+            orders=[order.model_dump() for order in payload.orders],
+            all_or_nothing=payload.mode == "all_or_nothing",
+        )
+    except MarketDataError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return {"trades": trades, "rejected": rejected}
+
+
+@router.get("/history", response_model=TradeHistoryPage)
+async def history(
+    symbol: str | None = Query(default=None, max_length=16),
+    start: datetime | None = Query(default=None, description="inclusive lower bound on created_at"),
+    end: datetime | None = Query(default=None, description="exclusive upper bound on created_at"),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    limit: int = Query(default=100, gt=0),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Returns the user's trades newest first, one page at a time.
+
+    Args:
+        symbol: Only trades in this symbol.
+        start: Only trades at or after this time.
+        end: Only trades before this time.
+        cursor: Continue after the previous page.
+        limit: Page size, at most `settings.trade_history_max_page_size`.
+
+    Returns:
+        The page and `next_cursor`, which is null on the last page.
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid or the page size too large.
+    """
+    max_page_size = get_settings().trade_history_max_page_size
+    if limit > max_page_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_page_size} trades per page",
+        )
+    try:
+        rows, next_cursor = await get_trade_history(db, user_id, symbol, start, end, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+EXPORT_FIELDS = ("id", "symbol", "side", "quantity", "price", "status", "created_at")
+
+
+def format_export_chunk(rows, fmt: str, header: bool = False) -> str:
+    """Serializes a chunk of history rows as CSV or NDJSON lines."""
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({
+                "id": r.id,
+                "symbol": r.symbol,
+                "side": r.side,
+                "quantity": r.quantity,
+                "price": float(r.price),
+                "status": r.status,
+                "created_at": r.created_at.isoformat(),
+            }) + "\n"
+            for r in rows
+        )
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(
+        (r.id, r.symbol, r.side, r.quantity, r.price, r.status, r.created_at.isoformat())
+        for r in rows
+    )
+    return buf.getvalue()
+
+
+@router.get("/history/export")
+async def export_history(
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+    symbol: str | None = Query(default=None, max_length=16),
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Streams the user's full trade history, oldest first, as CSV or NDJSON.
+
+    Rows are read from a server-side cursor in chunks of
+    `settings.trade_export_chunk_rows` and written as they arrive, so memory
+    use stays constant regardless of history size.
+    """
+    async def body():
+        if format == "csv":
+            yield format_export_chunk([], format, header=True)
+        async for rows in iter_trade_history(user_id, symbol, start, end):
+            yield format_export_chunk(rows, format)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"trades.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/orders", response_model=OrderRead)
+async def place_order(
+    payload: OrderCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Rests a limit or stop order; it fills when a quote crosses its trigger price.
+
+    Args:
+        payload: The order. BUY LIMIT and SELL STOP trigger at or below
+            `trigger_price`; SELL LIMIT and BUY STOP at or above it.
+        db: The database session.
+        user_id: The authenticated user.
+
+    Returns:
+        The open order.
+    """
+    return await create_order(
+        db=db,
+        user_id=user_id,
+        symbol=payload.symbol,
+        side=payload.side,
+        order_type=payload.order_type,
+        quantity=payload.quantity,
+        trigger_price=payload.trigger_price,
+    )
+
+
+@router.get("/orders", response_model=list[OrderRead])
+async def orders(
+    status: Literal["OPEN", "FILLED", "CANCELLED"] | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    return await list_orders(db, user_id, status)
+
+
+@router.delete("/orders/{order_id}", response_model=OrderRead)
+async def cancel(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Cancels an open order.
+
+    Raises:
+        HTTPException: 404 if the order does not exist; 409 if it is no longer open.
+    """
+    try:
+        return await cancel_order(db, user_id, order_id)
+    except OrderNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except OrderNotOpen as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 @router.get("/positions", response_model=list[PositionRead])
-def positions(
-    db: Session = Depends(get_db),
+async def positions(
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
-    positions = get_positions(db, user_id)
+    positions = await get_positions(db, user_id)
     return [
         PositionRead(symbol=s, quantity=q)
         for s, q in positions.items()
@@ -47,7 +273,41 @@ def positions(
 
 @router.get("/pnl", response_model=list[PnLRead])
 async def pnl(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     return await get_pnl(db, user_id)
+
+
+@router.get("/equity-curve", response_model=EquityCurve)
+async def equity_curve(
+    start: datetime | None = Query(default=None, description="inclusive lower bound on snapshot time"),
+    end: datetime | None = Query(default=None, description="exclusive upper bound on snapshot time"),
+    points: int | None = Query(default=None, ge=3),
+    method: Literal["lttb", "minmax"] = Query(default="lttb"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Returns the user's portfolio PnL over time from periodic snapshots.
+
+    Args:
+        start: Only snapshots at or after this time.
+        end: Only snapshots before this time.
+        points: Maximum points to return, at most `settings.equity_curve_max_points`.
+        method: "lttb" keeps the curve's shape; "minmax" keeps every bucket's
+            high and low, so no spike or drawdown is lost.
+
+    Returns:
+        The downsampled points and how many snapshots they were drawn from.
+
+    Raises:
+        HTTPException: 400 if more points are requested than allowed.
+    """
+    max_points = get_settings().equity_curve_max_points
+    if points is not None and points > max_points:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_points} points per curve",
+        )
+    return await get_equity_curve(db, user_id, start, end, points, method)
@@ -0,0 +1,93 @@
+"""
+
+Backtest the predictor over stored candles.
+
+Usage:
+    python -m app.run_backtest --start 2025-01-01 --end 2025-12-31 [--symbols AAPL,MSFT]
+        [--resolution 1] [--horizon 30] [--threshold 0.0] [--quantity 1]
+        [--min-confidence 0.0] [--workers N] [--output results.json]
+
+Without --symbols every symbol stored at the resolution is tested.
+
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.db import SessionLocal, init_engines
+from app.models import Candle
+from app.services.backtest import run_backtest
+
+
+def _parse_date(value: str) -> int:
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+
+
+def main() -> int:
+    """
+    Run the backtest and print one line per symbol plus a summary.
+
+    :return: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="start date (ISO, UTC)")
+    parser.add_argument("--end", required=True, help="end date (ISO, UTC, inclusive)")
+    parser.add_argument("--symbols", default="", help="comma-separated symbols (default: all stored)")
+    parser.add_argument("--resolution", default="1", choices=["1"], help="candle resolution (1-minute only)")
+    parser.add_argument("--horizon", type=int, default=30, help="prediction horizon in minutes")
+    parser.add_argument("--threshold", type=float, default=0.0, help="minimum |predicted return| to trade")
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    parser.add_argument("--output", default=None, help="write full results as JSON")
+    args = parser.parse_args()
+
+    from_ts = _parse_date(args.start)
+    to_ts = _parse_date(args.end) + 24 * 60 * 60 - 1
+
+    init_engines()
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    if not symbols:
+        with SessionLocal() as db:
+            symbols = list(db.execute(
+                select(Candle.symbol).where(Candle.resolution == args.resolution).distinct()
+            ).scalars())
+    if not symbols:
+        print("No symbols to backtest")
+        return 1
+
+    started = time.perf_counter()
+    results = run_backtest(
+        symbols,
+        from_ts,
+        to_ts,
+        resolution=args.resolution,
+        workers=args.workers,
+        horizon_minutes=args.horizon,
+        threshold=args.threshold,
+        quantity=args.quantity,
+        min_confidence=args.min_confidence,
+    )
+    elapsed = time.perf_counter() - started
+
+    for symbol, r in results["symbols"].items():
+        print(
+            f"{symbol:<8} bars={r['bars']:>7} trades={r['trades']:>6} "
+            f"return={r['total_return']:+.4f} sharpe={r['sharpe']:+.2f} "
+            f"max_dd={r['max_drawdown']:.4f} hit_rate={r['hit_rate']:.3f}"
+        )
+    print(json.dumps(results["summary"], indent=2))
+    print(f"{len(symbols)} symbol(s) in {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Annotated, Literal
 from pydantic import BaseModel, Field, EmailStr
 
 
@@ -32,10 +34,30 @@ class PredictRequest(BaseModel):
 class PredictResponse(BaseModel):
     symbol: str
     horizon_minutes: int
-    predicted_price: float
+    predicted_return: float
     confidence: float
 
 
+class PredictBatchRequest(BaseModel):
+    symbols: list[str] = Field(min_length=1)
+    horizons: list[Annotated[int, Field(gt=0)]] = Field(default_factory=lambda: [30], min_length=1)
+
+
+class PredictBatchItem(BaseModel):
+    symbol: str
+    horizon_minutes: int
+    predicted_return: float | None = None
+    confidence: float | None = None
+    error: str | None = None
+
+
+class PredictBatchResponse(BaseModel):
+    items: list[PredictBatchItem]
+    features_ms: float
+    scoring_ms: float
+    elapsed_ms: float
+
+
 from pydantic import BaseModel, Field
 
 class TradeCreate(BaseModel):
@@ -54,6 +76,47 @@ class TradeRead(BaseModel):
     class Config:
         from_attributes = True
 
+class TradeHistoryRead(TradeRead):
+    created_at: datetime
+
+class TradeHistoryPage(BaseModel):
+    items: list[TradeHistoryRead]
+    next_cursor: str | None = None
+
+class TradeBatchRequest(BaseModel):
+    orders: list[TradeCreate] = Field(min_length=1)
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+
+class TradeBatchRejection(BaseModel):
+    index: int
+    symbol: str
+    error: str
+
+class TradeBatchResponse(BaseModel):
+    trades: list[TradeRead]
+    rejected: list[TradeBatchRejection] = []
+
+class OrderCreate(BaseModel):
+    symbol: str = Field(min_length=1, max_length=16)
+    side: str = Field(pattern="^(BUY|SELL)$")
+    order_type: str = Field(pattern="^(LIMIT|STOP)$")
+    quantity: int = Field(gt=0)
+    trigger_price: float = Field(gt=0)
+
+class OrderRead(BaseModel):
+    id: int
+    symbol: str
+    side: str
+    order_type: str
+    quantity: int
+    trigger_price: float
+    status: str
+    trade_id: int | None = None
+    fill_price: float | None = None
+
+    class Config:
+        from_attributes = True
+
 class PositionRead(BaseModel):
     symbol: str
     quantity: int
@@ -62,5 +125,17 @@ class PnLRead(BaseModel):
     symbol: str
     quantity: int
     avg_entry: float
-    last_price: float
-    unrealized_pnl: float
+    last_price: float | None
+    unrealized_pnl: float | None
+    realized_pnl: float = 0.0
+    stale: bool = False
+
+class EquityPoint(BaseModel):
+    ts: datetime
+    pnl: float  # realized + unrealized
+    market_value: float
+
+class EquityCurve(BaseModel):
+    points: list[EquityPoint]
+    method: str
+    source_points: int  # snapshots in the range before downsampling
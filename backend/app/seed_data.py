@@ -4,7 +4,7 @@ Seed initial data for local development and testing.
 
 """
 from sqlalchemy.orm import Session
-from app.db import Base, engine, SessionLocal
+from app.db import Base, SessionLocal, get_engine
 from app.models import User
 from app.core.security import hash_password
 
@@ -14,7 +14,7 @@ def seed_initial_users(db: Session) -> None:
 
     :param db: The database session.
     """
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     db.query(User).delete()  # Clear existing data
 
     initial_users_data = [
@@ -35,6 +35,7 @@ def seed_initial_users(db: Session) -> None:
 
 
 if __name__ == "__main__":
+    get_engine()
     db = SessionLocal()
     try:
         seed_initial_users(db)
@@ -0,0 +1,196 @@
+"""
+Vectorized backtesting of the predictor over stored candles.
+
+Each bar's features are computed with the feature engine and scored with the
+same predictor used by the live API. The strategy holds +quantity when the
+predicted return exceeds `threshold`, -quantity when it is below -threshold
+and is flat otherwise; every change of position is filled at that bar's close
+as a BUY or SELL of the difference, exactly as `execute_trade` would fill it.
+Symbols are independent, so a run is spread across CPU cores with a process pool.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.services.features import VOLATILITY_WINDOW, rolling_volatility, window_returns
+from app.services.predictor import predict_batch
+from app.services.trade_service import apply_fill
+
+# 252 sessions x 390 one-minute bars (US equities regular hours).
+BARS_PER_YEAR_1M = 252 * 390
+
+
+def backtest_series(
+    closes,
+    horizon_minutes: int = 30,
+    threshold: float = 0.0,
+    quantity: int = 1,
+    min_confidence: float = 0.0,
+    bars_per_year: float = BARS_PER_YEAR_1M,
+) -> dict:
+    """
+    Backtests one symbol's close series.
+
+    Feature windows and the horizon are counted in bars, so the series must be
+    1-minute bars.
+
+    :param closes: 1-minute close prices, oldest first.
+    :param horizon_minutes: Horizon passed to the predictor and used for the hit rate.
+    :param threshold: Minimum absolute predicted return to take a position.
+    :param quantity: Shares held while in a position.
+    :param min_confidence: Minimum predictor confidence to take a position.
+    :param bars_per_year: Annualization factor for the Sharpe ratio.
+    :return: Summary statistics: total_return, sharpe, max_drawdown, hit_rate,
+        trades, signals, pnl, realized_pnl, final_position, bars.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    n = closes.shape[0]
+    if n < 2:
+        return _empty_result(n)
+
+    returns_30m = window_returns(closes, 30)
+    volatility = rolling_volatility(closes, VOLATILITY_WINDOW)
+    pred, conf = predict_batch(returns_30m, volatility, [horizon_minutes])
+    pred, conf = pred[:, 0], conf[:, 0]
+
+    # The predictor substitutes defaults for NaN features; no position until warmed up.
+    warm = ~(np.isnan(returns_30m) | np.isnan(volatility)) & (conf >= min_confidence)
+    direction = np.where(warm & (pred > threshold), 1, np.where(warm & (pred < -threshold), -1, 0))
+    position = direction * quantity
+
+    # Position decided at bar t is held over (t, t + 1].
+    bar_returns = closes[1:] / closes[:-1] - 1.0
+    strategy_returns = direction[:-1] * bar_returns
+    pnl = float(np.sum(position[:-1] * np.diff(closes)))
+
+    equity = np.cumprod(1.0 + strategy_returns)
+    peaks = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+    max_drawdown = float(np.max(1.0 - equity / peaks)) if equity.size else 0.0
+
+    std = float(np.std(strategy_returns, ddof=1)) if strategy_returns.size > 1 else 0.0
+    sharpe = float(np.mean(strategy_returns) / std * math.sqrt(bars_per_year)) if std > 0 else 0.0
+
+    forward = np.full(n, np.nan)
+    if n > horizon_minutes:
+        forward[:-horizon_minutes] = closes[horizon_minutes:] / closes[:-horizon_minutes] - 1.0
+    scored = (direction != 0) & ~np.isnan(forward)
+    hits = np.sign(forward[scored]) == direction[scored]
+    hit_rate = float(np.mean(hits)) if hits.size else 0.0
+
+    # Replay the fills through the live ledger for realized PnL.
+    changes = np.flatnonzero(np.diff(np.concatenate(([0], position))))
+    held, avg_cost, realized = 0, 0.0, 0.0
+    for i in changes:
+        delta = int(position[i]) - held
+        side = "BUY" if delta > 0 else "SELL"
+        held, avg_cost, realized = apply_fill(held, avg_cost, realized, side, abs(delta), float(closes[i]))
+
+    return {
+        "bars": int(n),
+        "signals": int(np.count_nonzero(direction)),
+        "trades": int(changes.size),
+        "total_return": float(equity[-1] - 1.0),
+        "sharpe": sharpe,
+        "max_drawdown": max_drawdown,
+        "hit_rate": hit_rate,
+        "pnl": pnl,
+        "realized_pnl": float(realized),
+        "final_position": int(held),
+    }
+
+
+def _empty_result(n: int) -> dict:
+    return {
+        "bars": int(n),
+        "signals": 0,
+        "trades": 0,
+        "total_return": 0.0,
+        "sharpe": 0.0,
+        "max_drawdown": 0.0,
+        "hit_rate": 0.0,
+        "pnl": 0.0,
+        "realized_pnl": 0.0,
+        "final_position": 0,
+    }
+
+
+# -------------------------
+# Multi-symbol runs
+# -------------------------
+
+def _init_worker() -> None:
+    # Connections inherited from the parent must not be reused after fork.
+    from app.db import get_engine
+    get_engine().dispose(close=False)
+
+
+def _backtest_symbol_job(symbol: str, resolution: str, from_ts: int, to_ts: int, params: dict) -> tuple[str, dict]:
+    from app.db import SessionLocal
+    from app.services.candle_store import load_candle_arrays
+
+    with SessionLocal() as db:
+        _, closes, _ = load_candle_arrays(db, symbol, resolution, from_ts, to_ts)
+    return symbol, backtest_series(closes, **params)
+
+
+def run_backtest(
+    symbols: list[str],
+    from_ts: int,
+    to_ts: int,
+    resolution: str = "1",
+    workers: int | None = None,
+    **params,
+) -> dict:
+    """
+    Backtests many symbols from the candle store across a process pool.
+
+    Each worker loads its own symbol's candles, so database reads are
+    parallelized along with the computation.
+
+    :param symbols: Symbols to test.
+    :param from_ts: Start of the range (UNIX seconds, inclusive).
+    :param to_ts: End of the range (UNIX seconds, inclusive).
+    :param resolution: Candle resolution; only "1" is supported.
+    :param workers: Process count (defaults to the CPU count).
+    :param params: Passed to `backtest_series`.
+    :return: `symbols` (symbol -> result) and a `summary` across symbols.
+    :raises ValueError: If the resolution is not 1-minute.
+    """
+    if resolution != "1":
+        raise ValueError(
+            f"Backtests run on 1-minute candles only (the predictor's features and "
+            f"horizon are in minutes), not resolution {resolution}"
+        )
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    workers = workers or os.cpu_count() or 1
+
+    results: dict[str, dict] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(_backtest_symbol_job, symbol, resolution, from_ts, to_ts, params)
+            for symbol in symbols
+        ]
+        for future in futures:
+            symbol, result = future.result()
+            results[symbol] = result
+
+    return {"symbols": results, "summary": summarize(results)}
+
+
+def summarize(results: dict[str, dict]) -> dict:
+    """Aggregates per-symbol results (equal-weighted averages, summed PnL)."""
+    active = [r for r in results.values() if r["bars"] > 1]
+    if not active:
+        return {"symbols": len(results), "pnl": 0.0}
+    return {
+        "symbols": len(results),
+        "bars": sum(r["bars"] for r in active),
+        "trades": sum(r["trades"] for r in active),
+        "pnl": sum(r["pnl"] for r in active),
+        "mean_total_return": float(np.mean([r["total_return"] for r in active])),
+        "mean_sharpe": float(np.mean([r["sharpe"] for r in active])),
+        "worst_drawdown": float(np.max([r["max_drawdown"] for r in active])),
+        "mean_hit_rate": float(np.mean([r["hit_rate"] for r in active])),
+    }
@@ -0,0 +1,158 @@
+"""
+Local OHLCV store backed by the `candles` table.
+
+Upstream candles are fetched incrementally: only bars at or after the newest
+stored bar are requested, and windows are served from the store.
+"""
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Candle
+
+RESOLUTION_SECONDS = {
+    "1": 60,
+    "5": 5 * 60,
+    "15": 15 * 60,
+    "30": 30 * 60,
+    "60": 60 * 60,
+    "D": 24 * 60 * 60,
+    "W": 7 * 24 * 60 * 60,
+}
+
+_UPSERT_CHUNK_ROWS = 2000
+
+
+def resolution_seconds(resolution: str) -> int:
+    """
+    Returns the bar length in seconds for a Finnhub resolution code.
+
+    :raises ValueError: If the resolution is not supported by the store.
+    """
+    try:
+        return RESOLUTION_SECONDS[resolution]
+    except KeyError as e:
+        raise ValueError(f"Unsupported candle resolution: {resolution}") from e
+
+
+async def latest_candle_ts(db: AsyncSession, symbol: str, resolution: str) -> int | None:
+    """
+    Returns the open time of the newest stored bar, or None if there is none.
+    """
+    return (await db.execute(
+        select(func.max(Candle.ts))
+        .where(Candle.symbol == symbol, Candle.resolution == resolution)
+    )).scalar()
+
+
+async def store_candles(db: AsyncSession, symbol: str, resolution: str, data: dict) -> int:
+    """
+    Upserts bars in Finnhub array form (`t`, `o`, `h`, `l`, `c`, `v`).
+
+    Existing bars are overwritten, so a bar that was still forming when it was
+    first stored is corrected by the next fetch. The caller commits.
+
+    :return: Number of bars written.
+    """
+    rows = [
+        {
+            "symbol": symbol,
+            "resolution": resolution,
+            "ts": int(t),
+            "open": float(o),
+            "high": float(h),
+            "low": float(l),
+            "close": float(c),
+            "volume": float(v),
+        }
+        for t, o, h, l, c, v in zip(
+            data["t"], data["o"], data["h"], data["l"], data["c"], data.get("v") or [0] * len(data["t"])
+        )
+    ]
+    # Keep each statement well under Postgres' bind-parameter limit.
+    for start in range(0, len(rows), _UPSERT_CHUNK_ROWS):
+        stmt = pg_insert(Candle).values(rows[start:start + _UPSERT_CHUNK_ROWS])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["symbol", "resolution", "ts"],
+                set_={
+                    "open": stmt.excluded.open,
+                    "high": stmt.excluded.high,
+                    "low": stmt.excluded.low,
+                    "close": stmt.excluded.close,
+                    "volume": stmt.excluded.volume,
+                },
+            )
+        )
+    return len(rows)
+
+
+async def load_candles(
+    db: AsyncSession,
+    symbol: str,
+    resolution: str,
+    from_ts: int,
+    to_ts: int,
+) -> dict:
+    """
+    Loads stored bars with `from_ts <= ts <= to_ts`, oldest first.
+
+    :return: Finnhub-style arrays: `t`, `o`, `h`, `l`, `c`, `v`.
+    """
+    rows = (await db.execute(
+        select(Candle.ts, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume)
+        .where(
+            Candle.symbol == symbol,
+            Candle.resolution == resolution,
+            Candle.ts >= from_ts,
+            Candle.ts <= to_ts,
+        )
+        .order_by(Candle.ts)
+    )).all()
+
+    return {
+        "t": [r.ts for r in rows],
+        "o": [r.open for r in rows],
+        "h": [r.high for r in rows],
+        "l": [r.low for r in rows],
+        "c": [r.close for r in rows],
+        "v": [r.volume for r in rows],
+    }
+
+
+def load_candle_arrays(
+    db: Session,
+    symbol: str,
+    resolution: str,
+    from_ts: int,
+    to_ts: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Loads stored bars with `from_ts <= ts <= to_ts` as NumPy arrays, oldest first.
+
+    Synchronous, for batch jobs (e.g. backtests) running outside the event loop.
+
+    :return: (timestamps, closes, volumes).
+    """
+    rows = db.execute(
+        select(Candle.ts, Candle.close, Candle.volume)
+        .where(
+            Candle.symbol == symbol,
+            Candle.resolution == resolution,
+            Candle.ts >= from_ts,
+            Candle.ts <= to_ts,
+        )
+        .order_by(Candle.ts)
+    ).all()
+
+    if not rows:
+        empty = np.empty(0, dtype=np.float64)
+        return np.empty(0, dtype=np.int64), empty, empty.copy()
+    ts, closes, volumes = zip(*rows)
+    return (
+        np.fromiter(ts, dtype=np.int64, count=len(rows)),
+        np.fromiter(closes, dtype=np.float64, count=len(rows)),
+        np.fromiter(volumes, dtype=np.float64, count=len(rows)),
+    )
@@ -0,0 +1,72 @@
+"""
+Server-side downsampling for chart series.
+
+Both functions return the indices of the points to keep, in order, so the
+caller can slice every column of a series the same way. The first and last
+points are always kept.
+"""
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: keeps the visual shape of a line.
+
+    The interior points are split into `points - 2` equal buckets. From each
+    bucket it keeps the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+
+    :param x: Strictly increasing x values (e.g. epoch seconds).
+    :param y: Values, same length as `x`.
+    :param points: Number of points to keep; at least 3.
+    :return: Indices into `x`/`y`; all of them when the series is short enough.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    size = x.size
+    if points >= size or points < 3:
+        return np.arange(size)
+
+    # Bucket i spans [edges[i], edges[i + 1]); strictly increasing because size > points.
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+    keep = np.empty(points, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+
+    anchor = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < edges.size else size
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        keep[i + 1] = anchor
+    return keep
+
+
+def minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Min/max bucketing: keeps every bucket's extremes, so spikes and drawdowns survive.
+
+    :param y: Values.
+    :param points: Upper bound on the number of points to keep; below 4 only the
+        endpoints are kept.
+    :return: Indices into `y`; all of them when the series is short enough.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    size = y.size
+    if points >= size or points < 4:
+        return np.arange(size) if points >= size else np.array([0, size - 1])
+
+    # Interior buckets only, so the endpoints never push the count past `points`.
+    buckets = (points - 2) // 2
+    edges = np.linspace(1, size - 1, buckets + 1).astype(np.int64)
+    keep = {0, size - 1}
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        segment = y[lo:hi]
+        keep.add(lo + int(np.argmin(segment)))
+        keep.add(lo + int(np.argmax(segment)))
+    return np.fromiter(sorted(keep), dtype=np.int64)
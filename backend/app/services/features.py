@@ -0,0 +1,236 @@
+"""
+Vectorized feature engine.
+
+Every function accepts a 1-D series or a 2-D matrix with one row per symbol
+and works along the last (time) axis. Rolling outputs keep the input shape
+and are NaN until the window is full, so the latest value of any indicator is
+`out[..., -1]`. Bars are assumed to be 1 minute, matching the `_m` suffixes
+used by the predictor.
+"""
+import math
+import numpy as np
+
+RETURN_WINDOWS = (5, 15, 30, 60)
+VOLATILITY_WINDOW = 30
+EMA_SPANS = (12, 26)
+RSI_PERIOD = 14
+ZSCORE_WINDOW = 30
+VWAP_WINDOW = 30
+
+
+def _as_float_array(x) -> np.ndarray:
+    arr = np.asarray(x, dtype=np.float64)
+    if arr.ndim not in (1, 2):
+        raise ValueError("Expected a 1-D series or a 2-D (symbols x bars) matrix")
+    return arr
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan, dtype=np.float64)
+
+
+def simple_returns(closes) -> np.ndarray:
+    """One-bar returns; the first bar is NaN."""
+    closes = _as_float_array(closes)
+    out = _nan_like(closes)
+    out[..., 1:] = closes[..., 1:] / closes[..., :-1] - 1.0
+    return out
+
+
+def window_returns(closes, window: int) -> np.ndarray:
+    """Return over the last `window` bars: close[t] / close[t - window] - 1."""
+    closes = _as_float_array(closes)
+    out = _nan_like(closes)
+    if closes.shape[-1] > window:
+        out[..., window:] = closes[..., window:] / closes[..., :-window] - 1.0
+    return out
+
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Sums over each full trailing window, via one cumulative sum (O(n) for any window)."""
+    csum = np.cumsum(x, axis=-1)
+    sums = csum[..., window - 1:].copy()
+    sums[..., 1:] -= csum[..., :-window]
+    return sums
+
+
+def rolling_mean(x, window: int) -> np.ndarray:
+    """Rolling mean over `window` bars."""
+    x = _as_float_array(x)
+    out = _nan_like(x)
+    if x.shape[-1] >= window:
+        out[..., window - 1:] = _window_sums(x, window) / window
+    return out
+
+
+def rolling_std(x, window: int, ddof: int = 1) -> np.ndarray:
+    """
+    Rolling standard deviation over `window` bars, in O(n) for any window.
+
+    Uses running sums of x and x**2 after shifting the series by its first
+    value, which keeps cancellation error far below indicator precision.
+    Windows that contain a NaN are NaN.
+    """
+    x = _as_float_array(x)
+    out = _nan_like(x)
+    if x.shape[-1] < window:
+        return out
+
+    nan_mask = np.isnan(x)
+    centered = np.where(nan_mask, 0.0, x - np.nan_to_num(x[..., :1]))
+    s1 = _window_sums(centered, window)
+    s2 = _window_sums(centered * centered, window)
+    var = np.clip((s2 - s1 * s1 / window) / (window - ddof), 0.0, None)
+    has_nan = _window_sums(nan_mask.astype(np.float64), window) > 0
+
+    out[..., window - 1:] = np.where(has_nan, np.nan, np.sqrt(var))
+    return out
+
+
+def rolling_volatility(closes, window: int = VOLATILITY_WINDOW) -> np.ndarray:
+    """Sample standard deviation of one-bar returns over the last `window` returns."""
+    return rolling_std(simple_returns(closes), window)
+
+
+def _exponential_smoothing(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Computes y[t] = alpha * x[t] + (1 - alpha) * y[t - 1], seeded with y[0] = x[0].
+
+    The recurrence is solved in closed form with cumulative sums over blocks
+    short enough that the (1 - alpha) ** -k scale factors stay well inside
+    float64 precision, so the only Python-level loop is over blocks.
+    """
+    decay = 1.0 - alpha
+    n = x.shape[-1]
+    out = np.empty_like(x)
+    if n == 0:
+        return out
+    if decay <= 0.0:
+        out[...] = x
+        return out
+
+    block = max(1, int(6 * math.log(10) / -math.log(decay)))
+    carry = x[..., 0]
+    start = 0
+    while start < n:
+        stop = min(start + block, n)
+        k = np.arange(1, stop - start + 1, dtype=np.float64)
+        scale = decay ** k
+        chunk = x[..., start:stop]
+        if start == 0:
+            # Seed: y[0] = x[0], so the first block starts from carry with no x[0] term.
+            inner = np.cumsum(chunk[..., 1:] * (alpha / scale[:-1]), axis=-1)
+            out[..., 0] = carry
+            out[..., 1:stop] = scale[:-1] * (carry[..., None] + inner)
+        else:
+            inner = np.cumsum(chunk * (alpha / scale), axis=-1)
+            out[..., start:stop] = scale * (carry[..., None] + inner)
+        carry = out[..., stop - 1]
+        start = stop
+    return out
+
+
+def ema(x, span: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first bar."""
+    x = _as_float_array(x)
+    return _exponential_smoothing(x, 2.0 / (span + 1.0))
+
+
+def rsi(closes, period: int = RSI_PERIOD) -> np.ndarray:
+    """
+    Relative Strength Index using Wilder's smoothing (alpha = 1 / period).
+
+    The averages are seeded with the first change rather than an initial SMA;
+    values before `period` changes have accumulated are NaN.
+    """
+    closes = _as_float_array(closes)
+    out = _nan_like(closes)
+    if closes.shape[-1] <= period:
+        return out
+
+    delta = np.diff(closes, axis=-1)
+    gains = np.clip(delta, 0.0, None)
+    losses = np.clip(-delta, 0.0, None)
+    avg_gain = _exponential_smoothing(gains, 1.0 / period)
+    avg_loss = _exponential_smoothing(losses, 1.0 / period)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        values = 100.0 - 100.0 / (1.0 + rs)
+    values = np.where(avg_loss == 0.0, np.where(avg_gain == 0.0, 50.0, 100.0), values)
+
+    out[..., 1:] = values
+    out[..., :period] = np.nan
+    return out
+
+
+def zscore(x, window: int = ZSCORE_WINDOW) -> np.ndarray:
+    """(x - rolling mean) / rolling std over `window` bars."""
+    x = _as_float_array(x)
+    std = rolling_std(x, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0.0, (x - rolling_mean(x, window)) / std, 0.0 * std)
+
+
+def vwap(closes, volumes, window: int | None = VWAP_WINDOW) -> np.ndarray:
+    """
+    Volume-weighted average price of closes, over a rolling `window` or,
+    with `window=None`, cumulatively from the first bar.
+    """
+    closes = _as_float_array(closes)
+    volumes = _as_float_array(volumes)
+    pv = np.cumsum(closes * volumes, axis=-1)
+    vol = np.cumsum(volumes, axis=-1)
+
+    if window is None:
+        num, den = pv, vol
+        out = _nan_like(closes)
+        valid = slice(0, None)
+    else:
+        out = _nan_like(closes)
+        if closes.shape[-1] < window:
+            return out
+        num = pv[..., window - 1:].copy()
+        den = vol[..., window - 1:].copy()
+        num[..., 1:] -= pv[..., :-window]
+        den[..., 1:] -= vol[..., :-window]
+        valid = slice(window - 1, None)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., valid] = np.where(den > 0.0, num / den, np.nan)
+    return out
+
+
+def compute_features(closes, volumes=None) -> dict:
+    """
+    Computes the latest value of every indicator.
+
+    For a 1-D series the values are floats (NaN when there is not enough
+    history); for a 2-D matrix they are arrays with one value per row. The
+    keys include `returns_30m` and `volatility`, so a 1-D result can be passed
+    straight to `predict_return_and_confidence`.
+
+    :param closes: Close prices, oldest first.
+    :param volumes: Optional volumes aligned with `closes`; enables VWAP.
+    :return: Feature name -> latest value(s).
+    """
+    closes = _as_float_array(closes)
+
+    features = {"last_close": closes[..., -1]}
+    for window in RETURN_WINDOWS:
+        features[f"returns_{window}m"] = window_returns(closes, window)[..., -1]
+    features["volatility"] = rolling_volatility(closes, VOLATILITY_WINDOW)[..., -1]
+    for span in EMA_SPANS:
+        features[f"ema_{span}"] = ema(closes, span)[..., -1]
+    features[f"rsi_{RSI_PERIOD}"] = rsi(closes, RSI_PERIOD)[..., -1]
+    features[f"zscore_{ZSCORE_WINDOW}m"] = zscore(closes, ZSCORE_WINDOW)[..., -1]
+    if volumes is not None:
+        volumes = _as_float_array(volumes)
+        last_vwap = vwap(closes, volumes, VWAP_WINDOW)[..., -1]
+        features[f"vwap_{VWAP_WINDOW}m"] = last_vwap
+        with np.errstate(divide="ignore", invalid="ignore"):
+            features[f"vwap_gap_{VWAP_WINDOW}m"] = closes[..., -1] / last_vwap - 1.0
+
+    if closes.ndim == 1:
+        return {name: float(value) for name, value in features.items()}
+    return features
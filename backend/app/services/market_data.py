@@ -1,34 +1,459 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import partial
+from typing import Awaitable, Callable
 import httpx
-from app.core.config import settings
+from app.core.config import get_settings
+from app.core.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY, register_stats
+from app.db import AsyncSessionLocal
+from app.services.candle_store import latest_candle_ts, load_candles, resolution_seconds, store_candles
+from app.services.features import compute_features
+from app.services.providers import MarketDataError, MarketDataProvider, ProviderChain, ReplayProvider
+from app.services.quote_cache import QuoteCache
+from app.services.upstream import CircuitBreaker, CircuitOpenError, Priority, TokenBucket
+
+# Enough 1-minute history for the longest feature window (returns_60m).
+FEATURE_WINDOW_MINUTES = 90
+
+# (symbol, resolution) -> monotonic time this process last synced candles from upstream,
+# oldest first. Entries past `settings.candle_staleness_seconds` no longer matter and are dropped.
+_candles_synced_at: OrderedDict[tuple[str, str], float] = OrderedDict()
+
+
+def _mark_candles_synced(symbol: str, resolution: str) -> None:
+    now = time.monotonic()
+    _candles_synced_at[(symbol, resolution)] = now
+    _candles_synced_at.move_to_end((symbol, resolution))
+    staleness = get_settings().candle_staleness_seconds
+    while _candles_synced_at and now - next(iter(_candles_synced_at.values())) >= staleness:
+        _candles_synced_at.popitem(last=False)
 
-class MarketDataError(Exception):
-    """Base exception class for market data related errors."""
-    pass
 
 def get_current_utc_time_isoformat() -> str:
     """Returns the current UTC time in ISO format."""
     return datetime.now(timezone.utc).isoformat(timespec='milliseconds')
 
-async def get_latest_market_price(symbol: str) -> dict:
+
+# -------------------------
+# Shared HTTP client
+# -------------------------
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """
+    Builds a pooled HTTP client configured from settings.
+
+    :return: An `httpx.AsyncClient` with keep-alive and (optionally) HTTP/2 enabled.
+    """
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=settings.http2_enabled,
+        timeout=httpx.Timeout(
+            settings.http_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """
+    Opens the shared upstream HTTP client. Called from the FastAPI lifespan.
+
+    :return: The shared client.
+    """
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    """Closes the shared upstream HTTP client and releases pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared upstream HTTP client.
+
+    The client is created lazily so scripts that never run the FastAPI
+    lifespan (e.g. seed or maintenance commands) still work.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+    return _http_client
+
+
+# -------------------------
+# Upstream flow control
+# -------------------------
+
+_finnhub_bucket: TokenBucket | None = None
+_finnhub_breaker: CircuitBreaker | None = None
+
+
+def get_finnhub_bucket() -> TokenBucket:
+    """Returns the process-wide Finnhub rate limiter, configured from settings."""
+    global _finnhub_bucket
+    if _finnhub_bucket is None:
+        settings = get_settings()
+        _finnhub_bucket = TokenBucket(
+            rate_per_minute=settings.finnhub_rate_per_minute,
+            burst=settings.finnhub_burst,
+        )
+    return _finnhub_bucket
+
+
+def get_finnhub_breaker() -> CircuitBreaker:
+    """Returns the process-wide Finnhub circuit breaker, configured from settings."""
+    global _finnhub_breaker
+    if _finnhub_breaker is None:
+        settings = get_settings()
+        _finnhub_breaker = CircuitBreaker(
+            failure_threshold=settings.upstream_circuit_failure_threshold,
+            reset_seconds=settings.upstream_circuit_reset_seconds,
+        )
+    return _finnhub_breaker
+
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+register_stats("finnhub_limiter", lambda: {
+    "queued": get_finnhub_bucket().queued,
+    "circuit_state": _CIRCUIT_STATE_VALUES[get_finnhub_breaker().state],
+})
+
+
+def _retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After when given."""
+    settings = get_settings()
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.upstream_backoff_max_seconds)
+        except ValueError:
+            pass
+    ceiling = min(settings.upstream_backoff_max_seconds, settings.upstream_backoff_base_seconds * 2 ** attempt)
+    return random.uniform(0.0, ceiling)
+
+
+async def _finnhub_get(path: str, params: dict, priority: Priority) -> dict:
+    """
+    Sends a GET to Finnhub through the rate limiter and circuit breaker.
+
+    Every attempt waits for a token from the Finnhub bucket in priority order.
+    429s pause the bucket (honouring Retry-After); 5xx and transport errors
+    count towards the circuit breaker. Both are retried with jittered backoff
+    up to `settings.upstream_max_retries` times.
+
+    :param path: Endpoint path relative to `settings.finnhub_base_url`, e.g. "/quote".
+    :return: The decoded JSON body.
+    :raises MarketDataError: If the circuit is open, the request is rejected
+        with a 4xx, or all retries fail.
+    """
+    settings = get_settings()
+    bucket, breaker = get_finnhub_bucket(), get_finnhub_breaker()
+    url = f"{settings.finnhub_base_url.rstrip('/')}{path}"
+    endpoint = path.lstrip("/")
+    errors = partial(UPSTREAM_ERRORS.labels, "finnhub", endpoint)
+    last_error = "unknown error"
+    for attempt in range(settings.upstream_max_retries + 1):
+        try:
+            trial = breaker.before_call()
+        except CircuitOpenError:
+            errors("circuit_open").inc()
+            raise MarketDataError("Finnhub is unavailable (circuit open), try again later")
+
+        retry_after = None
+        try:
+            await bucket.acquire(priority)
+
+            started = time.perf_counter()
+            try:
+                response = await get_http_client().get(url, params=params)
+            except httpx.TransportError as e:
+                UPSTREAM_LATENCY.labels("finnhub", endpoint).observe(time.perf_counter() - started)
+                errors("transport").inc()
+                breaker.record_failure()
+                last_error = f"{type(e).__name__}: {e}"
+            else:
+                UPSTREAM_LATENCY.labels("finnhub", endpoint).observe(time.perf_counter() - started)
+                if response.status_code == 429:
+                    errors("http_429").inc()
+                    breaker.record_neutral()
+                    retry_after = response.headers.get("Retry-After")
+                    bucket.pause(_retry_delay(attempt, retry_after))
+                    last_error = "rate limited (429)"
+                elif response.status_code >= 500:
+                    errors("http_5xx").inc()
+                    breaker.record_failure()
+                    last_error = f"HTTP {response.status_code}"
+                elif response.status_code >= 400:
+                    errors("http_4xx").inc()
+                    breaker.record_neutral()
+                    raise MarketDataError(f"Finnhub rejected the request: HTTP {response.status_code}")
+                else:
+                    breaker.record_success()
+                    return response.json()
+        except BaseException:
+            # Cancelled (e.g. a batch timeout) or failed unexpectedly: a half-open
+            # trial that never reported back would keep the circuit open for good.
+            if trial:
+                breaker.record_neutral()
+            raise
+
+        if attempt < settings.upstream_max_retries:
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+
+    raise MarketDataError(f"Finnhub request failed after {settings.upstream_max_retries + 1} attempts: {last_error}")
+
+
+# -------------------------
+# Quotes
+# -------------------------
+
+_quote_cache: QuoteCache | None = None
+
+
+def get_quote_cache() -> QuoteCache:
+    """Returns the process-wide quote cache, configured from settings."""
+    global _quote_cache
+    if _quote_cache is None:
+        settings = get_settings()
+        _quote_cache = QuoteCache(
+            ttl_seconds=settings.quote_cache_ttl_seconds,
+            max_symbols=settings.quote_cache_max_symbols,
+        )
+        register_stats("quote_cache", _quote_cache.stats)
+    return _quote_cache
+
+
+async def get_latest_market_price(
+    symbol: str,
+    max_age: float | None = None,
+    priority: Priority = Priority.DISPLAY,
+) -> dict:
     """
     Retrieves the latest market price for a given stock symbol.
 
+    Quotes are served from the in-process cache when they are fresh enough;
+    concurrent misses for the same symbol share a single upstream request.
+
     :param symbol: The stock symbol to retrieve the latest price for.
-    :return: A dictionary containing the symbol, price, timestamp, and market data source.
+    :param max_age: Maximum acceptable quote age in seconds (defaults to the cache TTL).
+    :param priority: Upstream scheduling priority if a fetch is needed. A caller
+        that joins an in-flight fetch waits at that fetch's priority.
+    :return: A dictionary containing the symbol, price, timestamp, market data source,
+        whether the quote came from cache (`cached`) and its age in seconds (`age_seconds`).
     :raises MarketDataError: If the market data provider is not supported.
     """
     symbol = symbol.upper()
+    return await get_quote_cache().get(symbol, partial(_provider_quote, priority=priority), max_age=max_age)
+
+
+async def get_latest_market_prices(
+    symbols: list[str],
+    max_age: float | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    priority: Priority = Priority.DISPLAY,
+) -> dict:
+    """
+    Retrieves the latest market prices for several stock symbols concurrently.
+
+    Symbols are upper-cased and de-duplicated. A failure for one symbol is
+    reported in `errors` and does not fail the rest of the batch.
+
+    :param symbols: The stock symbols to retrieve prices for.
+    :param max_age: Maximum acceptable quote age in seconds (defaults to the cache TTL).
+    :param concurrency: Maximum number of concurrent lookups
+        (defaults to `settings.market_batch_concurrency`).
+    :param timeout: Overall deadline in seconds; symbols still pending when it
+        expires are cancelled and reported as errors.
+    :param priority: Upstream scheduling priority for cache misses.
+    :return: A dictionary with `quotes` (symbol -> quote) and `errors` (symbol -> message).
+    """
+    async def fetch_one(symbol: str) -> dict:
+        return await get_latest_market_price(symbol, max_age=max_age, priority=priority)
+
+    quotes, errors = await _gather_per_symbol(
+        symbols,
+        fetch_one,
+        concurrency=concurrency or get_settings().market_batch_concurrency,
+        timeout=timeout,
+    )
+    return {"quotes": quotes, "errors": errors}
+
+
+async def _gather_per_symbol(
+    symbols: list[str],
+    fetch_one: Callable[[str], Awaitable[dict]],
+    concurrency: int,
+    timeout: float | None = None,
+) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Runs `fetch_one` for each distinct symbol with bounded concurrency.
+
+    Market data and upstream HTTP errors are collected per symbol; any other
+    exception propagates. Symbols still pending at `timeout` are cancelled.
+
+    :return: (results, errors), both keyed by upper-cased symbol.
+    """
+    unique_symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(symbol: str) -> dict:
+        async with semaphore:
+            return await fetch_one(symbol)
+
+    tasks = {symbol: asyncio.ensure_future(bounded(symbol)) for symbol in unique_symbols}
+    try:
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    results: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+    for symbol, task in tasks.items():
+        if task.cancelled():
+            errors[symbol] = "Timed out waiting for market data"
+            continue
+        result = task.exception() or task.result()
+        if isinstance(result, MarketDataError):
+            errors[symbol] = str(result)
+        elif isinstance(result, httpx.HTTPError):
+            errors[symbol] = f"Upstream error: {result}"
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            results[symbol] = result
+
+    return results, errors
+
+
+async def refresh_market_prices(symbols: list[str], concurrency: int | None = None) -> dict:
+    """
+    Fetches fresh quotes for several symbols into the cache, regardless of cached age.
+
+    :return: A dictionary with `quotes` (symbol -> quote) and `errors` (symbol -> message).
+    """
+    async def fetch_one(symbol: str) -> dict:
+        return await get_quote_cache().refresh(symbol, partial(_provider_quote, priority=Priority.BACKGROUND))
+
+    quotes, errors = await _gather_per_symbol(
+        symbols,
+        fetch_one,
+        concurrency=concurrency or get_settings().market_batch_concurrency,
+    )
+    return {"quotes": quotes, "errors": errors}
+
+
+def get_cached_market_price(symbol: str) -> dict | None:
+    """
+    Returns the last known quote for a symbol from the cache, however old.
+
+    :param symbol: The stock symbol.
+    :return: The cached quote, or None if the symbol has never been fetched.
+    """
+    return get_quote_cache().peek(symbol.upper())
+
+
+async def _provider_quote(symbol: str, priority: Priority = Priority.DISPLAY) -> dict:
+    """
+    Fetches a fresh quote from the configured market data providers.
 
-    market_provider = getattr(settings, "market_provider", "finnhub")
+    :param symbol: The stock symbol to retrieve the latest price for.
+    :param priority: Upstream scheduling priority.
+    :return: A dictionary containing the symbol, price, timestamp, and market data source.
+    :raises MarketDataError: If no provider could supply a price.
+    """
+    return await get_provider_chain().quote(symbol, priority)
+
+
+# -------------------------
+# Providers
+# -------------------------
 
-    if market_provider == "finnhub":
-        return await _finnhub_quote(symbol)
+class FinnhubProvider(MarketDataProvider):
+    """Finnhub REST API, behind the shared rate limiter and circuit breaker."""
 
-    raise MarketDataError(f"Unsupported market data provider: {market_provider}")
+    name = "finnhub"
 
+    async def quote(self, symbol: str, priority: Priority = Priority.DISPLAY) -> dict:
+        try:
+            return await _finnhub_quote(symbol, priority)
+        except httpx.HTTPError as e:
+            raise MarketDataError(f"Upstream error: {e}") from e
 
-async def _finnhub_quote(symbol: str) -> dict:
+    async def candles(
+        self,
+        symbol: str,
+        resolution: str,
+        from_ts: int,
+        to_ts: int,
+        priority: Priority = Priority.PREDICTION,
+    ) -> dict | None:
+        try:
+            return await _finnhub_fetch_candles(symbol, resolution, from_ts, to_ts, priority)
+        except httpx.HTTPError as e:
+            raise MarketDataError(f"Upstream error: {e}") from e
+
+
+def build_provider(name: str) -> MarketDataProvider:
+    """
+    Creates a provider by its `MARKET_PROVIDER` name.
+
+    :raises MarketDataError: If the provider is unknown or misconfigured.
+    """
+    if name == "finnhub":
+        return FinnhubProvider()
+    if name == "replay":
+        settings = get_settings()
+        if not settings.market_replay_path:
+            raise MarketDataError("MARKET_REPLAY_PATH is not configured")
+        return ReplayProvider.from_csv(settings.market_replay_path, speed=settings.market_replay_speed)
+    raise MarketDataError(f"Unsupported market data provider: {name}")
+
+
+_provider_chain: ProviderChain | None = None
+
+
+def get_provider_chain() -> ProviderChain:
+    """
+    Returns the process-wide provider chain, in `settings.market_provider` order.
+
+    :raises MarketDataError: If a configured provider is unknown or misconfigured.
+    """
+    global _provider_chain
+    if _provider_chain is None:
+        settings = get_settings()
+        chain = ProviderChain(
+            [build_provider(name) for name in settings.market_provider_names],
+            hedge=settings.market_hedge_enabled,
+            hedge_percentile=settings.market_hedge_percentile,
+            min_samples=settings.market_hedge_min_samples,
+            default_hedge_delay=settings.market_hedge_default_delay_seconds,
+            window=settings.market_latency_window,
+        )
+        for name, tracker in chain.latency.items():
+            register_stats(f"provider_{name}", tracker.stats)
+        _provider_chain = chain
+    return _provider_chain
+
+
+async def _finnhub_quote(symbol: str, priority: Priority = Priority.DISPLAY) -> dict:
     """
     Retrieves the latest market price for a given stock symbol using Finnhub.
 
@@ -36,17 +461,15 @@ async def _finnhub_quote(symbol: str) -> dict:
     :return: A dictionary containing the symbol, price, timestamp, and market data source.
     :raises MarketDataError: If the Finnhub API key is not configured or no price data is available.
     """
-    api_key = getattr(settings, "finnhub_api_key")
+    api_key = get_settings().finnhub_api_key
     if not api_key:
         raise MarketDataError("Finnhub API key is not configured")
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(
-            "https://finnhub.io/api/v1/quote",
-            params={"symbol": symbol, "token": api_key},
-        )
-        response.raise_for_status()
-        data = response.json()
+    data = await _finnhub_get(
+        "/quote",
+        params={"symbol": symbol, "token": api_key},
+        priority=priority,
+    )
 
     price = data.get("c")
     if price is None or price == 0:
@@ -62,91 +485,179 @@ async def _finnhub_quote(symbol: str) -> dict:
 
 async def get_recent_market_features(symbol: str) -> dict:
     """
-    Fetch recent candles and compute simple features for the predictor.
-    Features returned:
-      - returns_30m
+    Fetch recent candles and compute features for the predictor.
+    Features returned (see `app.services.features.compute_features`):
+      - returns_5m / returns_15m / returns_30m / returns_60m
       - volatility
+      - ema_12 / ema_26, rsi_14, zscore_30m, vwap_30m, vwap_gap_30m
     """
     symbol = symbol.upper()
 
-    provider = getattr(settings, "market_provider", "finnhub")
-    if provider != "finnhub":
-        raise MarketDataError(f"Unsupported market data provider: {provider}")
-
-    candles = await _finnhub_candles_last_n_minutes(symbol=symbol, minutes=60, resolution="1")
+    candles = await _candles_last_n_minutes(
+        symbol=symbol, minutes=FEATURE_WINDOW_MINUTES, resolution="1"
+    )
     closes = candles["closes"]
 
     if len(closes) < 35:
         raise MarketDataError(f"Not enough candle data to compute features for {symbol}")
 
-    # last 30 minutes return: (last / value 30m ago) - 1
-    last = closes[-1]
-    prev_30m = closes[-31]
-    returns_30m = (last / prev_30m) - 1.0
-
-    # simple volatility: std dev of 1-min returns over last 30 mins
-    rets = []
-    for i in range(len(closes) - 30, len(closes)):
-        if i == 0:
-            continue
-        r = (closes[i] / closes[i - 1]) - 1.0
-        rets.append(r)
-
-    # compute std without numpy
-    mean = sum(rets) / len(rets)
-    var = sum((x - mean) ** 2 for x in rets) / max(len(rets) - 1, 1)
-    volatility = var ** 0.5
-
     return {
         "symbol": symbol,
-        "returns_30m": float(returns_30m),
-        "volatility": float(volatility),
+        **compute_features(closes, candles["volumes"]),
         "timestamp": get_current_utc_time_isoformat(),
-        "source": "finnhub",
+        "source": candles["source"],
         "resolution": "1",
-        "window_minutes": 60,
+        "window_minutes": FEATURE_WINDOW_MINUTES,
     }
 
 
-async def _finnhub_candles_last_n_minutes(symbol: str, minutes: int, resolution: str = "1") -> dict:
+async def get_recent_market_features_batch(
+    symbols: list[str],
+    concurrency: int | None = None,
+) -> dict:
     """
-    Finnhub candles endpoint:
-      https://finnhub.io/docs/api/stock-candles
-    resolution: "1", "5", "15", "30", "60", "D", ...
+    Computes predictor features for several symbols concurrently.
+
+    Symbols are upper-cased and de-duplicated; a failure for one symbol is
+    reported in `errors` and does not fail the rest of the batch.
+
+    :param symbols: The stock symbols.
+    :param concurrency: Maximum number of concurrent lookups
+        (defaults to `settings.market_batch_concurrency`).
+    :return: A dictionary with `features` (symbol -> features) and `errors` (symbol -> message).
     """
-    api_key = getattr(settings, "finnhub_api_key")
-    if not api_key:
-        raise MarketDataError("Finnhub API key is not configured")
+    features, errors = await _gather_per_symbol(
+        symbols,
+        get_recent_market_features,
+        concurrency=concurrency or get_settings().market_batch_concurrency,
+    )
+    return {"features": features, "errors": errors}
 
-    # Finnhub expects UNIX seconds
+
+async def _candles_last_n_minutes(
+    symbol: str,
+    minutes: int,
+    resolution: str = "1",
+    force_sync: bool = False,
+    priority: Priority = Priority.PREDICTION,
+) -> dict:
+    """
+    Returns the last `minutes` of candles, served from the local candle store.
+
+    Only bars at or after the newest stored bar are requested from the
+    providers (the newest bar is re-fetched because it may still have been forming).
+    No upstream request is made until a new bar has opened, nor while this
+    process synced the symbol within `settings.candle_staleness_seconds`
+    (e.g. via the background prefetcher), unless `force_sync` is set.
+    """
+    # Providers take UNIX seconds
     now = datetime.now(timezone.utc)
     to_ts = int(now.timestamp())
     from_ts = to_ts - (minutes * 60)
+    bar_seconds = resolution_seconds(resolution)
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(
-            "https://finnhub.io/api/v1/stock/candle",
-            params={
-                "symbol": symbol,
-                "resolution": resolution,
-                "from": from_ts,
-                "to": to_ts,
-                "token": api_key,
-            },
-        )
-        r.raise_for_status()
-        data = r.json()
+    # Separate sessions so no pooled connection is held while waiting on a provider.
+    async with AsyncSessionLocal() as db:
+        newest_ts = await latest_candle_ts(db, symbol, resolution)
 
-    # Finnhub returns {"s":"ok","c":[...], ...} or {"s":"no_data",...}
-    if data.get("s") != "ok":
-        raise MarketDataError(f"No candle data available for symbol: {symbol}")
+    synced_at = _candles_synced_at.get((symbol, resolution))
+    recently_synced = (
+        synced_at is not None
+        and time.monotonic() - synced_at < get_settings().candle_staleness_seconds
+    )
+
+    if newest_ts is None or newest_ts < from_ts:
+        fetch_from = from_ts
+    elif force_sync:
+        fetch_from = newest_ts
+    elif not recently_synced and to_ts - newest_ts >= bar_seconds:
+        fetch_from = newest_ts
+    else:
+        fetch_from = None
+
+    source = "store"
+    if fetch_from is not None:
+        source, data = await get_provider_chain().candles(symbol, resolution, fetch_from, to_ts, priority)
+        _mark_candles_synced(symbol, resolution)
+    else:
+        data = None
+
+    async with AsyncSessionLocal() as db:
+        if data is not None:
+            await store_candles(db, symbol, resolution, data)
+            await db.commit()
+        stored = await load_candles(db, symbol, resolution, from_ts, to_ts)
 
-    closes = data.get("c", [])
+    closes = stored["c"]
     if not closes:
-        raise MarketDataError(f"No close prices available for symbol: {symbol}")
+        raise MarketDataError(f"No candle data available for symbol: {symbol}")
 
     return {
         "symbol": symbol,
         "closes": [float(x) for x in closes],
-        "raw": data,
+        "volumes": [float(x) for x in stored["v"]],
+        "timestamps": stored["t"],
+        "raw": stored,
+        "source": source,
     }
+
+
+async def refresh_candles(symbol: str, minutes: int = FEATURE_WINDOW_MINUTES, resolution: str = "1") -> dict:
+    """
+    Pulls any new bars for a symbol into the candle store, ignoring the staleness bound.
+
+    :return: The refreshed candle window.
+    """
+    return await _candles_last_n_minutes(
+        symbol.upper(), minutes, resolution, force_sync=True, priority=Priority.BACKGROUND
+    )
+
+
+async def refresh_candles_batch(symbols: list[str], concurrency: int | None = None) -> dict:
+    """
+    Runs `refresh_candles` for several symbols concurrently.
+
+    :return: A dictionary with `candles` (symbol -> window) and `errors` (symbol -> message).
+    """
+    candles, errors = await _gather_per_symbol(
+        symbols,
+        refresh_candles,
+        concurrency=concurrency or get_settings().market_batch_concurrency,
+    )
+    return {"candles": candles, "errors": errors}
+
+
+async def _finnhub_fetch_candles(
+    symbol: str,
+    resolution: str,
+    from_ts: int,
+    to_ts: int,
+    priority: Priority = Priority.PREDICTION,
+) -> dict | None:
+    """
+    Finnhub candles endpoint:
+      https://finnhub.io/docs/api/stock-candles
+    resolution: "1", "5", "15", "30", "60", "D", ...
+
+    :return: The raw Finnhub payload, or None when Finnhub has no bars in the range.
+    """
+    api_key = get_settings().finnhub_api_key
+    if not api_key:
+        raise MarketDataError("Finnhub API key is not configured")
+
+    data = await _finnhub_get(
+        "/stock/candle",
+        params={
+            "symbol": symbol,
+            "resolution": resolution,
+            "from": from_ts,
+            "to": to_ts,
+            "token": api_key,
+        },
+        priority=priority,
+    )
+
+    # Finnhub returns {"s":"ok","c":[...], ...} or {"s":"no_data",...}
+    if data.get("s") != "ok" or not data.get("c"):
+        return None
+    return data
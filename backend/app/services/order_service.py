@@ -0,0 +1,225 @@
+"""
+Resting limit and stop orders.
+
+Open orders live in the `orders` table and in an in-memory `TriggerBook`.
+Every fresh quote stored by the market data service is checked against the
+book; crossed orders are filled at that quote as regular trades, in the same
+transaction that marks them FILLED. Fills lock the order rows and only act on
+orders that are still OPEN, so a fill racing a cancel (or another process
+holding its own book) cannot fill an order twice.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import register_stats
+from app.db import AsyncSessionLocal
+from app.models import Order, Trade
+from app.services.market_data import get_quote_cache
+from app.services.trade_service import apply_trades_to_positions
+from app.services.trigger_book import RestingOrder, TriggerBook
+
+logger = logging.getLogger(__name__)
+
+
+class OrderNotFound(Exception):
+    """Raised when an order does not exist or belongs to another user."""
+    pass
+
+
+class OrderNotOpen(Exception):
+    """Raised when cancelling an order that has already been filled or cancelled."""
+    pass
+
+
+# -------------------------
+# Order entry
+# -------------------------
+
+async def create_order(
+    db: AsyncSession,
+    user_id: int,
+    symbol: str,
+    side: str,
+    order_type: str,
+    quantity: int,
+    trigger_price: float,
+) -> Order:
+    """
+    Rests a limit or stop order until a quote crosses its trigger price.
+
+    BUY LIMIT and SELL STOP orders trigger at or below the trigger price;
+    SELL LIMIT and BUY STOP orders at or above it.
+    """
+    order = Order(
+        user_id=user_id,
+        symbol=symbol.upper(),
+        side=side,
+        order_type=order_type,
+        quantity=quantity,
+        trigger_price=trigger_price,
+        status="OPEN",
+    )
+    db.add(order)
+    await db.commit()
+    await db.refresh(order)
+
+    get_order_executor().book.add(order.id, order.symbol, order.side, order.order_type, order.trigger_price)
+    return order
+
+
+async def cancel_order(db: AsyncSession, user_id: int, order_id: int) -> Order:
+    """
+    Cancels an open order.
+
+    :raises OrderNotFound: If the user has no such order.
+    :raises OrderNotOpen: If the order was already filled or cancelled.
+    """
+    order = (await db.execute(
+        select(Order)
+        .where(Order.id == order_id, Order.user_id == user_id)
+        .with_for_update()
+    )).scalar_one_or_none()
+    if order is None:
+        raise OrderNotFound(f"Order {order_id} not found")
+    if order.status != "OPEN":
+        raise OrderNotOpen(f"Order {order_id} is {order.status}")
+
+    order.status = "CANCELLED"
+    await db.commit()
+    await db.refresh(order)
+
+    get_order_executor().book.cancel(order.id)
+    return order
+
+
+async def list_orders(db: AsyncSession, user_id: int, status: str | None = None) -> list[Order]:
+    """Returns the user's orders, newest first, optionally filtered by status."""
+    stmt = select(Order).where(Order.user_id == user_id)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    return list(await db.scalars(stmt.order_by(Order.id.desc())))
+
+
+# -------------------------
+# Trigger execution
+# -------------------------
+
+class OrderExecutor:
+    """Matches fresh quotes against the trigger book and fills crossed orders."""
+
+    def __init__(self):
+        self.book = TriggerBook()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Rebuilds the book from the open orders and starts listening for quotes."""
+        await self.rebuild()
+        get_quote_cache().add_listener(self.on_quote)
+
+    async def stop(self) -> None:
+        get_quote_cache().remove_listener(self.on_quote)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def rebuild(self) -> int:
+        """
+        Replaces the book's contents with every OPEN order in the database.
+
+        :return: Number of resting orders loaded.
+        """
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Order.id, Order.symbol, Order.side, Order.order_type, Order.trigger_price)
+                .where(Order.status == "OPEN")
+            )).all()
+        self.book.clear()
+        count = self.book.load(rows)
+        logger.info("Trigger book rebuilt with %d open order(s)", count)
+        return count
+
+    def on_quote(self, symbol: str, quote: dict) -> None:
+        """Quote cache listener: schedules a fill for every order the quote crosses."""
+        price = quote.get("price")
+        if price is None:
+            return
+        triggered = self.book.crossed(symbol, float(price))
+        if triggered:
+            task = asyncio.get_running_loop().create_task(self._fill(triggered, float(price)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fill(self, triggered: list[RestingOrder], price: float) -> None:
+        try:
+            await fill_orders([o.order_id for o in triggered], price)
+        except Exception:
+            logger.exception("Filling %d triggered order(s) failed; re-queueing", len(triggered))
+            # Still OPEN in the database; they will be retried on the next crossing quote.
+            self.book.load(o for o in triggered if o.order_id not in self.book)
+
+
+async def fill_orders(order_ids: list[int], price: float) -> list[Trade]:
+    """
+    Fills triggered orders at `price` in one transaction.
+
+    Orders that are no longer OPEN (cancelled or filled elsewhere) are skipped.
+
+    :param order_ids: Order ids in execution priority order.
+    :param price: The triggering quote price.
+    :return: The trades created.
+    """
+    async with AsyncSessionLocal() as db:
+        orders = (await db.scalars(
+            select(Order)
+            .where(Order.id.in_(order_ids), Order.status == "OPEN")
+            .order_by(Order.id)
+            .with_for_update()
+        )).all()
+        if not orders:
+            return []
+        priority = {order_id: i for i, order_id in enumerate(order_ids)}
+        orders = sorted(orders, key=lambda o: priority[o.id])
+
+        trades = list(await db.scalars(
+            insert(Trade).returning(Trade, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": o.user_id,
+                    "symbol": o.symbol,
+                    "side": o.side,
+                    "quantity": o.quantity,
+                    "price": price,
+                    "status": "FILLED",
+                }
+                for o in orders
+            ],
+        ))
+        await apply_trades_to_positions(db, trades)
+        for order, trade in zip(orders, trades):
+            order.status = "FILLED"
+            order.trade_id = trade.id
+            order.fill_price = price
+        await db.commit()
+        return trades
+
+
+_executor: OrderExecutor | None = None
+register_stats("order_book", lambda: {"resting": len(_executor.book) if _executor else 0})
+
+
+def get_order_executor() -> OrderExecutor:
+    """Returns the process-wide order executor, creating it (without starting it) on first use."""
+    global _executor
+    if _executor is None:
+        _executor = OrderExecutor()
+    return _executor
+
+
+async def stop_order_executor() -> None:
+    """Stops matching quotes and waits for in-flight fills. Called from the FastAPI lifespan."""
+    global _executor
+    if _executor is not None:
+        await _executor.stop()
+        _executor = None
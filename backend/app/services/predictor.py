@@ -1,4 +1,5 @@
 from typing import Mapping, Any, Tuple
+import numpy as np
 
 
 def predict_return_and_confidence(
@@ -31,3 +32,42 @@ def predict_return_and_confidence(
     confidence = min(max(0.85 - volatility * 0.5, 0.50), 0.85)
 
     return predicted_return, confidence
+
+
+def predict_batch(
+    returns_30m,
+    volatility,
+    horizons,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized `predict_return_and_confidence` over many symbols and horizons.
+
+    Parameters
+    ----------
+    returns_30m : array-like, shape (n_symbols,)
+        Feature values per symbol; NaN falls back to the scalar default (0.0).
+    volatility : array-like, shape (n_symbols,)
+        Feature values per symbol; NaN falls back to the scalar default (0.3).
+    horizons : array-like, shape (n_horizons,)
+        Prediction horizons in minutes.
+
+    Returns
+    -------
+    tuple(ndarray, ndarray)
+        (predicted_return, confidence), each of shape (n_symbols, n_horizons).
+    """
+    returns_30m = np.asarray(returns_30m, dtype=np.float64)
+    volatility = np.asarray(volatility, dtype=np.float64)
+    horizons = np.asarray(horizons)
+
+    returns_30m = np.where(np.isnan(returns_30m), 0.0, returns_30m)
+    volatility = np.where(np.isnan(volatility), 0.3, volatility)
+
+    predicted_return = np.clip(returns_30m * 0.8, -0.05, 0.05)
+    confidence = np.clip(0.85 - volatility * 0.5, 0.50, 0.85)
+
+    shape = (returns_30m.shape[0], horizons.shape[0])
+    return (
+        np.broadcast_to(predicted_return[:, None], shape),
+        np.broadcast_to(confidence[:, None], shape),
+    )
@@ -0,0 +1,111 @@
+"""
+Background prefetcher that keeps hot symbols warm.
+
+Refreshes quotes (into the quote cache) and candles (into the candle store)
+for the configured watchlist plus every symbol users currently hold or have
+resting orders in, so
+request handlers are served from local data and only fall back to a live
+upstream fetch when that data is older than its staleness bound.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.db import AsyncSessionLocal
+from app.models import Position
+from app.services.market_data import refresh_candles_batch, refresh_market_prices
+from app.services.order_service import get_order_executor
+
+logger = logging.getLogger(__name__)
+
+
+async def held_symbols() -> set[str]:
+    """Returns every symbol with a non-zero position for any user."""
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(select(Position.symbol).where(Position.quantity != 0).distinct())
+        return {symbol for (symbol,) in rows}
+
+
+class Prefetcher:
+    """Refreshes a watchlist of symbols on fixed cadences until stopped."""
+
+    def __init__(
+        self,
+        symbols: list[str],
+        quote_interval: float,
+        candle_interval: float,
+        include_holdings: bool = True,
+        include_orders: bool = True,
+    ):
+        self.symbols = [s.upper() for s in symbols]
+        self.quote_interval = quote_interval
+        self.candle_interval = candle_interval
+        self.include_holdings = include_holdings
+        self.include_orders = include_orders
+        self._task: asyncio.Task | None = None
+
+    async def watchlist(self) -> list[str]:
+        symbols = set(self.symbols)
+        if self.include_holdings:
+            symbols |= await held_symbols()
+        if self.include_orders:
+            # Resting orders only trigger on fresh quotes.
+            symbols |= get_order_executor().book.symbols()
+        return sorted(symbols)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        next_candles = 0.0
+        while True:
+            started = time.monotonic()
+            try:
+                symbols = await self.watchlist()
+                if symbols:
+                    await refresh_market_prices(symbols)
+                    if started >= next_candles:
+                        await refresh_candles_batch(symbols)
+                        next_candles = started + self.candle_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Prefetch cycle failed")
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(self.quote_interval - elapsed, 0.0))
+
+
+_prefetcher: Prefetcher | None = None
+
+
+def get_prefetcher() -> Prefetcher:
+    """Returns the process-wide prefetcher, configured from settings."""
+    global _prefetcher
+    if _prefetcher is None:
+        settings = get_settings()
+        _prefetcher = Prefetcher(
+            symbols=settings.prefetch_symbols,
+            quote_interval=settings.prefetch_quote_interval_seconds,
+            candle_interval=settings.prefetch_candle_interval_seconds,
+            include_holdings=settings.prefetch_include_holdings,
+            include_orders=settings.prefetch_include_orders,
+        )
+    return _prefetcher
+
+
+async def stop_prefetcher() -> None:
+    """Stops the background prefetcher. Called from the FastAPI lifespan."""
+    global _prefetcher
+    if _prefetcher is not None:
+        await _prefetcher.stop()
+        _prefetcher = None
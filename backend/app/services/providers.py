@@ -0,0 +1,308 @@
+"""
+Pluggable market data providers with ordered failover and hedged requests.
+
+A provider answers two questions: the latest quote for a symbol, and the bars
+for a symbol over a time range (in Finnhub array form, `t`/`o`/`h`/`l`/`c`/`v`,
+which is what the candle store consumes). `ProviderChain` asks providers in
+order: a failure moves straight on to the next provider, and a provider that
+has not answered by its own recent latency percentile is hedged, i.e. the next
+provider is asked as well and whichever succeeds first wins.
+"""
+import asyncio
+import csv
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from app.core.metrics import MARKET_DATA_FAILOVERS, MARKET_DATA_HEDGES
+from app.services.upstream import Priority
+
+
+class MarketDataError(Exception):
+    """Base exception class for market data related errors."""
+    pass
+
+
+class MarketDataProvider:
+    """Interface implemented by every market data source."""
+
+    name = "provider"
+
+    async def quote(self, symbol: str, priority: Priority = Priority.DISPLAY) -> dict:
+        """
+        :return: symbol, price, timestamp and source.
+        :raises MarketDataError: If the provider has no price for the symbol.
+        """
+        raise NotImplementedError
+
+    async def candles(
+        self,
+        symbol: str,
+        resolution: str,
+        from_ts: int,
+        to_ts: int,
+        priority: Priority = Priority.PREDICTION,
+    ) -> dict | None:
+        """
+        :return: Bars in Finnhub array form, or None when there are none in the range.
+        :raises MarketDataError: If the provider cannot answer.
+        """
+        raise NotImplementedError
+
+
+# -------------------------
+# Replay provider
+# -------------------------
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded 1-minute bars from a CSV file as if they were live.
+
+    The recording is shifted onto the wall clock: with `speed` 0 its last bar
+    is always "now"; otherwise playback starts `warmup_seconds` into the file
+    and advances `speed` recorded seconds per real second, wrapping at the
+    end. Quotes are the close of the newest bar played so far.
+    """
+
+    name = "replay"
+    _FIELDS = ("t", "o", "h", "l", "c", "v")
+
+    def __init__(self, bars: dict[str, dict[str, np.ndarray]], speed: float = 0.0, warmup_seconds: float = 5400.0):
+        self.bars = {symbol.upper(): series for symbol, series in bars.items()}
+        self.speed = speed
+        self.warmup_seconds = warmup_seconds
+        self._started = time.time()
+
+    @classmethod
+    def from_csv(cls, path: str, speed: float = 0.0, warmup_seconds: float = 5400.0) -> "ReplayProvider":
+        """
+        Loads bars from a CSV file with a `symbol,ts,open,high,low,close,volume` header.
+
+        :raises MarketDataError: If the file cannot be read.
+        """
+        rows: dict[str, list[tuple]] = {}
+        try:
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    rows.setdefault(row["symbol"].upper(), []).append((
+                        float(row["ts"]), float(row["open"]), float(row["high"]),
+                        float(row["low"]), float(row["close"]), float(row.get("volume") or 0.0),
+                    ))
+        except (OSError, KeyError, ValueError) as e:
+            raise MarketDataError(f"Cannot load replay file {path}: {e}") from e
+
+        bars = {}
+        for symbol, values in rows.items():
+            matrix = np.array(sorted(values), dtype=np.float64)
+            bars[symbol] = dict(zip(cls._FIELDS, matrix.T))
+        return cls(bars, speed=speed, warmup_seconds=warmup_seconds)
+
+    def _clock(self, series: dict[str, np.ndarray], now: float) -> tuple[int, float]:
+        """
+        Returns (index of the newest bar played so far, shift from recorded to
+        wall-clock time). The shift puts that bar on the current wall-clock minute.
+        """
+        t = series["t"]
+        first, last = t[0], t[-1]
+        if self.speed <= 0 or last <= first:
+            position = last
+        else:
+            span = last - first
+            position = first + (min(self.warmup_seconds, span) + (now - self._started) * self.speed) % span
+        index = max(int(np.searchsorted(t, position, side="right")) - 1, 0)
+        return index, (now - now % 60) - t[index]
+
+    def _series(self, symbol: str) -> dict[str, np.ndarray]:
+        series = self.bars.get(symbol.upper())
+        if series is None:
+            raise MarketDataError(f"No replay data for symbol: {symbol}")
+        return series
+
+    async def quote(self, symbol: str, priority: Priority = Priority.DISPLAY) -> dict:
+        series = self._series(symbol)
+        index, _ = self._clock(series, time.time())
+        return {
+            "symbol": symbol.upper(),
+            "price": float(series["c"][index]),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "source": self.name,
+        }
+
+    async def candles(
+        self,
+        symbol: str,
+        resolution: str,
+        from_ts: int,
+        to_ts: int,
+        priority: Priority = Priority.PREDICTION,
+    ) -> dict | None:
+        if resolution != "1":
+            raise MarketDataError(f"Replay data is 1-minute only, not resolution {resolution}")
+        series = self._series(symbol)
+        index, shift = self._clock(series, time.time())
+        lo = int(np.searchsorted(series["t"], from_ts - shift, side="left"))
+        hi = min(int(np.searchsorted(series["t"], to_ts - shift, side="right")), index + 1)
+        if hi <= lo:
+            return None
+        data = {field: series[field][lo:hi].tolist() for field in self._FIELDS[1:]}
+        data["t"] = (series["t"][lo:hi] + shift).astype(np.int64).tolist()
+        data["s"] = "ok"
+        return data
+
+
+# -------------------------
+# Latency tracking
+# -------------------------
+
+class LatencyTracker:
+    """Rolling window of a provider's recent call latencies."""
+
+    def __init__(self, window: int = 512):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        """Returns the q-th percentile in seconds, or None before any sample."""
+        if not self._samples:
+            return None
+        return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+    def stats(self) -> dict:
+        if not self._samples:
+            return {"samples": 0}
+        p50, p95, p99 = np.percentile(np.fromiter(self._samples, dtype=np.float64), [50, 95, 99])
+        return {"samples": len(self._samples), "p50_seconds": p50, "p95_seconds": p95, "p99_seconds": p99}
+
+
+# -------------------------
+# Failover and hedging
+# -------------------------
+
+class ProviderChain:
+    """
+    Calls providers in order with failover and, optionally, hedging.
+
+    The hedge delay for a provider is its `hedge_percentile` latency over the
+    tracker window, or `default_hedge_delay` until it has `min_samples`
+    samples. A call that loses a hedge race is recorded at the time it was
+    cancelled (a lower bound on its true latency), so a slow provider's tail
+    does not vanish from its own stats just because it keeps being beaten.
+    """
+
+    def __init__(
+        self,
+        providers: list[MarketDataProvider],
+        hedge: bool = True,
+        hedge_percentile: float = 95.0,
+        min_samples: int = 20,
+        default_hedge_delay: float = 0.5,
+        window: int = 512,
+    ):
+        if not providers:
+            raise MarketDataError("No market data providers configured")
+        self.providers = providers
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.default_hedge_delay = default_hedge_delay
+        self.latency = {p.name: LatencyTracker(window) for p in providers}
+
+    def hedge_delay(self, provider: MarketDataProvider) -> float:
+        tracker = self.latency[provider.name]
+        if len(tracker) < self.min_samples:
+            return self.default_hedge_delay
+        return tracker.percentile(self.hedge_percentile)
+
+    async def quote(self, symbol: str, priority: Priority = Priority.DISPLAY) -> dict:
+        return await self.call("quote", lambda p: p.quote(symbol, priority))
+
+    async def candles(
+        self,
+        symbol: str,
+        resolution: str,
+        from_ts: int,
+        to_ts: int,
+        priority: Priority = Priority.PREDICTION,
+    ) -> tuple[str, dict | None]:
+        """:return: (name of the provider that answered, its bars)."""
+        return await self.call(
+            "candles",
+            lambda p: p.candles(symbol, resolution, from_ts, to_ts, priority),
+            with_source=True,
+        )
+
+    async def call(
+        self,
+        operation: str,
+        request: Callable[[MarketDataProvider], Awaitable],
+        with_source: bool = False,
+    ):
+        """
+        Runs `request` against the providers until one succeeds.
+
+        :param operation: Label for metrics ("quote", "candles").
+        :param with_source: Return (provider name, result) instead of the result.
+        :raises MarketDataError: If every provider failed; with several providers
+            the message lists each one's error.
+        """
+        pending: dict[asyncio.Task, tuple[MarketDataProvider, float]] = {}
+        errors: list[tuple[str, MarketDataError]] = []
+        next_index = 0
+
+        async def attempt(provider: MarketDataProvider):
+            # Any provider failure (a bad payload, an unexpected client error) is
+            # a reason to fail over, never a 500; cancellation still propagates.
+            try:
+                return await request(provider)
+            except MarketDataError:
+                raise
+            except Exception as e:
+                raise MarketDataError(f"{type(e).__name__}: {e}") from e
+
+        def launch() -> None:
+            nonlocal next_index
+            provider = self.providers[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(attempt(provider))] = (provider, time.perf_counter())
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                newest, newest_started = list(pending.values())[-1]
+                if self.hedge and next_index < len(self.providers):
+                    timeout = max(self.hedge_delay(newest) - (time.perf_counter() - newest_started), 0.0)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    MARKET_DATA_HEDGES.labels(operation, newest.name).inc()
+                    launch()
+                    continue
+                for task in done:
+                    provider, started = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self.latency[provider.name].observe(time.perf_counter() - started)
+                        return (provider.name, task.result()) if with_source else task.result()
+                    errors.append((provider.name, error))
+                if not pending and next_index < len(self.providers):
+                    MARKET_DATA_FAILOVERS.labels(operation, provider.name).inc()
+                    launch()
+        finally:
+            for task, (provider, started) in pending.items():
+                task.cancel()
+                self.latency[provider.name].observe(time.perf_counter() - started)
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if len(errors) == 1:
+            raise errors[0][1]
+        raise MarketDataError(
+            "All market data providers failed: " + "; ".join(f"{name}: {error}" for name, error in errors)
+        )
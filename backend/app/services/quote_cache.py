@@ -0,0 +1,128 @@
+"""
+In-process quote cache with per-symbol TTL, LRU eviction and request coalescing.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+QuoteListener = Callable[[str, dict], None]
+
+
+class QuoteCache:
+    """
+    Bounded LRU cache of quotes keyed by symbol.
+
+    Concurrent misses for the same symbol share one in-flight fetch, so a burst
+    of requests for a popular symbol results in a single upstream call.
+    """
+
+    def __init__(self, ttl_seconds: float, max_symbols: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_symbols = max_symbols
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._listeners: list[QuoteListener] = []
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, symbol: str, quote: dict) -> None:
+        self._entries[symbol] = (time.monotonic(), quote)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_symbols:
+            self._entries.popitem(last=False)
+        for listener in self._listeners:
+            try:
+                listener(symbol, quote)
+            except Exception:
+                logger.exception("Quote listener failed for %s", symbol)
+
+    def add_listener(self, listener: QuoteListener) -> None:
+        """
+        Registers a callback invoked with (symbol, quote) for every fresh quote stored.
+
+        Listeners run synchronously on the event loop and must not block.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: QuoteListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def peek(self, symbol: str) -> dict | None:
+        """
+        Returns the last cached quote for a symbol regardless of its age.
+
+        :param symbol: The stock symbol.
+        :return: The quote annotated with `cached` and `age_seconds`, or None.
+        """
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None
+        fetched_at, quote = entry
+        return {**quote, "cached": True, "age_seconds": time.monotonic() - fetched_at}
+
+    async def get(
+        self,
+        symbol: str,
+        fetch: Callable[[str], Awaitable[dict]],
+        max_age: float | None = None,
+    ) -> dict:
+        """
+        Returns a quote no older than `max_age`, fetching it if needed.
+
+        :param symbol: The stock symbol.
+        :param fetch: Coroutine function that fetches a fresh quote from upstream.
+        :param max_age: Maximum acceptable quote age in seconds (defaults to the TTL).
+        :return: The quote annotated with `cached` and `age_seconds`.
+        """
+        if max_age is None:
+            max_age = self.ttl_seconds
+
+        entry = self._entries.get(symbol)
+        if entry is not None:
+            fetched_at, quote = entry
+            age = time.monotonic() - fetched_at
+            if age <= max_age:
+                self._entries.move_to_end(symbol)
+                self.hits += 1
+                return {**quote, "cached": True, "age_seconds": age}
+
+        self.misses += 1
+        future = self._inflight.get(symbol)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_and_store(symbol, fetch))
+            # Mark the exception as retrieved even if every waiter was cancelled.
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[symbol] = future
+        quote = await asyncio.shield(future)
+        return {**quote, "cached": False, "age_seconds": 0.0}
+
+    async def refresh(self, symbol: str, fetch: Callable[[str], Awaitable[dict]]) -> dict:
+        """
+        Fetches a fresh quote regardless of what is cached.
+
+        :param symbol: The stock symbol.
+        :param fetch: Coroutine function that fetches a fresh quote from upstream.
+        :return: The fresh quote.
+        """
+        return await self.get(symbol, fetch, max_age=-1.0)
+
+    async def _fetch_and_store(self, symbol: str, fetch: Callable[[str], Awaitable[dict]]) -> dict:
+        try:
+            quote = await fetch(symbol)
+            self._store(symbol, quote)
+            return quote
+        finally:
+            self._inflight.pop(symbol, None)
+
+    def clear(self) -> None:
+        """Drops all cached quotes."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current number of cached symbols."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,274 @@
+"""
+Real-time quote streaming.
+
+A single `QuoteHub` per process keeps one upstream subscription per symbol
+and fans every tick out to all subscribed clients. Each client has a bounded
+buffer that drops its oldest ticks when the client falls behind, so a slow
+consumer never stalls the feed or other clients.
+"""
+import asyncio
+import json
+import logging
+import random
+from collections import deque
+from typing import Callable, Iterable
+
+import websockets
+
+from app.core.config import get_settings
+from app.services.market_data import MarketDataError, get_current_utc_time_isoformat
+
+logger = logging.getLogger(__name__)
+
+TickHandler = Callable[[dict], None]
+
+
+# -------------------------
+# Subscribers
+# -------------------------
+
+class Subscriber:
+    """Per-client tick buffer with drop-oldest overflow."""
+
+    def __init__(self, max_buffer: int):
+        self._buffer: deque[dict] = deque(maxlen=max_buffer)
+        self._ready = asyncio.Event()
+        self.symbols: set[str] = set()
+        self.dropped = 0
+
+    def push(self, tick: dict) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(tick)
+        self._ready.set()
+
+    async def next_batch(self) -> list[dict]:
+        """Waits for at least one tick, then returns everything buffered."""
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._buffer)
+        self._buffer.clear()
+        return batch
+
+
+# -------------------------
+# Upstream feeds
+# -------------------------
+
+class FinnhubTradeFeed:
+    """
+    Finnhub trade WebSocket (wss://ws.finnhub.io): one connection, one
+    subscribe message per symbol. Reconnects with backoff and re-subscribes.
+    """
+
+    url = "wss://ws.finnhub.io"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._symbols: set[str] = set()
+        self._ws = None
+        self._task: asyncio.Task | None = None
+        self._on_tick: TickHandler | None = None
+
+    async def start(self, on_tick: TickHandler) -> None:
+        self._on_tick = on_tick
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def subscribe(self, symbol: str) -> None:
+        self._symbols.add(symbol)
+        await self._send({"type": "subscribe", "symbol": symbol})
+
+    async def unsubscribe(self, symbol: str) -> None:
+        self._symbols.discard(symbol)
+        await self._send({"type": "unsubscribe", "symbol": symbol})
+
+    async def _send(self, message: dict) -> None:
+        if self._ws is None:
+            return  # sent on (re)connect
+        try:
+            await self._ws.send(json.dumps(message))
+        except websockets.WebSocketException:
+            pass  # the run loop reconnects and re-subscribes
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(f"{self.url}?token={self.api_key}") as ws:
+                    self._ws = ws
+                    backoff = 1.0
+                    for symbol in list(self._symbols):
+                        await ws.send(json.dumps({"type": "subscribe", "symbol": symbol}))
+                    async for message in ws:
+                        self._handle(message)
+            except (OSError, websockets.WebSocketException) as e:
+                logger.warning("Finnhub trade feed disconnected: %s", e)
+            except Exception:
+                logger.exception("Finnhub trade feed failed, reconnecting")
+            finally:
+                self._ws = None
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+            backoff = min(backoff * 2, 30.0)
+
+    def _handle(self, message: str | bytes) -> None:
+        """Publishes the trades in one upstream frame; malformed frames and trades are skipped."""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            logger.warning("Skipping non-JSON Finnhub frame: %.200r", message)
+            return
+        if not isinstance(data, dict) or data.get("type") != "trade":
+            return
+        trades = data.get("data")
+        if not isinstance(trades, list):
+            logger.warning("Skipping Finnhub trade frame without a trade list: %.200r", message)
+            return
+        for trade in trades:
+            try:
+                tick = {
+                    "symbol": str(trade["s"]),
+                    "price": float(trade["p"]),
+                    "volume": float(trade.get("v") or 0.0),
+                    "timestamp": trade.get("t"),
+                    "source": "finnhub",
+                }
+            except (AttributeError, KeyError, TypeError, ValueError):
+                logger.warning("Skipping malformed Finnhub trade: %.200r", trade)
+                continue
+            self._on_tick(tick)
+
+
+class FakeQuoteFeed:
+    """
+    Local random-walk feed for offline development and tests.
+    Emits one tick per subscribed symbol every `interval` seconds.
+    """
+
+    def __init__(self, interval: float, seed: int | None = None):
+        self.interval = interval
+        self._prices: dict[str, float] = {}
+        self._random = random.Random(seed)
+        self._task: asyncio.Task | None = None
+        self._on_tick: TickHandler | None = None
+
+    async def start(self, on_tick: TickHandler) -> None:
+        self._on_tick = on_tick
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def subscribe(self, symbol: str) -> None:
+        self._prices.setdefault(symbol, 100.0)
+
+    async def unsubscribe(self, symbol: str) -> None:
+        self._prices.pop(symbol, None)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for symbol, price in list(self._prices.items()):
+                price *= 1.0 + self._random.gauss(0.0, 0.001)
+                self._prices[symbol] = price
+                self._on_tick({
+                    "symbol": symbol,
+                    "price": round(price, 4),
+                    "volume": float(self._random.randint(1, 500)),
+                    "timestamp": get_current_utc_time_isoformat(),
+                    "source": "fake",
+                })
+
+
+def _build_feed():
+    settings = get_settings()
+    if settings.quote_stream_feed == "fake":
+        return FakeQuoteFeed(interval=settings.quote_stream_fake_interval_seconds)
+    if not settings.finnhub_api_key:
+        raise MarketDataError("Finnhub API key is not configured")
+    return FinnhubTradeFeed(api_key=settings.finnhub_api_key)
+
+
+# -------------------------
+# Hub
+# -------------------------
+
+class QuoteHub:
+    """Keeps one upstream subscription per symbol and fans ticks out to subscribers."""
+
+    def __init__(self, feed):
+        self.feed = feed
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        self._started = False
+        self._lock = asyncio.Lock()
+
+    def _publish(self, tick: dict) -> None:
+        for subscriber in self._subscribers.get(tick["symbol"], ()):
+            subscriber.push(tick)
+
+    async def subscribe(self, subscriber: Subscriber, symbols: Iterable[str]) -> None:
+        async with self._lock:
+            if not self._started:
+                await self.feed.start(self._publish)
+                self._started = True
+            for symbol in symbols:
+                symbol = symbol.strip().upper()
+                if not symbol or symbol in subscriber.symbols:
+                    continue
+                subscriber.symbols.add(symbol)
+                listeners = self._subscribers.setdefault(symbol, set())
+                listeners.add(subscriber)
+                if len(listeners) == 1:
+                    await self.feed.subscribe(symbol)
+
+    async def unsubscribe(self, subscriber: Subscriber, symbols: Iterable[str] | None = None) -> None:
+        async with self._lock:
+            targets = list(subscriber.symbols) if symbols is None else [s.strip().upper() for s in symbols]
+            for symbol in targets:
+                if symbol not in subscriber.symbols:
+                    continue
+                subscriber.symbols.discard(symbol)
+                listeners = self._subscribers.get(symbol)
+                if listeners is None:
+                    continue
+                listeners.discard(subscriber)
+                if not listeners:
+                    del self._subscribers[symbol]
+                    await self.feed.unsubscribe(symbol)
+
+    def upstream_symbols(self) -> set[str]:
+        """Symbols that currently hold an upstream subscription."""
+        return set(self._subscribers)
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._started:
+                await self.feed.stop()
+                self._started = False
+
+
+_hub: QuoteHub | None = None
+
+
+def get_quote_hub() -> QuoteHub:
+    """Returns the process-wide hub, creating it (without connecting) on first use."""
+    global _hub
+    if _hub is None:
+        _hub = QuoteHub(_build_feed())
+    return _hub
+
+
+async def close_quote_hub() -> None:
+    """Stops the upstream feed. Called from the FastAPI lifespan."""
+    global _hub
+    if _hub is not None:
+        await _hub.stop()
+        _hub = None
@@ -0,0 +1,242 @@
+"""
+Portfolio snapshots and the equity curve.
+
+A background job marks every portfolio to market on a fixed cadence and
+writes one compact row per user to `portfolio_snapshots`. Charts then read a
+time range of those rows and downsample it, instead of replaying trades
+against historical prices on every view.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import Float, cast, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db import AsyncSessionLocal
+from app.models import PortfolioSnapshot, Position
+from app.services.downsample import lttb, minmax
+from app.services.market_data import get_cached_market_price, get_latest_market_prices
+from app.services.upstream import Priority
+
+logger = logging.getLogger(__name__)
+
+_INSERT_CHUNK_ROWS = 2000
+
+
+# -------------------------
+# Snapshots
+# -------------------------
+
+def mark_portfolios(positions, prices: dict[str, float]) -> list[dict]:
+    """
+    Aggregates position rows into per-user mark-to-market totals.
+
+    A user holding any symbol without a price is skipped for this snapshot: a
+    gap in the curve is better than a false drop to cost.
+
+    :param positions: Rows with user_id, symbol, quantity, avg_cost and realized_pnl.
+    :param prices: Symbol -> mark price.
+    :return: One dict per priced user with market_value, unrealized_pnl and realized_pnl.
+    """
+    totals: dict[int, dict] = {}
+    unpriced: set[int] = set()
+    for p in positions:
+        total = totals.setdefault(
+            p.user_id,
+            {"user_id": p.user_id, "market_value": 0.0, "unrealized_pnl": 0.0, "realized_pnl": 0.0},
+        )
+        total["realized_pnl"] += float(p.realized_pnl)
+        if p.quantity == 0:
+            continue
+        price = prices.get(p.symbol)
+        if price is None:
+            unpriced.add(p.user_id)
+            continue
+        total["market_value"] += price * p.quantity
+        total["unrealized_pnl"] += (price - float(p.avg_cost)) * p.quantity
+    return [total for user_id, total in totals.items() if user_id not in unpriced]
+
+
+def snapshot_time(now: float, interval: float) -> datetime:
+    """Floors `now` (UNIX seconds) to a multiple of `interval`, so every worker stamps a cycle identically."""
+    return datetime.fromtimestamp(now - now % interval, tz=timezone.utc)
+
+
+async def take_snapshots(ts: datetime) -> int:
+    """
+    Marks every portfolio with a position or realized PnL to market and stores it at `ts`.
+
+    Rows already present for `ts` are left alone, so several workers running
+    the job in the same cycle write each snapshot once.
+
+    :return: Number of snapshot rows written.
+    """
+    async with AsyncSessionLocal() as db:
+        positions = (await db.execute(
+            select(
+                Position.user_id,
+                Position.symbol,
+                Position.quantity,
+                Position.avg_cost,
+                Position.realized_pnl,
+            ).where(or_(Position.quantity != 0, Position.realized_pnl != 0))
+        )).all()
+        # End the read transaction so no pooled connection is held while quotes are awaited.
+        await db.rollback()
+        if not positions:
+            return 0
+
+        symbols = sorted({p.symbol for p in positions if p.quantity != 0})
+        settings = get_settings()
+        marks = await get_latest_market_prices(
+            symbols,
+            concurrency=settings.pnl_quote_concurrency,
+            timeout=settings.pnl_quote_timeout_seconds,
+            priority=Priority.BACKGROUND,
+        )
+        prices = {}
+        for symbol in symbols:
+            quote = marks["quotes"].get(symbol) or get_cached_market_price(symbol)
+            if quote is not None:
+                prices[symbol] = float(quote["price"])
+
+        rows = [{**total, "ts": ts} for total in mark_portfolios(positions, prices)]
+        if not rows:
+            return 0
+        written = 0
+        # Keep each statement well under Postgres' bind-parameter limit.
+        for start in range(0, len(rows), _INSERT_CHUNK_ROWS):
+            result = await db.execute(
+                pg_insert(PortfolioSnapshot)
+                .values(rows[start:start + _INSERT_CHUNK_ROWS])
+                .on_conflict_do_nothing(index_elements=["user_id", "ts"])
+            )
+            written += result.rowcount
+        await db.commit()
+        return written
+
+
+class SnapshotJob:
+    """Takes portfolio snapshots at every multiple of `interval` seconds until stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            # Stamp the boundary computed before sleeping; the wake-up may drift either way.
+            due = snapshot_time(now, self.interval) + timedelta(seconds=self.interval)
+            await asyncio.sleep(max(due.timestamp() - now, 0.0))
+            try:
+                written = await take_snapshots(due)
+                logger.debug("Wrote %d portfolio snapshot(s)", written)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Portfolio snapshot failed")
+
+
+_snapshot_job: SnapshotJob | None = None
+
+
+def get_snapshot_job() -> SnapshotJob:
+    """Returns the process-wide snapshot job, configured from settings."""
+    global _snapshot_job
+    if _snapshot_job is None:
+        _snapshot_job = SnapshotJob(interval=get_settings().snapshot_interval_seconds)
+    return _snapshot_job
+
+
+async def stop_snapshot_job() -> None:
+    """Stops the snapshot job. Called from the FastAPI lifespan."""
+    global _snapshot_job
+    if _snapshot_job is not None:
+        await _snapshot_job.stop()
+        _snapshot_job = None
+
+
+# -------------------------
+# Equity curve
+# -------------------------
+
+def downsample_curve(
+    ts: np.ndarray,
+    pnl: np.ndarray,
+    market_value: np.ndarray,
+    points: int,
+    method: str = "lttb",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduces a curve to at most `points` points, choosing them by PnL.
+
+    :param ts: Snapshot times as UNIX seconds, ascending.
+    :param method: "lttb" (shape-preserving) or "minmax" (keeps every bucket's extremes).
+    :return: The kept (ts, pnl, market_value).
+    """
+    keep = lttb(ts, pnl, points) if method == "lttb" else minmax(pnl, points)
+    return ts[keep], pnl[keep], market_value[keep]
+
+
+async def get_equity_curve(
+    db: AsyncSession,
+    user_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    points: int | None = None,
+    method: str = "lttb",
+) -> dict:
+    """
+    Returns a user's PnL and market value over time, downsampled for charting.
+
+    Only three double columns are read (time as epoch seconds, so no datetime
+    objects are built per row) straight into numpy arrays: a range spanning
+    years of snapshots is one index range scan plus a linear pass.
+
+    :param start: Inclusive lower bound on snapshot time.
+    :param end: Exclusive upper bound on snapshot time.
+    :param points: Maximum points to return (defaults to `settings.equity_curve_default_points`).
+    :param method: "lttb" or "minmax".
+    :return: points (ts, pnl, market_value), method and source_points.
+    """
+    points = points or get_settings().equity_curve_default_points
+    stmt = select(
+        cast(func.extract("epoch", PortfolioSnapshot.ts), Float),
+        PortfolioSnapshot.realized_pnl + PortfolioSnapshot.unrealized_pnl,
+        PortfolioSnapshot.market_value,
+    ).where(PortfolioSnapshot.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(PortfolioSnapshot.ts >= start)
+    if end is not None:
+        stmt = stmt.where(PortfolioSnapshot.ts < end)
+    rows = (await db.execute(stmt.order_by(PortfolioSnapshot.ts))).all()
+
+    if not rows:
+        return {"points": [], "method": method, "source_points": 0}
+
+    ts, pnl, market_value = np.array(rows, dtype=np.float64).T
+    ts, pnl, market_value = downsample_curve(ts, pnl, market_value, points, method)
+    return {
+        "points": [
+            {"ts": datetime.fromtimestamp(t, tz=timezone.utc), "pnl": p, "market_value": v}
+            for t, p, v in zip(ts.tolist(), pnl.tolist(), market_value.tolist())
+        ],
+        "method": method,
+        "source_points": len(rows),
+    }
@@ -1,8 +1,22 @@
-from collections import defaultdict
+import base64
+from datetime import datetime
+from itertools import groupby
+from typing import AsyncIterator, Iterable
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import Trade
-from app.services.market_data import get_latest_market_price, MarketDataError
+from app.core.config import get_settings
+from app.db import ReadSessionLocal
+from app.models import Trade, Position
+from app.services.market_data import (
+    get_latest_market_price,
+    get_latest_market_prices,
+    get_cached_market_price,
+    MarketDataError,
+)
+from app.services.upstream import Priority
 
 
 # -------------------------
@@ -10,7 +24,7 @@ from app.services.market_data import get_latest_market_price, MarketDataError
 # -------------------------
 
 async def execute_trade(
-    db: Session,
+    db: AsyncSession,
     user_id: int,
     symbol: str,
     side: str,
@@ -18,8 +32,17 @@ async def execute_trade(
 ) -> Trade:
     """
     Execute a paper trade at current market price.
+
+    Fills require a fresher quote than display paths, bounded by
+    `settings.trade_quote_max_age_seconds`. The quote is fetched before any
+    database work, so no connection is held while waiting on upstream. The
+    trade insert and the position update are committed in the same transaction.
     """
-    quote = await get_latest_market_price(symbol)
+    quote = await get_latest_market_price(
+        symbol,
+        max_age=get_settings().trade_quote_max_age_seconds,
+        priority=Priority.TRADE,
+    )
 
     trade = Trade(
         user_id=user_id,
@@ -31,56 +54,345 @@ async def execute_trade(
     )
 
     db.add(trade)
-    db.commit()
-    db.refresh(trade)
+    await apply_trade_to_position(db, trade)
+    await db.commit()
+    await db.refresh(trade)
     return trade
 
 
+async def execute_trades(
+    db: AsyncSession,
+    user_id: int,
+    orders: list[dict],
+    all_or_nothing: bool = True,
+) -> tuple[list[Trade], list[dict]]:
+    """
+    Execute several paper trades in one transaction.
+
+    Each distinct symbol is quoted once, concurrently, at trade priority. The
+    fillable orders are inserted with a single bulk INSERT ... RETURNING,
+    applied to the position ledger and committed once.
+
+    :param db: The database session.
+    :param user_id: The trading user.
+    :param orders: Orders as dicts with `symbol`, `side` and `quantity`, in execution order.
+    :param all_or_nothing: Reject the whole batch if any symbol cannot be quoted;
+        otherwise fill what can be filled and report the rest.
+    :return: (filled trades in order, rejected orders as dicts with `index`, `symbol`, `error`).
+    :raises MarketDataError: In all-or-nothing mode, if any symbol could not be quoted.
+    """
+    symbols = [o["symbol"].strip().upper() for o in orders]
+    result = await get_latest_market_prices(
+        symbols,
+        max_age=get_settings().trade_quote_max_age_seconds,
+        priority=Priority.TRADE,
+    )
+    quotes, errors = result["quotes"], result["errors"]
+
+    if errors and all_or_nothing:
+        failed = ", ".join(f"{symbol}: {message}" for symbol, message in sorted(errors.items()))
+        raise MarketDataError(f"Batch rejected; could not quote {failed}")
+
+    rows: list[dict] = []
+    rejected: list[dict] = []
+    for index, (order, symbol) in enumerate(zip(orders, symbols)):
+        if symbol in errors:
+            rejected.append({"index": index, "symbol": symbol, "error": errors[symbol]})
+            continue
+        rows.append({
+            "user_id": user_id,
+            "symbol": symbol,
+            "side": order["side"],
+            "quantity": order["quantity"],
+            "price": quotes[symbol]["price"],
+            "status": "FILLED",
+        })
+
+    if not rows:
+        return [], rejected
+
+    trades = list(await db.scalars(
+        insert(Trade).returning(Trade, sort_by_parameter_order=True),
+        rows,
+    ))
+    await apply_trades_to_positions(db, trades)
+    await db.commit()
+    return trades, rejected
+
+
 # -------------------------
-# Positions
+# Position ledger
 # -------------------------
 
-def get_positions(db: Session, user_id: int) -> dict[str, int]:
-    trades = db.query(Trade).filter(Trade.user_id == user_id).all()
+def apply_fill(
+    quantity: int,
+    avg_cost: float,
+    realized_pnl: float,
+    side: str,
+    fill_quantity: int,
+    fill_price: float,
+) -> tuple[int, float, float]:
+    """
+    Apply one fill to a position using average-cost accounting.
+
+    Adding to a position (or opening one) blends the fill into the average
+    cost. Reducing a position realizes PnL against the average cost; a fill
+    that flips the position opens the remainder at the fill price.
+
+    :return: (quantity, avg_cost, realized_pnl) after the fill.
+    """
+    signed = fill_quantity if side == "BUY" else -fill_quantity
+    new_quantity = quantity + signed
+
+    if quantity == 0 or (quantity > 0) == (signed > 0):
+        total = abs(quantity) + fill_quantity
+        avg_cost = (abs(quantity) * avg_cost + fill_quantity * fill_price) / total
+        return new_quantity, avg_cost, realized_pnl
+
+    closed = min(fill_quantity, abs(quantity))
+    direction = 1 if quantity > 0 else -1
+    realized_pnl += closed * (fill_price - avg_cost) * direction
+
+    if new_quantity == 0:
+        avg_cost = 0.0
+    elif (new_quantity > 0) != (quantity > 0):
+        avg_cost = fill_price
+
+    return new_quantity, avg_cost, realized_pnl
 
-    positions = defaultdict(int)
+
+def fold_trades(trades: Iterable[Trade]) -> dict[str, tuple[int, float, float]]:
+    """
+    Replay trades (in execution order) into per-symbol ledger state.
+
+    :return: symbol -> (quantity, avg_cost, realized_pnl)
+    """
+    ledger: dict[str, tuple[int, float, float]] = {}
     for t in trades:
-        sign = 1 if t.side == "BUY" else -1
-        positions[t.symbol] += sign * t.quantity
+        state = ledger.get(t.symbol, (0, 0.0, 0.0))
+        ledger[t.symbol] = apply_fill(*state, t.side, t.quantity, float(t.price))
+    return ledger
+
+
+async def apply_trade_to_position(db: AsyncSession, trade: Trade) -> Position:
+    """
+    Update the materialized position for a trade inside the caller's transaction.
+
+    The position row is created if missing and locked with SELECT ... FOR UPDATE
+    so concurrent fills for the same (user, symbol) serialize.
+    """
+    positions = await apply_trades_to_positions(db, [trade])
+    return positions[(trade.user_id, trade.symbol)]
+
+
+async def apply_trades_to_positions(
+    db: AsyncSession,
+    trades: list[Trade],
+) -> dict[tuple[int, str], Position]:
+    """
+    Update the materialized positions for several trades inside the caller's transaction.
+
+    Missing rows are created in one statement and all affected rows are locked
+    in one SELECT ... FOR UPDATE, in (user, symbol) order so that concurrent
+    batches touching overlapping symbols cannot deadlock. Trades are applied
+    in list order.
+
+    :return: (user_id, symbol) -> updated position.
+    """
+    keys = sorted({(t.user_id, t.symbol) for t in trades})
+    await db.execute(
+        pg_insert(Position)
+        .values([
+            {"user_id": user_id, "symbol": symbol, "quantity": 0, "avg_cost": 0, "realized_pnl": 0}
+            for user_id, symbol in keys
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id", "symbol"])
+    )
+    rows = (await db.execute(
+        select(Position)
+        .where(tuple_(Position.user_id, Position.symbol).in_(keys))
+        .order_by(Position.user_id, Position.symbol)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )).scalars()
+    positions = {(p.user_id, p.symbol): p for p in rows}
+
+    for trade in trades:
+        position = positions[(trade.user_id, trade.symbol)]
+        quantity, avg_cost, realized_pnl = apply_fill(
+            position.quantity,
+            float(position.avg_cost),
+            float(position.realized_pnl),
+            trade.side,
+            trade.quantity,
+            float(trade.price),
+        )
+        position.quantity = quantity
+        position.avg_cost = avg_cost
+        position.realized_pnl = realized_pnl
+    return positions
+
+
+# -------------------------
+# Positions
+# -------------------------
+
+async def get_positions(db: AsyncSession, user_id: int) -> dict[str, int]:
+    rows = await db.execute(
+        select(Position.symbol, Position.quantity)
+        .where(Position.user_id == user_id, Position.quantity != 0)
+    )
+    return {symbol: quantity for symbol, quantity in rows}
 
-    return dict(positions)
+
+# -------------------------
+# Trade history
+# -------------------------
+
+HISTORY_COLUMNS = (
+    Trade.id,
+    Trade.symbol,
+    Trade.side,
+    Trade.quantity,
+    Trade.price,
+    Trade.status,
+    Trade.created_at,
+)
+
+
+def encode_history_cursor(created_at: datetime, trade_id: int) -> str:
+    """Encodes the position after a trade as an opaque, URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{trade_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decodes a cursor produced by `encode_history_cursor`.
+
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, trade_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(trade_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _history_filter(stmt, user_id: int, symbol: str | None, start: datetime | None, end: datetime | None):
+    stmt = stmt.where(Trade.user_id == user_id)
+    if symbol:
+        stmt = stmt.where(Trade.symbol == symbol.upper())
+    if start is not None:
+        stmt = stmt.where(Trade.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(Trade.created_at < end)
+    return stmt
+
+
+async def get_trade_history(
+    db: AsyncSession,
+    user_id: int,
+    symbol: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> tuple[list, str | None]:
+    """
+    Returns one page of a user's trades, newest first, using keyset pagination.
+
+    Pages continue from the (created_at, id) of the previous page's last row,
+    so every page is an index range scan on `ix_trades_user_symbol_created`
+    or `ix_trades_user_created`, no matter how deep the client pages.
+
+    :param start: Inclusive lower bound on `created_at`.
+    :param end: Exclusive upper bound on `created_at`.
+    :param cursor: `next_cursor` from the previous page.
+    :return: (rows, next_cursor); next_cursor is None on the last page.
+    :raises ValueError: If the cursor is malformed.
+    """
+    stmt = _history_filter(select(*HISTORY_COLUMNS), user_id, symbol, start, end)
+    if cursor:
+        created_at, trade_id = decode_history_cursor(cursor)
+        stmt = stmt.where(tuple_(Trade.created_at, Trade.id) < tuple_(created_at, trade_id))
+    stmt = stmt.order_by(Trade.created_at.desc(), Trade.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_history_cursor(last.created_at, last.id)
+
+
+async def iter_trade_history(
+    user_id: int,
+    symbol: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_rows: int | None = None,
+) -> AsyncIterator[list]:
+    """
+    Streams a user's trades oldest first, in chunks, from a server-side cursor.
+
+    Opens its own read-only session (on the replica, if configured) so it can
+    outlive the request handler that returns the streaming response; memory
+    use is bounded by `chunk_rows` regardless of history size.
+
+    :return: Async iterator of row lists.
+    """
+    chunk_rows = chunk_rows or get_settings().trade_export_chunk_rows
+    stmt = _history_filter(select(*HISTORY_COLUMNS), user_id, symbol, start, end)
+    stmt = stmt.order_by(Trade.created_at, Trade.id).execution_options(yield_per=chunk_rows)
+
+    async with ReadSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
 
 
 # -------------------------
 # PnL
 # -------------------------
 
-async def get_pnl(db: Session, user_id: int) -> list[dict]:
-    trades = db.query(Trade).filter(Trade.user_id == user_id).all()
+async def get_pnl(db: AsyncSession, user_id: int) -> list[dict]:
+    """
+    Mark open positions to market.
 
-    qty = defaultdict(int)
-    cost = defaultdict(float)
+    Quotes for all open symbols are fetched concurrently under
+    `settings.pnl_quote_concurrency` and `settings.pnl_quote_timeout_seconds`.
+    A symbol whose quote fails or times out falls back to its last cached
+    price and is flagged `stale`; with no price at all, its mark is None.
+    """
+    positions = (await db.execute(
+        select(Position.symbol, Position.quantity, Position.avg_cost, Position.realized_pnl)
+        .where(Position.user_id == user_id, Position.quantity != 0)
+    )).all()
+    # End the read transaction so no pooled connection is held while quotes are awaited.
+    await db.rollback()
 
-    for t in trades:
-        px = float(t.price)
-        if t.side == "BUY":
-            qty[t.symbol] += t.quantity
-            cost[t.symbol] += t.quantity * px
-        else:
-            qty[t.symbol] -= t.quantity
-            cost[t.symbol] -= t.quantity * px
+    settings = get_settings()
+    marks = await get_latest_market_prices(
+        [p.symbol for p in positions],
+        concurrency=settings.pnl_quote_concurrency,
+        timeout=settings.pnl_quote_timeout_seconds,
+    )
 
     results = []
-    for symbol, quantity in qty.items():
-        if quantity == 0:
-            continue
-
-        avg_entry = cost[symbol] / quantity
+    for position in positions:
+        symbol = position.symbol
+        quantity = position.quantity
+        avg_entry = float(position.avg_cost)
 
-        quote = await get_latest_market_price(symbol)
-        last_price = float(quote["price"])
+        quote = marks["quotes"].get(symbol)
+        stale = quote is None
+        if stale:
+            quote = get_cached_market_price(symbol)
 
-        unrealized = (last_price - avg_entry) * quantity
+        last_price = float(quote["price"]) if quote else None
+        unrealized = (last_price - avg_entry) * quantity if last_price is not None else None
 
         results.append(
             {
@@ -89,7 +401,63 @@ async def get_pnl(db: Session, user_id: int) -> list[dict]:
                 "avg_entry": avg_entry,
                 "last_price": last_price,
                 "unrealized_pnl": unrealized,
+                "realized_pnl": float(position.realized_pnl),
+                "stale": stale,
             }
         )
 
     return results
+
+
+# -------------------------
+# Ledger rebuild
+# -------------------------
+
+def rebuild_positions(db: Session, user_id: int | None = None, check_only: bool = False) -> list[dict]:
+    """
+    Recompute the positions table from the full trade history.
+
+    Trades are streamed in execution order and folded with the same
+    accounting as live fills. Unless `check_only` is set, the table is locked
+    against concurrent fills (on Postgres), rewritten and committed; trades
+    that commit afterwards update the rebuilt rows as usual.
+
+    :param db: The database session.
+    :param user_id: Restrict the rebuild to one user.
+    :param check_only: Only report mismatches, do not write.
+    :return: One entry per (user, symbol) whose stored state differed from the trades.
+    """
+    if not check_only and db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE positions IN SHARE ROW EXCLUSIVE MODE"))
+
+    trade_query = db.query(Trade).order_by(Trade.user_id, Trade.id)
+    position_query = db.query(Position)
+    if user_id is not None:
+        trade_query = trade_query.filter(Trade.user_id == user_id)
+        position_query = position_query.filter(Position.user_id == user_id)
+
+    expected: dict[tuple[int, str], tuple[int, float, float]] = {}
+    for uid, user_trades in groupby(trade_query.yield_per(10_000), key=lambda t: t.user_id):
+        for symbol, state in fold_trades(user_trades).items():
+            expected[(uid, symbol)] = state
+
+    stored = {(p.user_id, p.symbol): p for p in position_query.all()}
+
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        want = expected.get(key, (0, 0.0, 0.0))
+        row = stored.get(key)
+        have = (row.quantity, float(row.avg_cost), float(row.realized_pnl)) if row else (0, 0.0, 0.0)
+        if want[0] != have[0] or abs(want[1] - have[1]) > 1e-4 or abs(want[2] - have[2]) > 1e-2:
+            mismatches.append({"user_id": key[0], "symbol": key[1], "expected": want, "stored": have})
+
+        if check_only:
+            continue
+        if row is None:
+            row = Position(user_id=key[0], symbol=key[1])
+            db.add(row)
+        row.quantity, row.avg_cost, row.realized_pnl = want
+
+    if not check_only:
+        db.commit()
+    return mismatches
@@ -0,0 +1,147 @@
+"""
+In-memory trigger book for resting limit and stop orders.
+
+Orders fall into two groups per symbol: those that fire when the price falls
+to their trigger (BUY LIMIT, SELL STOP) and those that fire when it rises to
+it (SELL LIMIT, BUY STOP). Each group is a heap keyed on the trigger price,
+so a quote pops exactly the orders it crosses and leaves the rest untouched.
+Cancels are lazy: the order is forgotten immediately and its heap entry is
+skipped when it surfaces, with periodic compaction to bound the garbage.
+"""
+import heapq
+from dataclasses import dataclass, field
+from typing import Iterable, NamedTuple
+
+# Compact a symbol's heaps once this many cancelled entries have accumulated
+# and they make up more than half of the heap.
+_COMPACT_MIN_STALE = 1024
+
+
+def fires_on_fall(side: str, order_type: str) -> bool:
+    """True if the order triggers when the price drops to its trigger price."""
+    return (side == "BUY") == (order_type == "LIMIT")
+
+
+class RestingOrder(NamedTuple):
+    order_id: int
+    symbol: str
+    side: str
+    order_type: str
+    trigger_price: float
+
+
+@dataclass
+class _SymbolBook:
+    # (-trigger, order_id): highest trigger first, fires while price <= trigger.
+    falling: list[tuple[float, int]] = field(default_factory=list)
+    # (trigger, order_id): lowest trigger first, fires while price >= trigger.
+    rising: list[tuple[float, int]] = field(default_factory=list)
+    stale: int = 0
+
+
+class TriggerBook:
+    """Per-symbol price-ordered heaps of resting orders."""
+
+    def __init__(self):
+        self._books: dict[str, _SymbolBook] = {}
+        self._live: dict[int, RestingOrder] = {}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._live
+
+    def add(self, order_id: int, symbol: str, side: str, order_type: str, trigger_price: float) -> None:
+        """Adds a resting order."""
+        order = RestingOrder(order_id, symbol, side, order_type, float(trigger_price))
+        book = self._books.setdefault(symbol, _SymbolBook())
+        self._live[order_id] = order
+        if fires_on_fall(side, order_type):
+            heapq.heappush(book.falling, (-order.trigger_price, order_id))
+        else:
+            heapq.heappush(book.rising, (order.trigger_price, order_id))
+
+    def load(self, orders: Iterable[tuple]) -> int:
+        """
+        Bulk-loads resting orders, heapifying each symbol once.
+
+        :param orders: Iterable of (order_id, symbol, side, order_type, trigger_price).
+        :return: Number of orders loaded.
+        """
+        count = 0
+        for row in orders:
+            order = RestingOrder(*row[:4], float(row[4]))
+            book = self._books.setdefault(order.symbol, _SymbolBook())
+            self._live[order.order_id] = order
+            if fires_on_fall(order.side, order.order_type):
+                book.falling.append((-order.trigger_price, order.order_id))
+            else:
+                book.rising.append((order.trigger_price, order.order_id))
+            count += 1
+        for book in self._books.values():
+            heapq.heapify(book.falling)
+            heapq.heapify(book.rising)
+        return count
+
+    def cancel(self, order_id: int) -> bool:
+        """
+        Removes a resting order.
+
+        :return: True if the order was resting in the book.
+        """
+        order = self._live.pop(order_id, None)
+        if order is None:
+            return False
+        book = self._books[order.symbol]
+        book.stale += 1
+        size = len(book.falling) + len(book.rising)
+        if book.stale >= _COMPACT_MIN_STALE and book.stale * 2 > size:
+            self._compact(order.symbol, book)
+        return True
+
+    def crossed(self, symbol: str, price: float) -> list[RestingOrder]:
+        """
+        Removes and returns every order for `symbol` whose trigger `price` crosses.
+
+        :return: Orders in trigger-priority order within each side (best trigger, then oldest).
+        """
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+
+        triggered = []
+        while book.falling and price <= -book.falling[0][0]:
+            _, order_id = heapq.heappop(book.falling)
+            self._take(order_id, book, triggered)
+        while book.rising and price >= book.rising[0][0]:
+            _, order_id = heapq.heappop(book.rising)
+            self._take(order_id, book, triggered)
+
+        if not book.falling and not book.rising:
+            del self._books[symbol]
+        return triggered
+
+    def _take(self, order_id: int, book: _SymbolBook, triggered: list[RestingOrder]) -> None:
+        order = self._live.pop(order_id, None)
+        if order is None:
+            book.stale -= 1  # cancelled earlier
+        else:
+            triggered.append(order)
+
+    def _compact(self, symbol: str, book: _SymbolBook) -> None:
+        book.falling = [e for e in book.falling if e[1] in self._live]
+        book.rising = [e for e in book.rising if e[1] in self._live]
+        heapq.heapify(book.falling)
+        heapq.heapify(book.rising)
+        book.stale = 0
+        if not book.falling and not book.rising:
+            del self._books[symbol]
+
+    def symbols(self) -> set[str]:
+        """Symbols with at least one resting order."""
+        return {order.symbol for order in self._live.values()}
+
+    def clear(self) -> None:
+        self._books.clear()
+        self._live.clear()
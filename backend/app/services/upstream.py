@@ -0,0 +1,146 @@
+"""
+Flow-control primitives for upstream providers: a priority-aware token bucket
+and a circuit breaker.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Upstream request priority; lower values are served first."""
+    TRADE = 0
+    DISPLAY = 1
+    PREDICTION = 2
+    BACKGROUND = 3
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate_per_minute`, holding at most `burst` tokens.
+
+    Waiters are served strictly by (priority, arrival order), so a queued
+    trade quote always gets the next token before dashboard or background work.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = asyncio.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._updated = now
+            return
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _seconds_until_token(self) -> float:
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        return max((1.0 - self._tokens) / self.rate, 0.0)
+
+    async def acquire(self, priority: int = Priority.DISPLAY) -> None:
+        """Waits for a token, behind every waiter with a higher priority."""
+        entry = (int(priority), next(self._seq))
+        async with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry and self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        heapq.heappop(self._waiters)
+                        self._cond.notify_all()
+                        return
+                    timeout = self._seconds_until_token() if self._waiters[0] == entry else None
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def pause(self, seconds: float) -> None:
+        """Empties the bucket and stops refilling for `seconds` (e.g. after a 429)."""
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_seconds`; then lets one trial call through (half-open) and closes
+    again on success.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """
+        Checks whether a call may proceed.
+
+        The caller of a half-open trial must report back with `record_success`,
+        `record_failure` or `record_neutral` however the call ends, including
+        on cancellation; otherwise no further trial is ever admitted.
+
+        :return: True if this call is the half-open trial.
+        :raises CircuitOpenError: While open, or while a half-open trial is already running.
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        raise CircuitOpenError("Circuit open")
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_in_flight or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def record_neutral(self) -> None:
+        """Ends a half-open trial without changing the failure count (e.g. a 4xx)."""
+        self._trial_in_flight = False
@@ -1,55 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import bcrypt
 import pytest
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from app.deps import get_db
+
+from app.core import security
+from app.core.config import settings
 from app.models import User
-from app.schemas import UserCreate
-from app.core.security import hash_password
-from app.routers.auth import register
+from app.routers.auth import login_credentials, register
+from app.schemas import LoginRequest, UserCreate
 
-def test_register_existing_email(db: Session):
-    # Arrange
-    user = User(email="test@example.com", hashed_password="hashed_password")
-    db.add(user)
-    db.commit()
 
+class FakeAsyncSession:
+    """Just enough of an AsyncSession for the auth handlers: every lookup finds `user`."""
+
+    def __init__(self, user: User | None = None):
+        self.user = user
+        self.added = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: self.user))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        obj.id = len(self.added)
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    yield
+    security.shutdown_password_hasher()
+
+
+def _user(password: str, rounds: int = 4) -> User:
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    return User(id=7, email="test@example.com", hashed_password=hashed)
+
+
+def test_register_existing_email():
+    # Arrange
+    db = FakeAsyncSession(user=_user("password"))
     payload = UserCreate(email="test@example.com", password="password")
 
     # Act
     with pytest.raises(HTTPException) as exc_info:
-        register(payload, db)
+        asyncio.run(register(payload, db))
 
     # Assert
     assert exc_info.value.detail == "Email already registered"
+    assert db.added == []
+
 
-def test_register_new_user(db: Session):
+def test_register_new_user():
     # Arrange
+    db = FakeAsyncSession()
     payload = UserCreate(email="newuser@example.com", password="password")
 
     # Act
-    result = register(payload, db)
+    result = asyncio.run(register(payload, db))
 
     # Assert
     assert result.email == "newuser@example.com"
-    assert result.hashed_password is not None
+    assert security.verify_password("password", result.hashed_password)
+    assert db.added == [result] and db.commits == 1
 
-def test_register_with_db_error(db: Session):
+
+def test_register_with_db_error():
     # Arrange
-    original_add = db.add
+    db = FakeAsyncSession()
 
     def raise_db_error_side_effect(*args, **kwargs):
         raise Exception("Database error")
 
     db.add = raise_db_error_side_effect
-
     payload = UserCreate(email="newuser@example.com", password="password")
 
     # Act
     with pytest.raises(Exception) as exc_info:
-        register(payload, db)
+        asyncio.run(register(payload, db))
 
     # Assert
     assert str(exc_info.value) == "Database error"
+    assert db.commits == 0
 
-    # Clean up
-    db.add = original_add
+
+def test_login_returns_tokens_for_the_user():
+    # Arrange
+    db = FakeAsyncSession(user=_user("password"))
+
+    # Act
+    tokens = asyncio.run(login_credentials(LoginRequest(email="test@example.com", password="password"), db))
+
+    # Assert
+    assert security.decode_token(tokens.access_token)["sub"] == "7"
+    assert security.decode_token(tokens.refresh_token)["type"] == "refresh"
+    assert db.commits == 0  # hash already at the configured cost
+
+
+@pytest.mark.parametrize("user", [None, _user("password")])
+def test_login_rejects_unknown_email_or_wrong_password(user):
+    db = FakeAsyncSession(user=user)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(login_credentials(LoginRequest(email="test@example.com", password="wrong-pass"), db))
+
+    assert exc_info.value.status_code == 401
+
+
+def test_login_rehashes_a_password_made_with_another_cost():
+    # Arrange
+    user = _user("password", rounds=5)
+    db = FakeAsyncSession(user=user)
+
+    # Act
+    asyncio.run(login_credentials(LoginRequest(email="test@example.com", password="password"), db))
+
+    # Assert
+    assert user.hashed_password.startswith("$2b$04$")
+    assert security.verify_password("password", user.hashed_password)
+    assert db.commits == 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from app.services.backtest import backtest_series, run_backtest, summarize
+
+
+def test_backtest_follows_a_steady_trend_long():
+    closes = 100.0 * 1.001 ** np.arange(200)
+
+    result = backtest_series(closes, horizon_minutes=30)
+
+    assert result["bars"] == 200
+    assert result["trades"] == 1  # enters once the 30-bar window is full, never exits
+    assert result["final_position"] == 1
+    assert result["total_return"] > 0
+    assert result["max_drawdown"] == pytest.approx(0.0)
+    assert result["hit_rate"] == 1.0
+
+
+def test_backtest_is_flat_during_warm_up():
+    result = backtest_series(np.linspace(100.0, 101.0, 20))
+
+    assert result["signals"] == 0
+    assert result["trades"] == 0
+    assert result["total_return"] == 0.0
+
+
+def test_backtest_ledger_agrees_with_vectorized_pnl_when_flat():
+    rng = np.random.default_rng(7)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, 2000)))
+    closes[-31:] = closes[-32]  # flat tail: the predictor goes to zero and the position closes
+
+    result = backtest_series(closes, threshold=0.0001, quantity=10)
+
+    assert result["final_position"] == 0
+    assert result["trades"] > 2
+    assert result["realized_pnl"] == pytest.approx(result["pnl"])
+    assert 0.0 <= result["max_drawdown"] < 1.0
+
+
+def test_summarize_averages_active_symbols():
+    a = backtest_series(100.0 * 1.001 ** np.arange(200))
+    b = backtest_series([100.0])
+
+    summary = summarize({"A": a, "B": b})
+
+    assert summary["symbols"] == 2
+    assert summary["pnl"] == pytest.approx(a["pnl"])
+    assert summary["mean_sharpe"] == pytest.approx(a["sharpe"])
+
+
+@pytest.mark.parametrize("resolution", ["5", "D"])
+def test_run_backtest_rejects_non_minute_resolutions(resolution):
+    with pytest.raises(ValueError, match="1-minute"):
+        run_backtest(["AAPL"], 0, 60, resolution=resolution)
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services import market_data
+from app.services.candle_store import store_candles
+
+MINUTES = 90
+
+
+class FakeAsyncSession:
+    """Records executed statements and commits; usable as `async with AsyncSessionLocal()`."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def candle_sync(monkeypatch):
+    """
+    Stubs the candle store and provider chain around `_candles_last_n_minutes`.
+
+    Set `state.newest_ts` to the newest stored bar; `state.requests` collects
+    the (from_ts, to_ts) of every upstream request and `state.stored` every
+    payload written to the store.
+    """
+    state = SimpleNamespace(newest_ts=None, requests=[], stored=[])
+    bars = {"t": [1], "o": [1.0], "h": [1.0], "l": [1.0], "c": [1.0], "v": [1.0], "s": "ok"}
+
+    async def latest_candle_ts(db, symbol, resolution):
+        return state.newest_ts
+
+    async def store_candles(db, symbol, resolution, data):
+        state.stored.append(data)
+        return len(data["t"])
+
+    async def load_candles(db, symbol, resolution, from_ts, to_ts):
+        return bars
+
+    async def candles(symbol, resolution, from_ts, to_ts, priority):
+        state.requests.append((from_ts, to_ts))
+        return "finnhub", bars
+
+    monkeypatch.setattr(settings, "candle_staleness_seconds", 30.0)
+    monkeypatch.setattr(market_data, "_candles_synced_at", OrderedDict())
+    monkeypatch.setattr(market_data, "AsyncSessionLocal", FakeAsyncSession)
+    monkeypatch.setattr(market_data, "latest_candle_ts", latest_candle_ts)
+    monkeypatch.setattr(market_data, "store_candles", store_candles)
+    monkeypatch.setattr(market_data, "load_candles", load_candles)
+    monkeypatch.setattr(market_data, "get_provider_chain", lambda: SimpleNamespace(candles=candles))
+    return state
+
+
+def _run(force_sync: bool = False) -> dict:
+    return asyncio.run(market_data._candles_last_n_minutes("AAPL", MINUTES, force_sync=force_sync))
+
+
+def test_empty_store_fetches_the_full_window(candle_sync):
+    result = _run()
+
+    [(from_ts, to_ts)] = candle_sync.requests
+    assert to_ts - from_ts == MINUTES * 60
+    assert len(candle_sync.stored) == 1
+    assert result["source"] == "finnhub"
+
+
+def test_newest_bar_older_than_the_window_fetches_the_full_window(candle_sync):
+    candle_sync.newest_ts = int(time.time()) - 2 * MINUTES * 60
+
+    _run()
+
+    [(from_ts, to_ts)] = candle_sync.requests
+    assert to_ts - from_ts == MINUTES * 60
+
+
+def test_stale_newest_bar_fetches_from_that_bar(candle_sync):
+    candle_sync.newest_ts = int(time.time()) - 300
+
+    _run()
+
+    assert [from_ts for from_ts, _ in candle_sync.requests] == [candle_sync.newest_ts]
+
+
+def test_inside_the_current_bar_makes_no_request(candle_sync):
+    candle_sync.newest_ts = int(time.time()) - 10
+
+    result = _run()
+
+    assert candle_sync.requests == [] and candle_sync.stored == []
+    assert result["source"] == "store"
+
+
+def test_recently_synced_symbol_makes_no_request(candle_sync):
+    candle_sync.newest_ts = int(time.time()) - 300
+    market_data._candles_synced_at[("AAPL", "1")] = time.monotonic()
+
+    _run()
+
+    assert candle_sync.requests == []
+
+
+def test_force_sync_fetches_from_the_newest_bar(candle_sync):
+    candle_sync.newest_ts = int(time.time()) - 10
+    market_data._candles_synced_at[("AAPL", "1")] = time.monotonic()
+
+    _run(force_sync=True)
+
+    assert [from_ts for from_ts, _ in candle_sync.requests] == [candle_sync.newest_ts]
+
+
+def test_store_candles_upserts_the_refetched_forming_bar():
+    db = FakeAsyncSession()
+    data = {"t": [600, 660], "o": [1.0, 2.0], "h": [1.5, 2.5], "l": [0.5, 1.5], "c": [1.25, 2.0], "v": [10, 20]}
+
+    written = asyncio.run(store_candles(db, "AAPL", "1", data))
+
+    [stmt] = db.statements
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert written == 2
+    assert "ON CONFLICT (symbol, resolution, ts) DO UPDATE" in sql
+    assert "close = excluded.close" in sql and "volume = excluded.volume" in sql
+
+
+def test_store_candles_splits_large_batches():
+    db = FakeAsyncSession()
+    n = 4500
+    data = {"t": list(range(n)), "o": [1.0] * n, "h": [1.0] * n, "l": [1.0] * n, "c": [1.0] * n, "v": [1.0] * n}
+
+    asyncio.run(store_candles(db, "AAPL", "1", data))
+
+    assert len(db.statements) == 3
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import snapshot_service
+from app.services.downsample import lttb, minmax
+from app.services.snapshot_service import downsample_curve, mark_portfolios, snapshot_time
+
+
+def _position(user_id, symbol, quantity, avg_cost, realized=0.0):
+    return SimpleNamespace(
+        user_id=user_id, symbol=symbol, quantity=quantity, avg_cost=avg_cost, realized_pnl=realized,
+    )
+
+
+def test_mark_portfolios_totals_per_user_and_skips_unpriced_users():
+    positions = [
+        _position(1, "AAPL", 10, 100.0, realized=5.0),
+        _position(1, "MSFT", -2, 300.0),
+        _position(2, "TSLA", 0, 0.0, realized=-7.5),  # closed out: realized only
+        _position(3, "AAPL", 1, 90.0),
+        _position(3, "NOPE", 1, 10.0),
+    ]
+
+    totals = mark_portfolios(positions, {"AAPL": 110.0, "MSFT": 290.0})
+
+    assert totals == [
+        {"user_id": 1, "market_value": 1100.0 - 580.0, "unrealized_pnl": 100.0 + 20.0, "realized_pnl": 5.0},
+        {"user_id": 2, "market_value": 0.0, "unrealized_pnl": 0.0, "realized_pnl": -7.5},
+    ]
+
+
+def test_take_snapshots_splits_large_inserts(monkeypatch):
+    positions = [_position(user_id, "AAPL", 1, 100.0) for user_id in range(10_000)]
+    inserts = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, stmt):
+            if stmt.is_select:
+                return SimpleNamespace(all=lambda: positions)
+            inserts.append(len(stmt.compile(dialect=postgresql.dialect()).params))
+            return SimpleNamespace(rowcount=inserts[-1] // 5)
+
+        async def rollback(self):
+            pass
+
+        async def commit(self):
+            pass
+
+    async def prices(symbols, **kwargs):
+        return {"quotes": {"AAPL": {"price": 110.0}}, "errors": {}}
+
+    monkeypatch.setattr(snapshot_service, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(snapshot_service, "get_latest_market_prices", prices)
+
+    written = asyncio.run(snapshot_service.take_snapshots(datetime(2024, 1, 1, tzinfo=timezone.utc)))
+
+    assert written == 10_000
+    assert len(inserts) > 1
+    assert max(inserts) < 32_767  # asyncpg's bind-parameter limit
+
+
+def test_snapshot_time_is_aligned_to_the_interval():
+    assert snapshot_time(1_000_123.4, 300) == datetime.fromtimestamp(999_900, tz=timezone.utc)
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500.0)
+    y[4321] = 25.0
+
+    keep = lttb(x, y, 200)
+
+    assert keep.size == 200
+    assert keep[0] == 0 and keep[-1] == x.size - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+
+
+@pytest.mark.parametrize("points", [4, 7, 100, 501])
+def test_minmax_keeps_extremes_within_budget(points):
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=5_000))
+
+    keep = minmax(y, points)
+
+    assert keep.size <= points
+    assert keep[0] == 0 and keep[-1] == y.size - 1
+    assert np.all(np.diff(keep) > 0)
+    assert int(np.argmin(y)) in keep and int(np.argmax(y)) in keep
+
+
+def test_short_series_are_returned_whole():
+    ts = np.array([1.0, 2.0, 3.0])
+    pnl = np.array([0.0, 1.0, -1.0])
+
+    for method in ("lttb", "minmax"):
+        kept_ts, kept_pnl, kept_mv = downsample_curve(ts, pnl, pnl * 2, 500, method)
+        assert kept_ts.tolist() == ts.tolist()
+        assert kept_mv.tolist() == (pnl * 2).tolist()
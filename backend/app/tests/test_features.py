@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from app.services import features
+
+
+def _closes(n: int = 500, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n)))
+
+
+def _loop_returns_and_volatility(closes: list[float]) -> tuple[float, float]:
+    # Reference: the original pure-Python implementation.
+    returns_30m = closes[-1] / closes[-31] - 1.0
+    rets = [closes[i] / closes[i - 1] - 1.0 for i in range(len(closes) - 30, len(closes))]
+    mean = sum(rets) / len(rets)
+    var = sum((x - mean) ** 2 for x in rets) / max(len(rets) - 1, 1)
+    return returns_30m, var ** 0.5
+
+
+def test_compute_features_matches_loop_implementation():
+    closes = _closes()
+
+    result = features.compute_features(closes)
+    returns_30m, volatility = _loop_returns_and_volatility(list(closes))
+
+    assert result["returns_30m"] == pytest.approx(returns_30m, rel=1e-12)
+    assert result["volatility"] == pytest.approx(volatility, rel=1e-9)
+
+
+def test_ema_matches_recursive_definition():
+    closes = _closes(2000)
+    alpha = 2.0 / (26 + 1.0)
+    expected = [closes[0]]
+    for x in closes[1:]:
+        expected.append(alpha * x + (1 - alpha) * expected[-1])
+
+    np.testing.assert_allclose(features.ema(closes, 26), expected, rtol=1e-12)
+
+
+def test_matrix_input_matches_per_row_results():
+    matrix = np.vstack([_closes(seed=1), _closes(seed=2)])
+
+    result = features.compute_features(matrix, np.ones_like(matrix))
+
+    for row in range(2):
+        single = features.compute_features(matrix[row], np.ones(matrix.shape[1]))
+        for name, value in single.items():
+            assert result[name][row] == pytest.approx(value, rel=1e-12, nan_ok=True)
+
+
+def test_rsi_bounds_and_warmup():
+    values = features.rsi(_closes(), 14)
+
+    assert np.isnan(values[:14]).all()
+    assert np.nanmin(values) >= 0.0 and np.nanmax(values) <= 100.0
+    assert features.rsi(np.arange(1.0, 40.0), 14)[-1] == 100.0
+
+
+def test_vwap_with_equal_volumes_is_rolling_mean():
+    closes = _closes(100)
+
+    np.testing.assert_allclose(
+        features.vwap(closes, np.ones_like(closes), 10)[9:],
+        features.rolling_mean(closes, 10)[9:],
+        rtol=1e-10,
+    )
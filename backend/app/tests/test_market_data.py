@@ -0,0 +1,206 @@
+import asyncio
+import time
+from app.services import market_data
+from app.services.market_data import MarketDataError, get_latest_market_prices
+
+
+def test_get_latest_market_prices_dedupes_and_reports_errors(monkeypatch):
+    # Arrange
+    calls = []
+
+    async def fake_quote(symbol: str, priority=None) -> dict:
+        calls.append(symbol)
+        if symbol == "BAD":
+            raise MarketDataError(f"No price data available for symbol: {symbol}")
+        return {"symbol": symbol, "price": 10.0}
+
+    monkeypatch.setattr(market_data, "_provider_quote", fake_quote)
+    market_data.get_quote_cache().clear()
+
+    # Act
+    result = asyncio.run(get_latest_market_prices(["aapl", "AAPL", " msft", "BAD"]))
+
+    # Assert
+    assert sorted(calls) == ["AAPL", "BAD", "MSFT"]
+    assert set(result["quotes"]) == {"AAPL", "MSFT"}
+    assert "BAD" in result["errors"]
+
+
+def test_get_latest_market_prices_times_out_slow_symbols(monkeypatch):
+    # Arrange
+    async def fake_quote(symbol: str, priority=None) -> dict:
+        if symbol == "SLOW":
+            await asyncio.sleep(5)
+        return {"symbol": symbol, "price": 10.0}
+
+    monkeypatch.setattr(market_data, "_provider_quote", fake_quote)
+    market_data.get_quote_cache().clear()
+
+    # Act
+    result = asyncio.run(get_latest_market_prices(["FAST", "SLOW"], timeout=0.05))
+
+    # Assert
+    assert set(result["quotes"]) == {"FAST"}
+    assert result["errors"] == {"SLOW": "Timed out waiting for market data"}
+
+
+def test_finnhub_get_retries_server_errors_then_fails_fast(monkeypatch):
+    # Arrange
+    import httpx
+    from app.core.config import settings
+    from app.services.upstream import CircuitBreaker, Priority, TokenBucket
+
+    responses = iter([503, 200])
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(next(responses, 503), json={"c": 1.0})
+
+    monkeypatch.setattr(settings, "upstream_backoff_base_seconds", 0.0)
+    monkeypatch.setattr(settings, "upstream_max_retries", 1)
+    monkeypatch.setattr(market_data, "_finnhub_bucket", TokenBucket(rate_per_minute=60_000, burst=10))
+    monkeypatch.setattr(market_data, "_finnhub_breaker", CircuitBreaker(failure_threshold=2, reset_seconds=60))
+
+    async def run():
+        market_data._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            ok = await market_data._finnhub_get("/quote", {}, Priority.TRADE)
+            failures = []
+            for _ in range(3):
+                try:
+                    await market_data._finnhub_get("/quote", {}, Priority.TRADE)
+                except MarketDataError as e:
+                    failures.append(str(e))
+            return ok, failures
+        finally:
+            await market_data.close_http_client()
+
+    # Act
+    ok, failures = asyncio.run(run())
+
+    # Assert
+    assert ok == {"c": 1.0}
+    assert len(calls) == 4  # 503+200, then 503+503 before the circuit opens
+    assert "circuit open" in failures[-1]
+
+
+def test_quotes_fail_over_from_finnhub_to_replay(monkeypatch, tmp_path):
+    # Arrange
+    from app.core.config import settings
+
+    path = tmp_path / "bars.csv"
+    path.write_text("symbol,ts,open,high,low,close,volume\nAAPL,1700000040,1,1,1,123.5,10\n")
+    monkeypatch.setattr(settings, "market_provider", "finnhub, replay")
+    monkeypatch.setattr(settings, "market_replay_path", str(path))
+    monkeypatch.setattr(settings, "finnhub_api_key", None)
+    monkeypatch.setattr(market_data, "_provider_chain", None)
+    market_data.get_quote_cache().clear()
+
+    # Act
+    quote = asyncio.run(market_data.get_latest_market_price("aapl"))
+
+    # Assert
+    assert [p.name for p in market_data.get_provider_chain().providers] == ["finnhub", "replay"]
+    assert quote["price"] == 123.5 and quote["source"] == "replay"
+
+
+def test_unknown_provider_is_rejected(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "market_provider", "bloomberg")
+    monkeypatch.setattr(market_data, "_provider_chain", None)
+    market_data.get_quote_cache().clear()
+
+    result = asyncio.run(get_latest_market_prices(["AAPL"]))
+
+    assert result["errors"] == {"AAPL": "Unsupported market data provider: bloomberg"}
+
+
+def test_cancelled_half_open_trial_releases_the_breaker(monkeypatch):
+    # Arrange
+    import httpx
+    from app.services.upstream import CircuitBreaker, Priority, TokenBucket
+
+    async def slow_handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"c": 1.0})
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure()  # open; half-open immediately since reset_seconds is 0
+    monkeypatch.setattr(market_data, "_finnhub_bucket", TokenBucket(rate_per_minute=60_000, burst=10))
+    monkeypatch.setattr(market_data, "_finnhub_breaker", breaker)
+
+    async def run():
+        market_data._http_client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+        try:
+            trial = asyncio.create_task(market_data._finnhub_get("/quote", {}, Priority.TRADE))
+            await asyncio.sleep(0.05)
+            assert breaker._trial_in_flight
+            trial.cancel()
+            await asyncio.gather(trial, return_exceptions=True)
+        finally:
+            await market_data.close_http_client()
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True  # the next call is admitted as a new trial
+
+
+def test_hedging_past_a_half_open_finnhub_trial_keeps_finnhub_usable(monkeypatch):
+    # Arrange
+    import httpx
+    from app.core.config import settings
+    from app.services.providers import MarketDataProvider, ProviderChain
+    from app.services.upstream import CircuitBreaker, TokenBucket
+
+    class Backup(MarketDataProvider):
+        name = "backup"
+
+        async def quote(self, symbol, priority=None):
+            return {"symbol": symbol, "price": 2.0, "source": self.name}
+
+    async def slow_handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"c": 1.0})
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+    monkeypatch.setattr(settings, "finnhub_api_key", "test")
+    monkeypatch.setattr(market_data, "_finnhub_bucket", TokenBucket(rate_per_minute=60_000, burst=10))
+    monkeypatch.setattr(market_data, "_finnhub_breaker", breaker)
+    chain = ProviderChain([market_data.FinnhubProvider(), Backup()], default_hedge_delay=0.02)
+
+    async def run():
+        market_data._http_client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+        try:
+            return await chain.quote("AAPL")
+        finally:
+            await market_data.close_http_client()
+
+    # Act
+    quote = asyncio.run(run())
+
+    # Assert
+    assert quote["source"] == "backup"
+    assert breaker.before_call() is True  # the lost trial was released
+
+
+def test_candle_sync_times_drop_stale_entries(monkeypatch):
+    # Arrange
+    from collections import OrderedDict
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "candle_staleness_seconds", 60)
+    now = time.monotonic()
+    synced = OrderedDict([(("OLD", "1"), now - 120), (("AAPL", "1"), now - 30), (("MSFT", "1"), now - 10)])
+    monkeypatch.setattr(market_data, "_candles_synced_at", synced)
+
+    # Act
+    market_data._mark_candles_synced("AAPL", "1")
+
+    # Assert
+    assert list(synced) == [("MSFT", "1"), ("AAPL", "1")]
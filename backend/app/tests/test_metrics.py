@@ -0,0 +1,90 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+
+from app.core.metrics import (
+    InstrumentedQueuePool,
+    MetricsMiddleware,
+    instrument_engine,
+    instrumented_pool,
+    register_stats,
+    render_metrics,
+)
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_middleware_labels_requests_by_route_template():
+    # Arrange
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before_ok = _sample("http_requests_total", {**labels, "status": "200"})
+    before_missing = _sample("http_requests_total", {**labels, "status": "404"})
+    before_count = _sample("http_request_duration_seconds_count", labels)
+
+    # Act
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/items/0")
+        client.get("/nowhere")
+
+    # Assert
+    assert _sample("http_requests_total", {**labels, "status": "200"}) - before_ok == 2
+    assert _sample("http_requests_total", {**labels, "status": "404"}) - before_missing == 1
+    assert _sample("http_request_duration_seconds_count", labels) - before_count == 3
+    assert _sample("http_requests_total", {"method": "GET", "route": "unmatched", "status": "404"}) >= 1
+    assert _sample("http_requests_in_flight", {}) == 0
+
+
+def test_engine_events_time_queries_and_pool_checkouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", poolclass=InstrumentedQueuePool)
+    instrument_engine(engine, "test")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("select 2"))
+
+    assert _sample("db_query_duration_seconds_count", {"engine": "test", "operation": "SELECT"}) == 2
+    assert _sample("db_pool_checkout_wait_seconds_count", {"engine": "sync"}) >= 1
+
+
+def test_pool_timeouts_are_counted_under_the_pool_label(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'timeout.db'}",
+        poolclass=instrumented_pool(InstrumentedQueuePool, "test_timeout"),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    engine.dispose()
+
+    assert type(engine.pool).metrics_name == "test_timeout"
+    assert _sample("db_pool_checkout_timeouts_total", {"engine": "test_timeout"}) == 1
+    assert _sample("db_pool_checkout_wait_seconds_count", {"engine": "test_timeout"}) == 2
+
+
+def test_registered_stats_are_exposed():
+    register_stats("test_component", lambda: {"size": 3, "label": "ignored"})
+
+    body, content_type = render_metrics()
+
+    assert content_type.startswith("text/plain")
+    assert b'app_component_stat{component="test_component",stat="size"} 3.0' in body
+    assert b'stat="label"' not in body
@@ -0,0 +1,30 @@
+import asyncio
+from app.core import security
+from app.core.config import settings
+
+
+def test_hash_and_verify_on_hashing_pool(monkeypatch):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+
+    async def run():
+        hashed = await security.hash_password_async("s3cret-pass")
+        return hashed, await security.verify_password_async("s3cret-pass", hashed)
+
+    try:
+        hashed, valid = asyncio.run(run())
+    finally:
+        security.shutdown_password_hasher()
+
+    assert valid
+    assert hashed.startswith("$2b$04$")
+
+
+def test_password_needs_rehash_when_cost_changes(monkeypatch):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    hashed = security.hash_password("s3cret-pass")
+
+    assert not security.password_needs_rehash(hashed)
+
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    assert security.password_needs_rehash(hashed)
+    assert security.password_needs_rehash("not-a-bcrypt-hash")
@@ -0,0 +1,171 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app import deps
+from app.services import trade_service
+from app.services.market_data import MarketDataError
+from app.services.trade_service import apply_fill, fold_trades
+
+
+def _trade(symbol: str, side: str, quantity: int, price: float):
+    return SimpleNamespace(symbol=symbol, side=side, quantity=quantity, price=price)
+
+
+def test_apply_fill_blends_average_cost_when_adding():
+    quantity, avg_cost, realized = apply_fill(10, 100.0, 0.0, "BUY", 10, 110.0)
+
+    assert quantity == 20
+    assert avg_cost == pytest.approx(105.0)
+    assert realized == 0.0
+
+
+def test_apply_fill_realizes_pnl_when_reducing():
+    quantity, avg_cost, realized = apply_fill(20, 105.0, 0.0, "SELL", 5, 115.0)
+
+    assert quantity == 15
+    assert avg_cost == pytest.approx(105.0)
+    assert realized == pytest.approx(50.0)
+
+
+def test_apply_fill_flips_position_at_fill_price():
+    quantity, avg_cost, realized = apply_fill(10, 100.0, 0.0, "SELL", 15, 90.0)
+
+    assert quantity == -5
+    assert avg_cost == pytest.approx(90.0)
+    assert realized == pytest.approx(-100.0)
+
+
+def test_apply_fill_covering_short_realizes_pnl():
+    quantity, avg_cost, realized = apply_fill(-10, 50.0, 0.0, "BUY", 10, 40.0)
+
+    assert quantity == 0
+    assert avg_cost == 0.0
+    assert realized == pytest.approx(100.0)
+
+
+def test_fold_trades_matches_incremental_fills():
+    trades = [
+        _trade("AAPL", "BUY", 10, 100.0),
+        _trade("MSFT", "BUY", 3, 300.0),
+        _trade("AAPL", "BUY", 10, 110.0),
+        _trade("AAPL", "SELL", 5, 115.0),
+    ]
+
+    ledger = fold_trades(trades)
+
+    assert ledger["AAPL"][0] == 15
+    assert ledger["AAPL"][1] == pytest.approx(105.0)
+    assert ledger["AAPL"][2] == pytest.approx(50.0)
+    assert ledger["MSFT"] == (3, 300.0, 0.0)
+
+
+def _fake_prices(quotes: dict, errors: dict):
+    async def fake(symbols, max_age=None, concurrency=None, timeout=None, priority=None):
+        return {"quotes": quotes, "errors": errors}
+    return fake
+
+
+def test_execute_trades_all_or_nothing_rejects_whole_batch(monkeypatch):
+    monkeypatch.setattr(
+        trade_service,
+        "get_latest_market_prices",
+        _fake_prices({"AAPL": {"price": 100.0}}, {"XYZ": "Unknown symbol"}),
+    )
+    orders = [
+        {"symbol": "AAPL", "side": "BUY", "quantity": 1},
+        {"symbol": "xyz", "side": "BUY", "quantity": 1},
+    ]
+
+    # No database work happens before the batch is rejected.
+    with pytest.raises(MarketDataError, match="XYZ"):
+        asyncio.run(trade_service.execute_trades(None, 1, orders, all_or_nothing=True))
+
+
+def test_execute_trades_best_effort_reports_rejected_orders(monkeypatch):
+    monkeypatch.setattr(
+        trade_service,
+        "get_latest_market_prices",
+        _fake_prices({}, {"XYZ": "Unknown symbol"}),
+    )
+    orders = [
+        {"symbol": "XYZ", "side": "BUY", "quantity": 1},
+        {"symbol": "XYZ", "side": "SELL", "quantity": 2},
+    ]
+
+    trades, rejected = asyncio.run(trade_service.execute_trades(None, 1, orders, all_or_nothing=False))
+
+    assert trades == []
+    assert [r["index"] for r in rejected] == [0, 1]
+    assert rejected[0]["error"] == "Unknown symbol"
+
+
+class FakeAsyncSession:
+    """Just enough of an AsyncSession for the position reads: every query returns `rows`."""
+
+    def __init__(self, rows, events=None):
+        self.rows = rows
+        self.events = events if events is not None else []
+
+    async def __aenter__(self):
+        self.events.append("open")
+        return self
+
+    async def __aexit__(self, *exc):
+        self.events.append("close")
+        return False
+
+    async def execute(self, stmt):
+        self.events.append("execute")
+        return FakeResult(self.rows)
+
+    async def rollback(self):
+        self.events.append("rollback")
+
+
+class FakeResult(list):
+    def all(self):
+        return list(self)
+
+
+def test_get_positions_maps_symbol_to_quantity():
+    db = FakeAsyncSession([("AAPL", 10), ("MSFT", -3)])
+
+    positions = asyncio.run(trade_service.get_positions(db, 1))
+
+    assert positions == {"AAPL": 10, "MSFT": -3}
+
+
+def test_get_pnl_ends_the_read_transaction_before_fetching_quotes(monkeypatch):
+    # Arrange
+    row = SimpleNamespace(symbol="AAPL", quantity=10, avg_cost=100.0, realized_pnl=5.0)
+    db = FakeAsyncSession([row])
+
+    async def fake_prices(symbols, max_age=None, concurrency=None, timeout=None, priority=None):
+        db.events.append("quotes")
+        return {"quotes": {"AAPL": {"price": 110.0}}, "errors": {}}
+
+    monkeypatch.setattr(trade_service, "get_latest_market_prices", fake_prices)
+
+    # Act
+    [pnl] = asyncio.run(trade_service.get_pnl(db, 1))
+
+    # Assert
+    assert db.events == ["execute", "rollback", "quotes"]
+    assert pnl["unrealized_pnl"] == 100.0 and pnl["realized_pnl"] == 5.0 and not pnl["stale"]
+
+
+def test_get_async_db_closes_the_session_after_the_request(monkeypatch):
+    events = []
+    monkeypatch.setattr(deps, "AsyncSessionLocal", lambda: FakeAsyncSession([], events))
+
+    async def request():
+        dependency = deps.get_async_db()
+        db = await anext(dependency)
+        events.append("handler")
+        await dependency.aclose()
+        return db
+
+    db = asyncio.run(request())
+
+    assert isinstance(db, FakeAsyncSession)
+    assert events == ["open", "handler", "close"]
@@ -0,0 +1,15 @@
+import pytest
+from app.services.predictor import predict_batch, predict_return_and_confidence
+
+
+def test_predict_batch_matches_scalar_predictor():
+    returns = [0.01, -0.2, float("nan")]
+    vols = [0.1, 0.9, 0.2]
+
+    pred, conf = predict_batch(returns, vols, [15, 30])
+
+    assert pred.shape == conf.shape == (3, 2)
+    for i, (r, v) in enumerate(zip(returns, vols)):
+        features = {"volatility": v} if r != r else {"returns_30m": r, "volatility": v}
+        expected = predict_return_and_confidence(features, 30)
+        assert (pred[i, 1], conf[i, 1]) == pytest.approx(expected)
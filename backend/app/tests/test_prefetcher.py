@@ -0,0 +1,33 @@
+import asyncio
+from app.services import prefetcher
+from app.services.prefetcher import Prefetcher
+
+
+def test_prefetcher_refreshes_quotes_every_cycle_and_candles_on_their_cadence(monkeypatch):
+    # Arrange
+    quote_calls, candle_calls = [], []
+
+    async def fake_quotes(symbols):
+        quote_calls.append(list(symbols))
+        return {"quotes": {}, "errors": {}}
+
+    async def fake_candles(symbols):
+        candle_calls.append(list(symbols))
+        return {"candles": {}, "errors": {}}
+
+    monkeypatch.setattr(prefetcher, "refresh_market_prices", fake_quotes)
+    monkeypatch.setattr(prefetcher, "refresh_candles_batch", fake_candles)
+    job = Prefetcher(["msft", "AAPL"], quote_interval=0.01, candle_interval=60, include_holdings=False)
+
+    # Act
+    async def run():
+        job.start()
+        await asyncio.sleep(0.05)
+        await job.stop()
+
+    asyncio.run(run())
+
+    # Assert
+    assert len(quote_calls) >= 2
+    assert quote_calls[0] == ["AAPL", "MSFT"]
+    assert candle_calls == [["AAPL", "MSFT"]]
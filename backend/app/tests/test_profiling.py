@@ -0,0 +1,63 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware
+from app.routers import admin
+
+
+def _app(store: ProfileStore, sample_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, admin_token="secret", sample_rate=sample_rate)
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    return app
+
+
+def test_only_requests_with_the_admin_header_are_profiled(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=10)
+    client = TestClient(_app(store))
+
+    plain = client.get("/slow")
+    wrong = client.get("/slow", headers={"X-Profile": "guess"})
+    profiled = client.get("/slow", headers={"X-Profile": "secret"})
+
+    assert "x-profile-id" not in plain.headers
+    assert "x-profile-id" not in wrong.headers
+    profile_id = profiled.headers["x-profile-id"]
+    assert [p["id"] for p in store.list()] == [profile_id]
+    assert "slow" in store.path(profile_id).read_text()
+
+
+def test_sampled_profiles_are_kept_in_a_bounded_ring(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=3)
+    client = TestClient(_app(store, sample_rate=1.0))
+
+    ids = [client.get("/slow").headers["x-profile-id"] for _ in range(5)]
+
+    assert [p["id"] for p in store.list()] == ids[::-1][:3]
+
+
+def test_profile_paths_reject_traversal(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=3)
+
+    assert store.path("../../etc/passwd") is None
+    assert store.path("1-GET-x.html") is None
+
+
+def test_admin_endpoints_require_the_admin_token(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    app = FastAPI()
+    app.include_router(admin.router)
+    client = TestClient(app)
+
+    assert client.get("/api/admin/profiles").status_code == 403
+    response = client.get("/api/admin/profiles", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json() == []
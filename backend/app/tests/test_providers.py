@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services.providers import (
+    LatencyTracker,
+    MarketDataError,
+    MarketDataProvider,
+    ProviderChain,
+    ReplayProvider,
+)
+
+
+class FakeProvider(MarketDataProvider):
+    def __init__(self, name: str, delay: float = 0.0, error: str | None = None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def quote(self, symbol, priority=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise MarketDataError(self.error)
+        return {"symbol": symbol, "price": 1.0, "source": self.name}
+
+
+def test_failover_moves_to_the_next_provider_on_error():
+    broken, backup = FakeProvider("broken", error="down"), FakeProvider("backup")
+    chain = ProviderChain([broken, backup], hedge=False)
+
+    quote = asyncio.run(chain.quote("AAPL"))
+
+    assert quote["source"] == "backup"
+    assert (broken.calls, backup.calls) == (1, 1)
+
+
+def test_slow_primary_is_hedged_and_the_first_answer_wins():
+    slow, fast = FakeProvider("slow", delay=5.0), FakeProvider("fast", delay=0.01)
+    chain = ProviderChain([slow, fast], default_hedge_delay=0.02)
+
+    started = time.perf_counter()
+    quote = asyncio.run(chain.quote("AAPL"))
+
+    assert quote["source"] == "fast"
+    assert time.perf_counter() - started < 1.0
+    # The cancelled primary still contributes a (lower-bound) latency sample.
+    assert len(chain.latency["slow"]) == 1 and len(chain.latency["fast"]) == 1
+
+
+def test_unexpected_provider_errors_fail_over():
+    class BadPayload(FakeProvider):
+        async def quote(self, symbol, priority=None):
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+    chain = ProviderChain([BadPayload("bad"), FakeProvider("backup")], hedge=False)
+
+    assert asyncio.run(chain.quote("AAPL"))["source"] == "backup"
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = FakeProvider("primary"), FakeProvider("secondary")
+    chain = ProviderChain([primary, secondary], default_hedge_delay=0.5)
+
+    assert asyncio.run(chain.quote("AAPL"))["source"] == "primary"
+    assert secondary.calls == 0
+
+
+def test_hedge_delay_follows_the_provider_percentile():
+    provider = FakeProvider("p")
+    chain = ProviderChain([provider], hedge_percentile=90.0, min_samples=10, default_hedge_delay=0.5)
+    assert chain.hedge_delay(provider) == 0.5
+
+    for ms in range(1, 101):
+        chain.latency["p"].observe(ms / 1000)
+
+    assert chain.hedge_delay(provider) == pytest.approx(0.0901)
+
+
+def test_errors_from_every_provider_are_reported():
+    single = ProviderChain([FakeProvider("a", error="No price data available for symbol: XYZ")])
+    both = ProviderChain([FakeProvider("a", error="down"), FakeProvider("b", error="no data")], hedge=False)
+
+    with pytest.raises(MarketDataError, match="^No price data available for symbol: XYZ$"):
+        asyncio.run(single.quote("XYZ"))
+    with pytest.raises(MarketDataError, match="a: down; b: no data"):
+        asyncio.run(both.quote("XYZ"))
+
+
+def test_latency_tracker_keeps_a_rolling_window():
+    tracker = LatencyTracker(window=3)
+    assert tracker.percentile(50) is None
+
+    for seconds in (10.0, 1.0, 2.0, 3.0):
+        tracker.observe(seconds)
+
+    assert len(tracker) == 3
+    assert tracker.percentile(100) == 3.0
+
+
+def _replay(bars: int = 120) -> ReplayProvider:
+    t = 1_700_000_000 + 60 * np.arange(bars, dtype=np.float64)
+    closes = 100.0 + np.arange(bars, dtype=np.float64)
+    series = {"t": t, "o": closes, "h": closes + 1, "l": closes - 1, "c": closes, "v": np.ones(bars)}
+    return ReplayProvider({"aapl": series})
+
+
+def test_replay_pins_the_last_bar_to_now():
+    provider = _replay()
+    now = int(time.time())
+
+    quote = asyncio.run(provider.quote("AAPL"))
+    candles = asyncio.run(provider.candles("AAPL", "1", now - 5 * 60, now))
+
+    assert quote["price"] == 219.0 and quote["source"] == "replay"
+    assert candles["c"][-1] == 219.0
+    assert 5 <= len(candles["t"]) <= 6
+    assert all(ts % 60 == 0 for ts in candles["t"]) and candles["t"][-1] <= now
+
+
+def test_replay_from_csv(tmp_path):
+    path = tmp_path / "bars.csv"
+    path.write_text(
+        "symbol,ts,open,high,low,close,volume\n"
+        "msft,1700000060,2,2,2,2,10\n"
+        "msft,1700000000,1,1,1,1,10\n"
+    )
+
+    provider = ReplayProvider.from_csv(str(path))
+
+    assert asyncio.run(provider.quote("MSFT"))["price"] == 2.0
+    with pytest.raises(MarketDataError):
+        asyncio.run(provider.quote("AAPL"))
+    with pytest.raises(MarketDataError):
+        ReplayProvider.from_csv(str(tmp_path / "missing.csv"))
@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from app.services.quote_cache import QuoteCache
+
+
+def _counting_fetch(calls: list, delay: float = 0.0):
+    async def fetch(symbol: str) -> dict:
+        calls.append(symbol)
+        await asyncio.sleep(delay)
+        return {"symbol": symbol, "price": 100.0 + len(calls)}
+    return fetch
+
+
+def test_quote_cache_hit_within_ttl():
+    cache = QuoteCache(ttl_seconds=60, max_symbols=10)
+    calls = []
+
+    async def run():
+        first = await cache.get("AAPL", _counting_fetch(calls))
+        second = await cache.get("AAPL", _counting_fetch(calls))
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert calls == ["AAPL"]
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["price"] == first["price"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_quote_cache_max_age_forces_refetch():
+    cache = QuoteCache(ttl_seconds=60, max_symbols=10)
+    calls = []
+
+    async def run():
+        await cache.get("AAPL", _counting_fetch(calls))
+        return await cache.get("AAPL", _counting_fetch(calls), max_age=-1.0)
+
+    quote = asyncio.run(run())
+
+    assert calls == ["AAPL", "AAPL"]
+    assert quote["cached"] is False
+
+
+def test_quote_cache_coalesces_concurrent_misses():
+    cache = QuoteCache(ttl_seconds=60, max_symbols=10)
+    calls = []
+
+    async def run():
+        fetch = _counting_fetch(calls, delay=0.01)
+        return await asyncio.gather(*(cache.get("MSFT", fetch) for _ in range(20)))
+
+    quotes = asyncio.run(run())
+
+    assert calls == ["MSFT"]
+    assert {q["price"] for q in quotes} == {101.0}
+
+
+def test_quote_cache_evicts_least_recently_used():
+    cache = QuoteCache(ttl_seconds=60, max_symbols=2)
+    calls = []
+
+    async def run():
+        fetch = _counting_fetch(calls)
+        await cache.get("A", fetch)
+        await cache.get("B", fetch)
+        await cache.get("A", fetch)
+        await cache.get("C", fetch)
+
+    asyncio.run(run())
+
+    assert cache.peek("A") is not None
+    assert cache.peek("B") is None
+    assert cache.peek("C") is not None
+
+
+def test_quote_cache_propagates_fetch_errors():
+    cache = QuoteCache(ttl_seconds=60, max_symbols=10)
+
+    async def failing(symbol: str) -> dict:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get("AAPL", failing))
+    assert cache.peek("AAPL") is None
+
+
+def test_listeners_see_fresh_quotes_only():
+    cache = QuoteCache(ttl_seconds=60, max_symbols=10)
+    seen = []
+    cache.add_listener(lambda symbol, quote: seen.append((symbol, quote["price"])))
+
+    async def fetch(symbol):
+        return {"symbol": symbol, "price": 1.0}
+
+    async def run():
+        await cache.get("AAPL", fetch)
+        await cache.get("AAPL", fetch)  # served from cache
+        await cache.refresh("AAPL", fetch)
+
+    asyncio.run(run())
+
+    assert seen == [("AAPL", 1.0), ("AAPL", 1.0)]
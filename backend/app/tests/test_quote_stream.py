@@ -0,0 +1,119 @@
+import asyncio
+from datetime import timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.security import create_token
+from app.routers import market
+from app.services import quote_stream
+from app.services.quote_stream import FakeQuoteFeed, FinnhubTradeFeed, QuoteHub, Subscriber
+
+
+def test_subscriber_drops_oldest_when_full():
+    subscriber = Subscriber(max_buffer=3)
+    for i in range(5):
+        subscriber.push({"symbol": "AAPL", "price": float(i)})
+
+    batch = asyncio.run(subscriber.next_batch())
+
+    assert [t["price"] for t in batch] == [2.0, 3.0, 4.0]
+    assert subscriber.dropped == 2
+
+
+def test_hub_keeps_one_upstream_subscription_per_symbol():
+    async def run():
+        hub = QuoteHub(FakeQuoteFeed(interval=0.01, seed=1))
+        a, b = Subscriber(16), Subscriber(16)
+        await hub.subscribe(a, ["aapl"])
+        await hub.subscribe(b, ["AAPL", "MSFT"])
+        upstream = hub.upstream_symbols()
+        batch_a, batch_b = await asyncio.gather(a.next_batch(), b.next_batch())
+        await hub.unsubscribe(b)
+        remaining = hub.upstream_symbols()
+        await hub.stop()
+        return upstream, batch_a, batch_b, remaining
+
+    upstream, batch_a, batch_b, remaining = asyncio.run(run())
+
+    assert upstream == {"AAPL", "MSFT"}
+    assert {t["symbol"] for t in batch_a} == {"AAPL"}
+    assert {t["symbol"] for t in batch_b} <= {"AAPL", "MSFT"}
+    assert remaining == {"AAPL"}
+
+
+def test_finnhub_feed_skips_malformed_frames(monkeypatch):
+    frames = [
+        "not json",
+        "[1, 2]",
+        '{"type": "trade", "data": "AAPL"}',
+        '{"type": "trade", "data": [{"p": 1.0}, {"s": "AAPL", "p": null}, 7]}',
+        '{"type": "trade", "data": [{"s": "AAPL", "p": 189.5, "v": 10, "t": 1}]}',
+    ]
+
+    class FakeConnection:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def send(self, message):
+            pass
+
+        async def __aiter__(self):
+            for frame in frames:
+                yield frame
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(quote_stream.websockets, "connect", lambda url: FakeConnection())
+
+    async def run():
+        ticks = []
+        received = asyncio.Event()
+        feed = FinnhubTradeFeed(api_key="test")
+        await feed.start(lambda tick: (ticks.append(tick), received.set()))
+        try:
+            await asyncio.wait_for(received.wait(), timeout=1.0)
+        finally:
+            await feed.stop()
+        return ticks
+
+    ticks = asyncio.run(run())
+
+    assert [(t["symbol"], t["price"]) for t in ticks] == [("AAPL", 189.5)]
+
+
+def test_stream_endpoint_with_fake_feed(monkeypatch):
+    monkeypatch.setattr(settings, "quote_stream_feed", "fake")
+    monkeypatch.setattr(settings, "quote_stream_fake_interval_seconds", 0.01)
+    monkeypatch.setattr(quote_stream, "_hub", None)
+    app = FastAPI()
+    app.include_router(market.router)
+    token = create_token("1", "access", timedelta(minutes=5))
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/market/stream?token={token}") as ws:
+            ws.send_json({"action": "subscribe", "symbols": ["AAPL"]})
+            message = ws.receive_json()
+
+    assert message["type"] == "ticks"
+    assert message["data"][0]["symbol"] == "AAPL"
+    assert message["data"][0]["source"] == "fake"
+
+
+def test_stream_endpoint_rejects_malformed_messages(monkeypatch):
+    monkeypatch.setattr(settings, "quote_stream_feed", "fake")
+    monkeypatch.setattr(quote_stream, "_hub", None)
+    app = FastAPI()
+    app.include_router(market.router)
+    token = create_token("1", "access", timedelta(minutes=5))
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/market/stream?token={token}") as ws:
+            replies = []
+            for text in ("not json", "[1, 2]", '{"action": "subscribe", "symbols": "AAPL"}'):
+                ws.send_text(text)
+                replies.append(ws.receive_json())
+
+    assert [reply["type"] for reply in replies] == ["error", "error", "error"]
+    assert replies[0]["detail"] == "Invalid JSON"
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select, text
+
+from app import db
+from app.db import Base
+from app.bootstrap_db import bootstrap_schema, missing_schema
+from app.main import create_app
+from app.models import Position, Trade
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def test_import_reads_no_settings(tmp_path):
+    # No DB_* variables and no .env: importing must not need the configuration.
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.main"],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_create_app_opens_no_engines():
+    app = create_app()
+    client = TestClient(app)  # no context manager: the lifespan does not run
+
+    assert client.get("/").json() == {"status": "ok"}
+    assert client.get("/metrics").status_code == 200
+    assert {"/api/trade/history", "/api/admin/profiles"} <= set(app.openapi()["paths"])
+    assert db._engines == {}
+    assert db.SessionLocal.kw.get("bind") is None
+
+
+def test_bootstrap_creates_tables_then_missing_indexes():
+    engine = create_engine("sqlite://")
+
+    with engine.begin() as conn:
+        tables, indexes = bootstrap_schema(conn)
+        assert "trades" in tables and indexes == []
+
+        conn.execute(text("DROP INDEX ix_trades_user_created"))
+        assert missing_schema(conn) == ([], ["ix_trades_user_created"])
+
+        assert bootstrap_schema(conn) == ([], ["ix_trades_user_created"])
+        assert missing_schema(conn) == ([], [])
+
+
+def test_bootstrap_backfills_a_new_positions_table_from_trades():
+    engine = create_engine("sqlite://")
+    existing = [t for t in Base.metadata.sorted_tables if t.name != "positions"]
+
+    with engine.begin() as conn:
+        Base.metadata.create_all(bind=conn, tables=existing)
+        conn.execute(insert(Trade), [
+            {"user_id": 1, "symbol": "AAPL", "side": "BUY", "quantity": 10, "price": 100},
+            {"user_id": 1, "symbol": "AAPL", "side": "SELL", "quantity": 4, "price": 110},
+            {"user_id": 2, "symbol": "MSFT", "side": "BUY", "quantity": 3, "price": 300},
+        ])
+
+        tables, _ = bootstrap_schema(conn)
+        positions = conn.execute(
+            select(Position.user_id, Position.symbol, Position.quantity).order_by(Position.user_id)
+        ).all()
+
+    assert tables == ["positions"]
+    assert positions == [(1, "AAPL", 6), (2, "MSFT", 3)]
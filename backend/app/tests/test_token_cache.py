@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+import pytest
+from app.core.token_cache import TokenCache
+from app.core.security import create_token, decode_token_cached, get_token_cache, revoke_token
+
+
+def test_token_cache_hit_until_expiry():
+    cache = TokenCache(max_entries=10)
+    cache.put("tok", {"sub": "1", "exp": time.time() + 60})
+
+    assert cache.get("tok")["sub"] == "1"
+    assert cache.get("other") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_token_cache_drops_expired_entries():
+    cache = TokenCache(max_entries=10)
+    cache.put("tok", {"sub": "1", "exp": time.time() - 1})
+
+    assert cache.get("tok") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_is_bounded():
+    cache = TokenCache(max_entries=2)
+    exp = time.time() + 60
+    for token in ("a", "b", "c"):
+        cache.put(token, {"exp": exp})
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_revoked_token_is_rejected():
+    token = create_token("42", "access", timedelta(minutes=5))
+    assert decode_token_cached(token)["sub"] == "42"
+
+    revoke_token(token)
+
+    assert get_token_cache().is_revoked(token)
+    with pytest.raises(ValueError):
+        decode_token_cached(token)
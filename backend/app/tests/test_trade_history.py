@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+import pytest
+from app.routers.trade import format_export_chunk
+from app.services.trade_service import decode_history_cursor, encode_history_cursor
+
+
+def _row(trade_id: int, symbol: str = "AAPL"):
+    return SimpleNamespace(
+        id=trade_id,
+        symbol=symbol,
+        side="BUY",
+        quantity=3,
+        price=Decimal("101.2500"),
+        status="FILLED",
+        created_at=datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    )
+
+
+def test_history_cursor_round_trips():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+
+    cursor = encode_history_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_history_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "aGVsbG8"])
+def test_malformed_history_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_history_cursor(cursor)
+
+
+def test_csv_export_chunk():
+    header = format_export_chunk([], "csv", header=True)
+    body = format_export_chunk([_row(1), _row(2, "MSFT")], "csv")
+
+    assert header == "id,symbol,side,quantity,price,status,created_at\n"
+    assert body.splitlines() == [
+        "1,AAPL,BUY,3,101.2500,FILLED,2026-01-02T03:04:05.678901+00:00",
+        "2,MSFT,BUY,3,101.2500,FILLED,2026-01-02T03:04:05.678901+00:00",
+    ]
+
+
+def test_ndjson_export_chunk():
+    lines = format_export_chunk([_row(7)], "ndjson").splitlines()
+
+    assert [json.loads(line) for line in lines] == [{
+        "id": 7,
+        "symbol": "AAPL",
+        "side": "BUY",
+        "quantity": 3,
+        "price": 101.25,
+        "status": "FILLED",
+        "created_at": "2026-01-02T03:04:05.678901+00:00",
+    }]
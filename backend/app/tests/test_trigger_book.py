@@ -0,0 +1,75 @@
+import asyncio
+from app.services import order_service
+from app.services.order_service import OrderExecutor
+from app.services.trigger_book import TriggerBook
+
+
+def test_buy_limit_and_sell_stop_trigger_on_fall():
+    book = TriggerBook()
+    book.add(1, "AAPL", "BUY", "LIMIT", 95.0)
+    book.add(2, "AAPL", "SELL", "STOP", 90.0)
+    book.add(3, "AAPL", "BUY", "LIMIT", 97.0)
+
+    assert book.crossed("AAPL", 98.0) == []
+    assert [o.order_id for o in book.crossed("AAPL", 95.0)] == [3, 1]
+    assert [o.order_id for o in book.crossed("AAPL", 80.0)] == [2]
+    assert len(book) == 0
+
+
+def test_sell_limit_and_buy_stop_trigger_on_rise():
+    book = TriggerBook()
+    book.add(1, "AAPL", "SELL", "LIMIT", 110.0)
+    book.add(2, "AAPL", "BUY", "STOP", 105.0)
+    book.add(3, "MSFT", "BUY", "STOP", 105.0)
+
+    triggered = book.crossed("AAPL", 106.0)
+
+    assert [o.order_id for o in triggered] == [2]
+    assert triggered[0].trigger_price == 105.0
+    assert book.symbols() == {"AAPL", "MSFT"}
+
+
+def test_equal_triggers_fill_oldest_first():
+    book = TriggerBook()
+    book.load([(7, "AAPL", "BUY", "LIMIT", 100), (3, "AAPL", "BUY", "LIMIT", 100)])
+
+    assert [o.order_id for o in book.crossed("AAPL", 100.0)] == [3, 7]
+
+
+def test_cancelled_orders_never_trigger_and_are_compacted():
+    book = TriggerBook()
+    book.load((i, "AAPL", "BUY", "LIMIT", 100.0 - i * 0.001) for i in range(5000))
+
+    for i in range(4000):
+        assert book.cancel(i)
+    assert not book.cancel(0)
+
+    triggered = book.crossed("AAPL", 0.0)
+    assert [o.order_id for o in triggered] == list(range(4000, 5000))
+    assert len(book) == 0
+    assert book.symbols() == set()
+
+
+def test_executor_fills_crossed_orders_and_requeues_on_failure(monkeypatch):
+    # Arrange
+    calls = []
+
+    async def failing_fill(order_ids, price):
+        calls.append((order_ids, price))
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(order_service, "fill_orders", failing_fill)
+    executor = OrderExecutor()
+    executor.book.add(1, "AAPL", "BUY", "LIMIT", 100.0)
+    executor.book.add(2, "AAPL", "SELL", "LIMIT", 120.0)
+
+    # Act
+    async def run():
+        executor.on_quote("AAPL", {"symbol": "AAPL", "price": 99.5})
+        await asyncio.gather(*executor._tasks)
+
+    asyncio.run(run())
+
+    # Assert
+    assert calls == [([1], 99.5)]
+    assert 1 in executor.book and 2 in executor.book
@@ -0,0 +1,53 @@
+import asyncio
+import time
+import pytest
+from app.services.upstream import CircuitBreaker, CircuitOpenError, Priority, TokenBucket
+
+
+def test_token_bucket_serves_higher_priority_first():
+    async def run():
+        bucket = TokenBucket(rate_per_minute=600, burst=1)  # one token per 0.1s
+        await bucket.acquire(Priority.BACKGROUND)  # drain the burst
+        order = []
+
+        async def take(name, priority):
+            await bucket.acquire(priority)
+            order.append(name)
+
+        background = asyncio.create_task(take("background", Priority.BACKGROUND))
+        await asyncio.sleep(0.01)
+        trade = asyncio.create_task(take("trade", Priority.TRADE))
+        await asyncio.gather(background, trade)
+        return order
+
+    assert asyncio.run(run()) == ["trade", "background"]
+
+
+def test_token_bucket_pause_delays_next_token():
+    async def run():
+        bucket = TokenBucket(rate_per_minute=60_000, burst=5)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # half-open trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+    breaker.record_success()
+
+    assert breaker.state == "closed"
@@ -0,0 +1,78 @@
+"""
+
+Micro-benchmarks: vectorized feature engine vs. the original pure-Python loops.
+
+Usage (from backend/):
+    python -m benchmarks.bench_features [--bars 10000] [--symbols 100] [--repeat 5]
+
+"""
+import argparse
+import timeit
+import numpy as np
+
+from app.services import features
+
+
+def loop_latest(closes: list[float], end: int | None = None) -> tuple[float, float]:
+    """The original get_recent_market_features loop: returns_30m and volatility at bar `end - 1`."""
+    end = len(closes) if end is None else end
+    returns_30m = closes[end - 1] / closes[end - 31] - 1.0
+    rets = []
+    for i in range(end - 30, end):
+        if i == 0:
+            continue
+        rets.append(closes[i] / closes[i - 1] - 1.0)
+    mean = sum(rets) / len(rets)
+    var = sum((x - mean) ** 2 for x in rets) / max(len(rets) - 1, 1)
+    return returns_30m, var ** 0.5
+
+
+def loop_series(closes: list[float]) -> tuple[list[float], list[float]]:
+    """The same loop applied at every bar, as a backtest would need."""
+    returns, vols = [], []
+    for end in range(31, len(closes) + 1):
+        r, v = loop_latest(closes, end)
+        returns.append(r)
+        vols.append(v)
+    return returns, vols
+
+
+def numpy_series(closes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return features.window_returns(closes, 30), features.rolling_volatility(closes, 30)
+
+
+def _best_ms(fn, repeat: int, number: int = 1) -> float:
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, args.bars)))
+    closes_list = closes.tolist()
+    volumes = rng.uniform(100, 10_000, args.bars)
+    matrix = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, (args.symbols, args.bars)), axis=1))
+
+    rows = [
+        ("latest returns_30m+vol (loop)", _best_ms(lambda: loop_latest(closes_list), args.repeat, 100)),
+        ("latest full feature set (numpy)", _best_ms(lambda: features.compute_features(closes, volumes), args.repeat, 10)),
+        ("rolling returns_30m+vol (loop)", _best_ms(lambda: loop_series(closes_list), args.repeat)),
+        ("rolling returns_30m+vol (numpy)", _best_ms(lambda: numpy_series(closes), args.repeat, 10)),
+        ("ema_26 (numpy)", _best_ms(lambda: features.ema(closes, 26), args.repeat, 10)),
+        ("rsi_14 (numpy)", _best_ms(lambda: features.rsi(closes, 14), args.repeat, 10)),
+        (f"full feature set, {args.symbols} symbols (numpy)", _best_ms(lambda: features.compute_features(matrix), args.repeat)),
+    ]
+
+    print(f"{args.bars} bars, best of {args.repeat}")
+    width = max(len(name) for name, _ in rows)
+    for name, ms in rows:
+        print(f"  {name:<{width}}  {ms:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+
+Micro-benchmarks for hot service functions: decode_token, get_positions,
+get_pnl and get_recent_market_features.
+
+Usage (from backend/, after benchmarks.seed_trades, with benchmarks.fake_finnhub running):
+    FINNHUB_BASE_URL=http://127.0.0.1:9100/api/v1 FINNHUB_API_KEY=fake \\
+        python -m benchmarks.bench_micro [--iterations 200] [--user-id ID] [--output micro.json]
+
+Without --user-id the benchmark user with the most trades is used. Token
+benchmarks need neither the database nor the fake provider; pass
+--only tokens to run just those.
+
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from app.core.security import clear_token_cache, create_token, decode_token, decode_token_cached
+from app.db import AsyncSessionLocal, dispose_engines, init_engines
+from app.models import Trade
+from app.services import market_data
+from app.services.trade_service import get_pnl, get_positions
+from benchmarks.common import summarize, write_results
+
+GROUPS = ("tokens", "positions", "pnl", "features")
+
+
+def _time_sync(fn, iterations: int) -> dict:
+    samples, errors = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            errors += 1
+            continue
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, errors=errors)
+
+
+async def _time_async(fn, iterations: int) -> dict:
+    samples, errors = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            await fn()
+        except Exception:
+            errors += 1
+            continue
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, errors=errors)
+
+
+def bench_tokens(iterations: int) -> dict[str, dict]:
+    token = create_token("1", "access", timedelta(minutes=15))
+    clear_token_cache()
+    decode_token_cached(token)
+    return {
+        "decode_token": _time_sync(lambda: decode_token(token), iterations),
+        "decode_token_cached": _time_sync(lambda: decode_token_cached(token), iterations),
+    }
+
+
+async def _busiest_user() -> int:
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(
+            select(Trade.user_id).group_by(Trade.user_id).order_by(func.count().desc()).limit(1)
+        )).scalar()
+    if user_id is None:
+        raise SystemExit("No trades found; run benchmarks.seed_trades first")
+    return user_id
+
+
+async def bench_db(groups: set[str], iterations: int, user_id: int | None, symbol: str) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    init_engines()
+    await market_data.open_http_client()
+    try:
+        if groups & {"positions", "pnl"}:
+            user_id = user_id or await _busiest_user()
+
+        async def positions():
+            async with AsyncSessionLocal() as db:
+                await get_positions(db, user_id)
+
+        async def pnl():
+            async with AsyncSessionLocal() as db:
+                await get_pnl(db, user_id)
+
+        async def pnl_uncached():
+            market_data.get_quote_cache().clear()
+            await pnl()
+
+        async def features():
+            await market_data.get_recent_market_features(symbol)
+
+        if "positions" in groups:
+            results["get_positions"] = await _time_async(positions, iterations)
+        if "pnl" in groups:
+            results["get_pnl_uncached_quotes"] = await _time_async(pnl_uncached, max(iterations // 10, 1))
+            results["get_pnl"] = await _time_async(pnl, iterations)
+        if "features" in groups:
+            await features()  # first call backfills the candle store
+            results["get_recent_market_features"] = await _time_async(features, iterations)
+    finally:
+        await market_data.close_http_client()
+        await dispose_engines()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--token-iterations", type=int, default=20_000)
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--symbol", default="BN000")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"comma-separated subset of {','.join(GROUPS)}")
+    parser.add_argument("--output", default=None, help="save results as JSON")
+    args = parser.parse_args()
+
+    groups = {g.strip() for g in args.only.split(",") if g.strip()}
+    results: dict[str, dict] = {}
+    if "tokens" in groups:
+        results.update(bench_tokens(args.token_iterations))
+    if groups - {"tokens"}:
+        results.update(asyncio.run(bench_db(groups, args.iterations, args.user_id, args.symbol)))
+
+    write_results(args.output, "micro", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Shared helpers for the benchmark scripts: latency summaries and JSON results.
+
+Every script writes the same layout so `benchmarks.compare` can diff any two runs:
+    {"meta": {...}, "results": {name: {"count", "errors", "p50_ms", ..., "rps"}}}
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Benchmark users and symbols created by seed_trades and used by the load driver.
+EMAIL_TEMPLATE = "bench{}@bench.example.com"
+
+
+def bench_symbols(count: int) -> list[str]:
+    return [f"BN{i:03d}" for i in range(count)]
+
+
+def summarize(samples: list[float], elapsed: float | None = None, errors: int = 0) -> dict:
+    """
+    Summarizes latency samples.
+
+    :param samples: Per-operation latencies in seconds (successful operations only).
+    :param elapsed: Wall-clock seconds the samples were collected over; defaults
+        to their sum (i.e. sequential execution).
+    :param errors: Failed operations, reported alongside.
+    :return: count, errors, mean/p50/p95/p99/max in milliseconds and operations per second.
+    """
+    if not samples:
+        return {"count": 0, "errors": errors}
+    ms = np.asarray(samples, dtype=np.float64) * 1000.0
+    elapsed = float(np.sum(samples)) if elapsed is None else elapsed
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "errors": errors,
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "rps": round(ms.size / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str | None, benchmark: str, params: dict, results: dict[str, dict]) -> dict:
+    """Prints a results table and, if `path` is given, saves the results as JSON."""
+    document = {
+        "meta": {
+            "benchmark": benchmark,
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "params": params,
+        },
+        "results": results,
+    }
+    print_table(results)
+    if path:
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"saved {path}")
+    return document
+
+
+def print_table(results: dict[str, dict]) -> None:
+    width = max((len(name) for name in results), default=4)
+    print(f"  {'name':<{width}}  {'count':>7} {'err':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'rps':>10}")
+    for name, r in results.items():
+        if not r.get("count"):
+            print(f"  {name:<{width}}  {0:>7} {r.get('errors', 0):>5}")
+            continue
+        print(
+            f"  {name:<{width}}  {r['count']:>7} {r['errors']:>5} "
+            f"{r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['rps'] or 0:>10.1f}"
+        )
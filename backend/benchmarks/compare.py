@@ -0,0 +1,73 @@
+"""
+
+Compare two benchmark result files (from bench_micro or load).
+
+Usage (from backend/):
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+
+Prints the change in p50/p95/p99 latency and throughput per result and exits
+with status 1 if any latency grew, or throughput fell, by more than
+--threshold percent.
+
+"""
+import argparse
+import json
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old: float | None, new: float | None) -> float | None:
+    if not old or new is None:
+        return None
+    return (new - old) / old * 100.0
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[str]:
+    """
+    Prints a comparison table.
+
+    :return: Descriptions of regressions beyond `threshold` percent.
+    """
+    regressions = []
+    old_results, new_results = baseline["results"], candidate["results"]
+    print(f"baseline {baseline['meta'].get('commit')}  ->  candidate {candidate['meta'].get('commit')}")
+    for name in sorted(set(old_results) & set(new_results)):
+        old, new = old_results[name], new_results[name]
+        cells = []
+        for key in (*LATENCY_KEYS, "rps"):
+            delta = _change(old.get(key), new.get(key))
+            if delta is None:
+                cells.append(f"{key} n/a")
+                continue
+            cells.append(f"{key} {old[key]:.3f}->{new[key]:.3f} ({delta:+.1f}%)")
+            worse = delta > threshold if key in LATENCY_KEYS else delta < -threshold
+            if worse:
+                regressions.append(f"{name} {key} {delta:+.1f}%")
+        print(f"  {name}: " + ", ".join(cells))
+    for name in sorted(set(old_results) ^ set(new_results)):
+        print(f"  {name}: only in {'baseline' if name in old_results else 'candidate'}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print("Regressions: " + "; ".join(regressions))
+        return 1
+    print("No regressions beyond threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+"""
+
+Local stand-in for the Finnhub REST API (`/quote`, `/stock/candle`) with
+configurable latency and failure rates, so load tests never touch the real
+provider or its rate limit.
+
+Usage (from backend/):
+    python -m benchmarks.fake_finnhub [--port 9100] [--latency-ms 50] [--jitter-ms 20]
+        [--error-rate 0.01] [--rate-limit-rate 0.0]
+
+Then run the app with:
+    FINNHUB_BASE_URL=http://127.0.0.1:9100/api/v1 FINNHUB_API_KEY=fake
+
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+import zlib
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+RESOLUTION_SECONDS = {"1": 60, "5": 300, "15": 900, "30": 1800, "60": 3600, "D": 86400, "W": 604800}
+MAX_BARS = 5000
+
+
+def _base_price(symbol: str) -> float:
+    return 20.0 + (zlib.crc32(symbol.encode()) % 480)
+
+
+def price_at(symbol: str, ts) -> np.ndarray | float:
+    """Deterministic price path: a daily and a half-hourly cycle plus hashed per-bar noise."""
+    base = _base_price(symbol)
+    phase = (zlib.crc32(symbol.encode()) % 1000) / 1000.0 * 2 * math.pi
+    t = np.asarray(ts, dtype=np.float64)
+    noise = ((np.asarray(ts, dtype=np.int64) * 2654435761) % 1000) / 1000.0 - 0.5
+    return base * (1.0 + 0.02 * np.sin(2 * math.pi * t / 86400 + phase) + 0.004 * np.sin(2 * math.pi * t / 1800) + 0.001 * noise)
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, rate_limit_rate: float, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake Finnhub")
+    rng = random.Random(seed)
+
+    async def simulate():
+        delay = max(latency_ms + rng.uniform(-jitter_ms, jitter_ms), 0.0) / 1000.0
+        if delay:
+            await asyncio.sleep(delay)
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            return JSONResponse({"error": "API limit reached"}, status_code=429, headers={"Retry-After": "1"})
+        if roll < rate_limit_rate + error_rate:
+            return JSONResponse({"error": "upstream error"}, status_code=503)
+        return None
+
+    @app.get("/api/v1/quote")
+    async def quote(symbol: str):
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        now = int(time.time())
+        price = float(price_at(symbol, now))
+        previous = float(price_at(symbol, now - 86400))
+        return {
+            "c": round(price, 4),
+            "d": round(price - previous, 4),
+            "dp": round((price / previous - 1) * 100, 4),
+            "h": round(price * 1.01, 4),
+            "l": round(price * 0.99, 4),
+            "o": round(previous, 4),
+            "pc": round(previous, 4),
+            "t": now,
+        }
+
+    @app.get("/api/v1/stock/candle")
+    async def candles(
+        symbol: str,
+        resolution: str,
+        from_ts: int = Query(alias="from"),
+        to_ts: int = Query(alias="to"),
+    ):
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        step = RESOLUTION_SECONDS.get(resolution)
+        if step is None:
+            return JSONResponse({"error": "unsupported resolution"}, status_code=422)
+        start = -(-from_ts // step) * step
+        end = min(to_ts, int(time.time()))
+        if end < start:
+            return {"s": "no_data"}
+        ts = np.arange(start, end + 1, step, dtype=np.int64)[-MAX_BARS:]
+        opens = price_at(symbol, ts)
+        closes = price_at(symbol, ts + step - 1)
+        return {
+            "s": "ok",
+            "t": ts.tolist(),
+            "o": np.round(opens, 4).tolist(),
+            "h": np.round(np.maximum(opens, closes) * 1.0005, 4).tolist(),
+            "l": np.round(np.minimum(opens, closes) * 0.9995, 4).tolist(),
+            "c": np.round(closes, 4).tolist(),
+            "v": ((ts // step) % 900 + 100).astype(float).tolist(),
+        }
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
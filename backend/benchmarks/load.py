@@ -0,0 +1,135 @@
+"""
+
+End-to-end load driver for a running API server.
+
+Usage (from backend/, server started against the seeded DB and fake provider):
+    python -m benchmarks.load [--base-url http://127.0.0.1:8000] [--concurrency 50]
+        [--duration 30] [--users 20] [--mix login=1,trade=2,positions=4,pnl=4,predict=2]
+        [--output load.json]
+
+Each virtual user loops: pick an endpoint by weight, send it, record latency
+and status. Results are reported per endpoint as p50/p95/p99 latency and
+successful requests per second over the run.
+
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.common import EMAIL_TEMPLATE, bench_symbols, summarize, write_results
+
+ENDPOINTS = ("login", "trade", "positions", "pnl", "predict")
+DEFAULT_MIX = "login=1,trade=2,positions=4,pnl=4,predict=2"
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s) in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> httpx.Response:
+    return await client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+def _request_factories(symbols: list[str], password: str, users: int):
+    """Endpoint name -> coroutine function (client, token, rng) -> response."""
+    async def login(client, token, rng):
+        return await _login(client, EMAIL_TEMPLATE.format(rng.randrange(users)), password)
+
+    async def trade(client, token, rng):
+        return await client.post(
+            "/api/trade",
+            json={"symbol": rng.choice(symbols), "side": rng.choice(("BUY", "SELL")), "quantity": rng.randint(1, 10)},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    async def positions(client, token, rng):
+        return await client.get("/api/trade/positions", headers={"Authorization": f"Bearer {token}"})
+
+    async def pnl(client, token, rng):
+        return await client.get("/api/trade/pnl", headers={"Authorization": f"Bearer {token}"})
+
+    async def predict(client, token, rng):
+        return await client.get(
+            "/api/predict/predict",
+            params={"symbol": rng.choice(symbols), "horizon_minutes": 30},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    return {"login": login, "trade": trade, "positions": positions, "pnl": pnl, "predict": predict}
+
+
+async def run(args) -> dict[str, dict]:
+    weights = parse_mix(args.mix)
+    names = list(weights)
+    symbols = bench_symbols(args.symbols)
+    requests = _request_factories(symbols, args.password, args.users)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        tokens = []
+        for i in range(args.users):
+            response = await _login(client, EMAIL_TEMPLATE.format(i), args.password)
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+
+        samples: dict[str, list[float]] = {name: [] for name in names}
+        errors: dict[str, int] = {name: 0 for name in names}
+        deadline = time.perf_counter() + args.duration
+
+        async def virtual_user(worker: int):
+            rng = random.Random(args.seed + worker)
+            token = tokens[worker % len(tokens)]
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights=[weights[n] for n in names])[0]
+                started = time.perf_counter()
+                try:
+                    response = await requests[name](client, token, rng)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                if ok:
+                    samples[name].append(elapsed)
+                else:
+                    errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(i) for i in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    results = {name: summarize(samples[name], elapsed=wall, errors=errors[name]) for name in names}
+    everything = [s for name in names for s in samples[name]]
+    results["all"] = summarize(everything, elapsed=wall, errors=sum(errors.values()))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--users", type=int, default=20, help="benchmark users to log in as (see seed_trades)")
+    parser.add_argument("--password", default="BenchPass123")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="save results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    write_results(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+
+Seed a benchmark database with users and trades, then materialize positions.
+
+Usage (from backend/, against a dedicated database, e.g. DB_NAME=trading_bench):
+    python -m benchmarks.seed_trades --trades 10000 [--users 100] [--symbols 50] [--reset]
+    python -m benchmarks.seed_trades --trades 1000000 --users 1000 --reset
+
+Users are bench{N}@bench.example.com, all with the password given by --password.
+Trades are bulk-loaded with COPY; the trade mix is deterministic for a given --seed.
+
+"""
+import argparse
+import io
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.security import hash_password
+from app.db import Base, SessionLocal, get_engine
+from app.models import Position, Trade, User
+from app.services.trade_service import rebuild_positions
+from benchmarks.common import EMAIL_TEMPLATE, bench_symbols
+
+_COPY_CHUNK_ROWS = 100_000
+
+
+def seed_users(db, count: int, password: str) -> list[int]:
+    """Creates the benchmark users if missing and returns their ids in order."""
+    hashed = hash_password(password)
+    emails = [EMAIL_TEMPLATE.format(i) for i in range(count)]
+    db.execute(
+        pg_insert(User)
+        .values([{"email": email, "hashed_password": hashed} for email in emails])
+        .on_conflict_do_nothing(index_elements=["email"])
+    )
+    db.commit()
+    ids = dict(db.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+    return [ids[email] for email in emails]
+
+
+def copy_trades(user_ids: list[int], symbols: list[str], count: int, seed: int) -> None:
+    """Generates `count` trades and streams them into the trades table with COPY."""
+    rng = np.random.default_rng(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    step_us = max(int(365 * 86400 * 1e6 / max(count, 1)), 1)
+
+    raw = get_engine().raw_connection()
+    try:
+        cursor = raw.cursor()
+        for offset in range(0, count, _COPY_CHUNK_ROWS):
+            n = min(_COPY_CHUNK_ROWS, count - offset)
+            users = rng.integers(0, len(user_ids), n)
+            syms = rng.integers(0, len(symbols), n)
+            sides = rng.random(n) < 0.55  # slight buy bias keeps most positions long
+            quantities = rng.integers(1, 100, n)
+            prices = np.round(rng.uniform(20.0, 500.0, n), 4)
+
+            buf = io.StringIO()
+            for i in range(n):
+                created = start + timedelta(microseconds=(offset + i) * step_us)
+                buf.write(
+                    f"{user_ids[users[i]]}\t{symbols[syms[i]]}\t{'BUY' if sides[i] else 'SELL'}\t"
+                    f"{quantities[i]}\t{prices[i]}\tFILLED\t{created.isoformat()}\n"
+                )
+            buf.seek(0)
+            cursor.copy_expert(
+                "COPY trades (user_id, symbol, side, quantity, price, status, created_at) FROM STDIN",
+                buf,
+            )
+            raw.commit()
+            print(f"  {offset + n}/{count} trades")
+    finally:
+        raw.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trades", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--password", default="BenchPass123")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="delete the benchmark users' trades and positions first")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        user_ids = seed_users(db, args.users, args.password)
+        if args.reset:
+            db.execute(delete(Trade).where(Trade.user_id.in_(user_ids)))
+            db.execute(delete(Position).where(Position.user_id.in_(user_ids)))
+            db.commit()
+
+    copy_trades(user_ids, bench_symbols(args.symbols), args.trades, args.seed)
+
+    with SessionLocal() as db:
+        rebuild_positions(db)
+
+    print(
+        f"Seeded {args.trades} trades for {args.users} users over {args.symbols} symbols "
+        f"in {time.perf_counter() - started:.1f}s (password: {args.password})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+
+Worker cold-start benchmark.
+
+Usage (from backend/):
+    python -m benchmarks.startup [--runs 10] [--lifespan] [--serve] [--output startup.json]
+
+Each run starts a fresh interpreter and times, separately:
+    import      `import app.main`
+    create_app  building the application (middleware and routers)
+    lifespan    lifespan startup: engines, HTTP client, order book, prefetcher
+                (--lifespan; needs the database)
+    process     the whole child process, interpreter start to exit
+
+With --serve it also launches `uvicorn app.main:app` and reports
+time_to_first_response: process launch until `GET /` returns 200. Set
+PREFETCH_ENABLED=false to keep upstream calls out of the lifespan numbers.
+
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import summarize, write_results
+
+_CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+application = app.main.create_app()
+created = time.perf_counter()
+timings = {"import": imported - started, "create_app": created - imported}
+if sys.argv[1] == "1":
+    async def startup():
+        async with application.router.lifespan_context(application):
+            timings["lifespan"] = time.perf_counter() - created
+    asyncio.run(startup())
+print(json.dumps(timings))
+"""
+
+
+def _run_child(lifespan: bool) -> dict[str, float]:
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, "1" if lifespan else "0"],
+        capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(out.stdout.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _time_to_first_response(timeout: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--lifespan", action="store_true", help="also run lifespan startup (needs the database)")
+    parser.add_argument("--serve", action="store_true", help="also time uvicorn launch to first response")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the server")
+    parser.add_argument("--output", default=None, help="save results as JSON")
+    args = parser.parse_args()
+
+    phases = ["import", "create_app", *(["lifespan"] if args.lifespan else []), "process"]
+    samples: dict[str, list[float]] = {phase: [] for phase in phases}
+    errors = 0
+    for _ in range(args.runs):
+        try:
+            timings = _run_child(args.lifespan)
+        except subprocess.CalledProcessError as e:
+            errors += 1
+            print(e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e)
+            continue
+        for phase in phases:
+            samples[phase].append(timings[phase])
+
+    results = {phase: summarize(samples[phase], errors=errors) for phase in phases}
+
+    if args.serve:
+        first_response, serve_errors = [], 0
+        for _ in range(args.runs):
+            try:
+                first_response.append(_time_to_first_response(args.timeout))
+            except (RuntimeError, TimeoutError) as e:
+                serve_errors += 1
+                print(e)
+        results["time_to_first_response"] = summarize(first_response, errors=serve_errors)
+
+    params = {**vars(args), "cpu_count": os.cpu_count()}
+    write_results(args.output, "startup", params, results)
+
+
+if __name__ == "__main__":
+    main()